@@ -1,18 +1,28 @@
 from fastapi import Depends
 from redis import Redis
+from redis import asyncio as aioredis
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import Settings, get_settings
-from app.db.session import get_db_session, get_redis
+from app.db.session import get_async_db_session, get_async_redis, get_db_session, get_redis
 
 
 def db_session_dep(db: Session = Depends(get_db_session)) -> Session:
     return db
 
 
+def async_db_session_dep(db: AsyncSession = Depends(get_async_db_session)) -> AsyncSession:
+    return db
+
+
 def settings_dep(settings: Settings = Depends(get_settings)) -> Settings:
     return settings
 
 
 def redis_dep(redis_client: Redis = Depends(get_redis)) -> Redis:
     return redis_client
+
+
+def async_redis_dep(redis_client: aioredis.Redis = Depends(get_async_redis)) -> aioredis.Redis:
+    return redis_client
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
-from app.api.deps import db_session_dep
-from app.domain.schemas import BulkSendRequest, BulkSendResponse
+from app.api.deps import db_session_dep, settings_dep
+from app.core.config import Settings
+from app.domain.schemas import BulkJobResponse, BulkJobSpec, BulkSendRequest, BulkSendResponse, BulkUploadResponse
 from app.services.bulk_service import BulkService
+from app.services.bulk_upload import UPLOAD_FORMATS, RecipientStreamParser
+from app.services.mail_service import MailService
 
 router = APIRouter(tags=["bulk"])
 
@@ -16,3 +24,87 @@ def send_bulk(payload: BulkSendRequest, db: Session = Depends(db_session_dep)):
     service = BulkService(db)
     job = service.enqueue_bulk(payload)
     return BulkSendResponse(bulk_id=job.id, queued_count=job.total_count)
+
+
+@router.get("/send/bulk/{bulk_id}", response_model=BulkJobResponse)
+def get_bulk(bulk_id: str, tenant_id: str, db: Session = Depends(db_session_dep)):
+    job = BulkService(db).progress(bulk_id, tenant_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="bulk job not found")
+    return BulkJobResponse.model_validate(job)
+
+
+@router.post("/send/bulk/upload", response_model=BulkUploadResponse, status_code=status.HTTP_202_ACCEPTED)
+async def upload_bulk(
+    request: Request,
+    tenant_id: str,
+    template_id: str,
+    idempotency_key: str,
+    batch_size: int = Query(default=100, ge=1, le=1000),
+    provider_hint: str | None = None,
+    send_at: datetime | None = None,
+    shared_variables: str = Query(default="{}", description="JSON object"),
+    metadata: str = Query(default="{}", description="JSON object"),
+    db: Session = Depends(db_session_dep),
+    settings: Settings = Depends(settings_dep),
+):
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    upload_format = UPLOAD_FORMATS.get(media_type)
+    if upload_format is None:
+        raise HTTPException(status_code=415, detail="upload must be application/x-ndjson or text/csv")
+
+    try:
+        spec = BulkJobSpec(
+            tenant_id=tenant_id,
+            template_id=template_id,
+            idempotency_key=idempotency_key,
+            batch_size=batch_size,
+            provider_hint=provider_hint,
+            send_at=send_at,
+            shared_variables=json.loads(shared_variables),
+            metadata=json.loads(metadata),
+        )
+    except (json.JSONDecodeError, ValidationError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    try:
+        await run_in_threadpool(MailService(db).resolve_send_context, tenant_id, template_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    service = BulkService(db)
+    job = await run_in_threadpool(service.create_job, spec)
+    parser = RecipientStreamParser(
+        upload_format,
+        max_errors=settings.bulk_upload_max_errors,
+        max_record_size=settings.bulk_upload_max_record_size,
+    )
+    chunk_size = settings.bulk_staging_chunk_size
+    pending: list[dict] = []
+    chunks = 0
+    try:
+        async for data in request.stream():
+            pending.extend(parser.feed(data))
+            while len(pending) >= chunk_size:
+                await run_in_threadpool(service.stage_chunk, job.id, chunks, pending[:chunk_size])
+                del pending[:chunk_size]
+                chunks += 1
+        pending.extend(parser.close())
+        if pending:
+            await run_in_threadpool(service.stage_chunk, job.id, chunks, pending)
+            chunks += 1
+    except Exception:
+        await run_in_threadpool(service.fail_job, job.id)
+        raise
+
+    if not parser.accepted:
+        await run_in_threadpool(service.fail_job, job.id)
+        raise HTTPException(status_code=400, detail={"error": "no valid recipients", "errors": parser.errors})
+
+    await run_in_threadpool(service.start_job, job, parser.accepted, chunks)
+    return BulkUploadResponse(
+        bulk_id=job.id,
+        queued_count=parser.accepted,
+        rejected_count=parser.rejected,
+        errors=parser.errors,
+    )
@@ -1,20 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from redis import Redis
+from redis import asyncio as aioredis
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import db_session_dep, redis_dep, settings_dep
-from app.core.config import Settings
-from app.core.rate_limit import RateLimitExceededError, RateLimiter
+from app.api.deps import async_db_session_dep, async_redis_dep, db_session_dep, redis_dep, settings_dep
+from app.core.config import Settings, get_settings
+from app.core.rate_limit import AsyncRateLimiter, RateLimitExceededError, RateLimiter
 from app.domain.schemas import SendRequest, SendResponse
-from app.queue.tasks_send import process_email_task
-from app.services.mail_service import MailService
+from app.queue.tasks_send import dispatch_email, dispatch_email_async
+from app.services.mail_service import AsyncMailService, MailService
 
 router = APIRouter(tags=["send"])
 
 
-@router.post("/send", response_model=SendResponse, status_code=status.HTTP_202_ACCEPTED)
 def send_email(
     payload: SendRequest,
+    response: Response,
     db: Session = Depends(db_session_dep),
     settings: Settings = Depends(settings_dep),
     redis_client: Redis = Depends(redis_dep),
@@ -22,10 +24,15 @@ def send_email(
     limiter = RateLimiter(redis_client, settings.rate_limit_window_seconds)
     provider = payload.provider_hint or settings.default_provider
     try:
-        limiter.check_tenant(payload.tenant_id, settings.rate_limit_tenant_per_window)
-        limiter.check_provider(payload.tenant_id, provider, settings.rate_limit_provider_per_window)
+        limit = limiter.check(
+            payload.tenant_id,
+            provider,
+            settings.rate_limit_tenant_per_window,
+            settings.rate_limit_provider_per_window,
+        )
     except RateLimitExceededError as exc:
-        raise HTTPException(status_code=429, detail=str(exc)) from exc
+        raise rate_limited(exc) from exc
+    response.headers["X-RateLimit-Remaining"] = str(limit.remaining)
 
     service = MailService(db)
     try:
@@ -34,9 +41,55 @@ def send_email(
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
     if not reused:
-        if email.status == "scheduled" and email.scheduled_at is not None:
-            process_email_task.apply_async(args=[email.id], eta=email.scheduled_at, queue="mail.scheduled")
-        else:
-            process_email_task.apply_async(args=[email.id], queue="mail.send")
+        dispatch_email(email.id, email.status, email.scheduled_at)
 
     return SendResponse(email_id=email.id, status=email.status, idempotency_reused=reused)
+
+
+async def send_email_async(
+    payload: SendRequest,
+    response: Response,
+    db: AsyncSession = Depends(async_db_session_dep),
+    settings: Settings = Depends(settings_dep),
+    redis_client: aioredis.Redis = Depends(async_redis_dep),
+):
+    limiter = AsyncRateLimiter(redis_client, settings.rate_limit_window_seconds)
+    provider = payload.provider_hint or settings.default_provider
+    try:
+        limit = await limiter.check(
+            payload.tenant_id,
+            provider,
+            settings.rate_limit_tenant_per_window,
+            settings.rate_limit_provider_per_window,
+        )
+    except RateLimitExceededError as exc:
+        raise rate_limited(exc) from exc
+    response.headers["X-RateLimit-Remaining"] = str(limit.remaining)
+
+    service = AsyncMailService(db)
+    try:
+        email, reused = await service.enqueue_send(payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    if not reused:
+        await dispatch_email_async(email.id, email.status, email.scheduled_at)
+
+    return SendResponse(email_id=email.id, status=email.status, idempotency_reused=reused)
+
+
+def rate_limited(exc: RateLimitExceededError) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=str(exc),
+        headers={"Retry-After": str(exc.result.retry_after_seconds), "X-RateLimit-Remaining": "0"},
+    )
+
+
+router.add_api_route(
+    "/send",
+    send_email_async if get_settings().send_api_mode == "async" else send_email,
+    methods=["POST"],
+    response_model=SendResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
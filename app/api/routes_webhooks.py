@@ -1,10 +1,15 @@
 import json
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from redis import Redis
 from sqlalchemy.orm import Session
 
-from app.api.deps import db_session_dep
-from app.services.webhook_service import WebhookService
+from app.api.deps import db_session_dep, redis_dep, settings_dep
+from app.core.config import Settings
+from app.domain.schemas import WebhookBatchResponse
+from app.queue.webhook_stream import WebhookStream
+from app.services.webhook_service import WebhookService, valid_event
 
 router = APIRouter(tags=["webhooks"])
 
@@ -14,6 +19,8 @@ async def provider_webhook(
     provider: str,
     request: Request,
     db: Session = Depends(db_session_dep),
+    settings: Settings = Depends(settings_dep),
+    redis_client: Redis = Depends(redis_dep),
     x_signature: str = Header(alias="X-Signature"),
     x_timestamp: str = Header(alias="X-Timestamp"),
     x_event_id: str = Header(alias="X-Event-Id"),
@@ -26,15 +33,89 @@ async def provider_webhook(
 
     service = WebhookService(db)
     try:
-        service.process_event(
-            provider=provider,
-            payload=body,
-            parsed_payload=payload,
-            signature=x_signature,
-            timestamp=x_timestamp,
-            event_id=x_event_id,
-        )
+        if settings.webhook_ingest_mode == "stream":
+            service.verify(provider, body, x_signature, x_timestamp)
+            if not isinstance(payload, dict) or not valid_event({**payload, "event_id": x_event_id}):
+                raise ValueError("invalid webhook event")
+            stream = WebhookStream(redis_client, settings)
+            await run_in_threadpool(stream.publish, provider, [(x_event_id, body.decode("utf-8"))])
+        else:
+            await run_in_threadpool(
+                service.process_event,
+                provider=provider,
+                payload=body,
+                parsed_payload=payload,
+                signature=x_signature,
+                timestamp=x_timestamp,
+                event_id=x_event_id,
+            )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
     return {"ok": True}
+
+
+@router.post("/webhooks/{provider}/batch", response_model=WebhookBatchResponse)
+async def provider_webhook_batch(
+    provider: str,
+    request: Request,
+    db: Session = Depends(db_session_dep),
+    settings: Settings = Depends(settings_dep),
+    redis_client: Redis = Depends(redis_dep),
+    x_signature: str = Header(alias="X-Signature"),
+    x_timestamp: str = Header(alias="X-Timestamp"),
+):
+    body = await request.body()
+    try:
+        events = json.loads(body.decode("utf-8"))
+    except json.JSONDecodeError as exc:
+        raise HTTPException(status_code=400, detail="invalid json") from exc
+    if not isinstance(events, list):
+        raise HTTPException(status_code=400, detail="batch body must be a JSON array")
+
+    service = WebhookService(db)
+    try:
+        if settings.webhook_ingest_mode == "stream":
+            stream = WebhookStream(redis_client, settings)
+            results = await run_in_threadpool(
+                _publish_batch, service, stream, provider, body, events, x_signature, x_timestamp
+            )
+        else:
+            results = await run_in_threadpool(
+                service.process_batch,
+                provider=provider,
+                payload=body,
+                events=events,
+                signature=x_signature,
+                timestamp=x_timestamp,
+            )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    return WebhookBatchResponse.model_validate({"results": results})
+
+
+def _publish_batch(
+    service: WebhookService,
+    stream: WebhookStream,
+    provider: str,
+    body: bytes,
+    events: list,
+    signature: str,
+    timestamp: str,
+) -> list[dict]:
+    service.verify(provider, body, signature, timestamp)
+    if len(events) > service.settings.webhook_batch_max_events:
+        raise ValueError(f"batch exceeds {service.settings.webhook_batch_max_events} events")
+
+    results: list[dict] = []
+    accepted: list[tuple[str, str]] = []
+    for event in events:
+        if valid_event(event):
+            accepted.append((event["event_id"], json.dumps(event)))
+            results.append({"event_id": event["event_id"], "status": "accepted"})
+        else:
+            results.append({"event_id": None, "status": "invalid"})
+    if accepted:
+        stream.publish(provider, accepted)
+    return results
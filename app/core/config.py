@@ -10,10 +10,26 @@ class Settings(BaseSettings):
     app_name: str = Field(default="mailsystem", alias="APP_NAME")
     app_env: str = Field(default="development", alias="APP_ENV")
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
+    metrics_port: int = Field(default=0, alias="METRICS_PORT")
+    profiling_enabled: bool = Field(default=False, alias="PROFILING_ENABLED")
+    profiling_sample_every: int = Field(default=100, alias="PROFILING_SAMPLE_EVERY")
+    profiling_slow_threshold_ms: int = Field(default=0, alias="PROFILING_SLOW_THRESHOLD_MS")
+    profiling_format: str = Field(default="collapsed", alias="PROFILING_FORMAT")
+    profiling_interval_ms: int = Field(default=5, alias="PROFILING_INTERVAL_MS")
+    profiling_dir: str = Field(default="/tmp/mailsystem-profiles", alias="PROFILING_DIR")
 
     database_url: str = Field(alias="DATABASE_URL")
+    async_database_url: str = Field(default="", alias="ASYNC_DATABASE_URL")
     redis_url: str = Field(alias="REDIS_URL")
 
+    db_pool_size: int = Field(default=10, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=20, alias="DB_MAX_OVERFLOW")
+    db_pool_recycle_seconds: int = Field(default=1800, alias="DB_POOL_RECYCLE_SECONDS")
+    db_pool_timeout_seconds: int = Field(default=30, alias="DB_POOL_TIMEOUT_SECONDS")
+    redis_max_connections: int = Field(default=50, alias="REDIS_MAX_CONNECTIONS")
+    redis_pool_timeout_seconds: int = Field(default=5, alias="REDIS_POOL_TIMEOUT_SECONDS")
+    redis_socket_timeout_seconds: int = Field(default=5, alias="REDIS_SOCKET_TIMEOUT_SECONDS")
+
     default_provider: str = Field(default="smtp", alias="DEFAULT_PROVIDER")
 
     smtp_host: str = Field(default="localhost", alias="SMTP_HOST")
@@ -21,18 +37,86 @@ class Settings(BaseSettings):
     smtp_user: str = Field(default="", alias="SMTP_USER")
     smtp_pass: str = Field(default="", alias="SMTP_PASS")
     smtp_tls: bool = Field(default=False, alias="SMTP_TLS")
+    smtp_timeout_seconds: int = Field(default=15, alias="SMTP_TIMEOUT_SECONDS")
+    smtp_pool_size: int = Field(default=4, alias="SMTP_POOL_SIZE")
+    smtp_pool_max_messages_per_connection: int = Field(default=100, alias="SMTP_POOL_MAX_MESSAGES_PER_CONNECTION")
+    smtp_pool_max_idle_seconds: int = Field(default=60, alias="SMTP_POOL_MAX_IDLE_SECONDS")
+    smtp_pool_max_lifetime_seconds: int = Field(default=600, alias="SMTP_POOL_MAX_LIFETIME_SECONDS")
+    smtp_pool_noop_after_seconds: int = Field(default=5, alias="SMTP_POOL_NOOP_AFTER_SECONDS")
 
     max_retries: int = Field(default=5, alias="MAX_RETRIES")
     retry_base_seconds: int = Field(default=10, alias="RETRY_BASE_SECONDS")
     retry_max_seconds: int = Field(default=900, alias="RETRY_MAX_SECONDS")
 
+    send_dispatch_mode: str = Field(default="single", alias="SEND_DISPATCH_MODE")
+    send_batch_size: int = Field(default=50, alias="SEND_BATCH_SIZE")
+    send_engine_concurrency: int = Field(default=200, alias="SEND_ENGINE_CONCURRENCY")
+    send_engine_poll_seconds: float = Field(default=1.0, alias="SEND_ENGINE_POLL_SECONDS")
+    send_api_mode: str = Field(default="sync", alias="SEND_API_MODE")
+    send_api_publish_threads: int = Field(default=4, alias="SEND_API_PUBLISH_THREADS")
+    send_processing_lease_seconds: int = Field(default=900, alias="SEND_PROCESSING_LEASE_SECONDS")
+    send_processing_reclaim_interval_seconds: float = Field(default=60.0, alias="SEND_PROCESSING_RECLAIM_INTERVAL_SECONDS")
+
     rate_limit_window_seconds: int = Field(default=60, alias="RATE_LIMIT_WINDOW_SECONDS")
     rate_limit_tenant_per_window: int = Field(default=300, alias="RATE_LIMIT_TENANT_PER_WINDOW")
     rate_limit_provider_per_window: int = Field(default=120, alias="RATE_LIMIT_PROVIDER_PER_WINDOW")
 
+    circuit_breaker_enabled: bool = Field(default=False, alias="CIRCUIT_BREAKER_ENABLED")
+    circuit_breaker_failure_threshold: int = Field(default=5, alias="CIRCUIT_BREAKER_FAILURE_THRESHOLD")
+    circuit_breaker_error_rate: float = Field(default=0.5, alias="CIRCUIT_BREAKER_ERROR_RATE")
+    circuit_breaker_min_requests: int = Field(default=20, alias="CIRCUIT_BREAKER_MIN_REQUESTS")
+    circuit_breaker_window_seconds: int = Field(default=60, alias="CIRCUIT_BREAKER_WINDOW_SECONDS")
+    circuit_breaker_open_seconds: int = Field(default=30, alias="CIRCUIT_BREAKER_OPEN_SECONDS")
+    circuit_breaker_probe_timeout_seconds: int = Field(default=30, alias="CIRCUIT_BREAKER_PROBE_TIMEOUT_SECONDS")
+    event_writer_mode: str = Field(default="sync", alias="EVENT_WRITER_MODE")
+    event_writer_batch_size: int = Field(default=500, alias="EVENT_WRITER_BATCH_SIZE")
+    event_writer_flush_interval_seconds: float = Field(default=1.0, alias="EVENT_WRITER_FLUSH_INTERVAL_SECONDS")
+    event_writer_max_buffered: int = Field(default=100000, alias="EVENT_WRITER_MAX_BUFFERED")
+    bulk_staging_chunk_size: int = Field(default=1000, alias="BULK_STAGING_CHUNK_SIZE")
+    bulk_upload_max_errors: int = Field(default=20, alias="BULK_UPLOAD_MAX_ERRORS")
+    bulk_upload_max_record_size: int = Field(default=65536, alias="BULK_UPLOAD_MAX_RECORD_SIZE")
+    bulk_chunk_max_retries: int = Field(default=3, alias="BULK_CHUNK_MAX_RETRIES")
+    scheduler_mode: str = Field(default="eta", alias="SCHEDULER_MODE")
+    scheduler_sweep_interval_seconds: float = Field(default=5.0, alias="SCHEDULER_SWEEP_INTERVAL_SECONDS")
+    scheduler_sweep_batch_size: int = Field(default=500, alias="SCHEDULER_SWEEP_BATCH_SIZE")
+    scheduler_lease_seconds: int = Field(default=300, alias="SCHEDULER_LEASE_SECONDS")
+    pacing_window_seconds: int = Field(default=1, alias="PACING_WINDOW_SECONDS")
+    pacing_provider_per_window: int = Field(default=0, alias="PACING_PROVIDER_PER_WINDOW")
+    pacing_tenant_per_window: int = Field(default=0, alias="PACING_TENANT_PER_WINDOW")
+
+    analytics_rollup_interval_seconds: int = Field(default=300, alias="ANALYTICS_ROLLUP_INTERVAL_SECONDS")
+    analytics_rollup_grace_seconds: int = Field(default=300, alias="ANALYTICS_ROLLUP_GRACE_SECONDS")
+    analytics_rollup_max_hours_per_run: int = Field(default=168, alias="ANALYTICS_ROLLUP_MAX_HOURS_PER_RUN")
+
     webhook_replay_window_seconds: int = Field(default=300, alias="WEBHOOK_REPLAY_WINDOW_SECONDS")
     webhook_secret_smtp: str = Field(default="", alias="WEBHOOK_SECRET_SMTP")
     webhook_secret_mock: str = Field(default="", alias="WEBHOOK_SECRET_MOCK")
+    webhook_batch_max_events: int = Field(default=1000, alias="WEBHOOK_BATCH_MAX_EVENTS")
+    webhook_ingest_mode: str = Field(default="direct", alias="WEBHOOK_INGEST_MODE")
+    webhook_stream_name: str = Field(default="webhooks:events", alias="WEBHOOK_STREAM_NAME")
+    webhook_stream_group: str = Field(default="webhook-appliers", alias="WEBHOOK_STREAM_GROUP")
+    webhook_stream_dead_letter_name: str = Field(default="webhooks:dead", alias="WEBHOOK_STREAM_DEAD_LETTER_NAME")
+    webhook_stream_maxlen: int = Field(default=1000000, alias="WEBHOOK_STREAM_MAXLEN")
+    webhook_stream_batch_size: int = Field(default=200, alias="WEBHOOK_STREAM_BATCH_SIZE")
+    webhook_stream_block_ms: int = Field(default=1000, alias="WEBHOOK_STREAM_BLOCK_MS")
+    webhook_stream_claim_idle_ms: int = Field(default=60000, alias="WEBHOOK_STREAM_CLAIM_IDLE_MS")
+    webhook_stream_max_deliveries: int = Field(default=5, alias="WEBHOOK_STREAM_MAX_DELIVERIES")
+
+    template_cache_size: int = Field(default=512, alias="TEMPLATE_CACHE_SIZE")
+    template_bytecode_cache: str = Field(default="none", alias="TEMPLATE_BYTECODE_CACHE")
+    template_bytecode_cache_dir: str = Field(default="", alias="TEMPLATE_BYTECODE_CACHE_DIR")
+    template_bytecode_cache_ttl_seconds: int = Field(default=86400, alias="TEMPLATE_BYTECODE_CACHE_TTL_SECONDS")
+    template_warmup_tenants: int = Field(default=20, alias="TEMPLATE_WARMUP_TENANTS")
+    template_warmup_limit: int = Field(default=500, alias="TEMPLATE_WARMUP_LIMIT")
+    template_warmup_lookback_hours: int = Field(default=24, alias="TEMPLATE_WARMUP_LOOKBACK_HOURS")
+    render_pool_processes: int = Field(default=0, alias="RENDER_POOL_PROCESSES")
+    render_cache_size: int = Field(default=1000, alias="RENDER_CACHE_SIZE")
+
+    send_context_cache_size: int = Field(default=10000, alias="SEND_CONTEXT_CACHE_SIZE")
+    send_context_cache_ttl_seconds: int = Field(default=30, alias="SEND_CONTEXT_CACHE_TTL_SECONDS")
+    send_context_cache_redis: bool = Field(default=False, alias="SEND_CONTEXT_CACHE_REDIS")
+    idempotency_cache_redis: bool = Field(default=False, alias="IDEMPOTENCY_CACHE_REDIS")
+    idempotency_cache_ttl_seconds: int = Field(default=3600, alias="IDEMPOTENCY_CACHE_TTL_SECONDS")
 
 
 @lru_cache(maxsize=1)
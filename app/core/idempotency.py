@@ -1,7 +1,16 @@
+import json
+from functools import lru_cache
+
+from redis import Redis
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
 from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.config import get_settings
+from app.db.dialect import insert_for
+from app.db.session import get_async_redis, get_redis
 from app.domain.models import Email
 
 
@@ -11,18 +20,127 @@ class IdempotencyResult:
         self.reused = reused
 
 
-def create_or_reuse_email(session: Session, email: Email) -> IdempotencyResult:
-    try:
-        session.add(email)
-        session.commit()
-        session.refresh(email)
-        return IdempotencyResult(email=email, reused=False)
-    except IntegrityError:
-        session.rollback()
-        existing = session.execute(
-            select(Email).where(
-                Email.tenant_id == email.tenant_id,
-                Email.idempotency_key == email.idempotency_key,
+class IdempotencyCache:
+    def __init__(self, redis_client: Redis, ttl_seconds: int) -> None:
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, tenant_id: str, idempotency_key: str) -> Email | None:
+        try:
+            cached = self.redis.get(cache_key(tenant_id, idempotency_key))
+        except RedisError:
+            return None
+        return cached_email(tenant_id, idempotency_key, cached)
+
+    def remember(self, email: Email) -> None:
+        try:
+            self.redis.set(cache_key(email.tenant_id, email.idempotency_key), cache_value(email), ex=self.ttl_seconds)
+        except RedisError:
+            pass
+
+
+class AsyncIdempotencyCache:
+    def __init__(self, redis_client: aioredis.Redis, ttl_seconds: int) -> None:
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, tenant_id: str, idempotency_key: str) -> Email | None:
+        try:
+            cached = await self.redis.get(cache_key(tenant_id, idempotency_key))
+        except RedisError:
+            return None
+        return cached_email(tenant_id, idempotency_key, cached)
+
+    async def remember(self, email: Email) -> None:
+        try:
+            await self.redis.set(
+                cache_key(email.tenant_id, email.idempotency_key), cache_value(email), ex=self.ttl_seconds
             )
-        ).scalar_one()
-        return IdempotencyResult(email=existing, reused=True)
+        except RedisError:
+            pass
+
+
+def cache_key(tenant_id: str, idempotency_key: str) -> str:
+    return f"idem:{tenant_id}:{idempotency_key}"
+
+
+def cache_value(email: Email) -> str:
+    return json.dumps({"id": email.id, "status": email.status})
+
+
+def cached_email(tenant_id: str, idempotency_key: str, cached: str | None) -> Email | None:
+    if cached is None:
+        return None
+    data = json.loads(cached)
+    return Email(id=data["id"], tenant_id=tenant_id, idempotency_key=idempotency_key, status=data["status"])
+
+
+@lru_cache(maxsize=1)
+def get_idempotency_cache() -> IdempotencyCache | None:
+    settings = get_settings()
+    if not settings.idempotency_cache_redis:
+        return None
+    return IdempotencyCache(get_redis(), settings.idempotency_cache_ttl_seconds)
+
+
+@lru_cache(maxsize=1)
+def get_async_idempotency_cache() -> AsyncIdempotencyCache | None:
+    settings = get_settings()
+    if not settings.idempotency_cache_redis:
+        return None
+    return AsyncIdempotencyCache(get_async_redis(), settings.idempotency_cache_ttl_seconds)
+
+
+def create_or_reuse_email(session: Session, email: Email, cache: IdempotencyCache | None = None) -> IdempotencyResult:
+    if cache is not None:
+        cached = cache.get(email.tenant_id, email.idempotency_key)
+        if cached is not None:
+            return IdempotencyResult(email=cached, reused=True)
+
+    inserted = session.scalars(insert_email_statement(session, email)).one_or_none()
+    if inserted is not None:
+        return IdempotencyResult(email=inserted, reused=False)
+
+    existing = session.execute(existing_email_statement(email)).scalar_one()
+    if cache is not None:
+        cache.remember(existing)
+    return IdempotencyResult(email=existing, reused=True)
+
+
+async def create_or_reuse_email_async(
+    session: AsyncSession, email: Email, cache: AsyncIdempotencyCache | None = None
+) -> IdempotencyResult:
+    if cache is not None:
+        cached = await cache.get(email.tenant_id, email.idempotency_key)
+        if cached is not None:
+            return IdempotencyResult(email=cached, reused=True)
+
+    inserted = (await session.scalars(insert_email_statement(session.sync_session, email))).one_or_none()
+    if inserted is not None:
+        return IdempotencyResult(email=inserted, reused=False)
+
+    existing = (await session.execute(existing_email_statement(email))).scalar_one()
+    if cache is not None:
+        await cache.remember(existing)
+    return IdempotencyResult(email=existing, reused=True)
+
+
+def insert_email_statement(session: Session, email: Email):
+    values = {
+        column.key: getattr(email, column.key)
+        for column in Email.__table__.columns
+        if getattr(email, column.key) is not None
+    }
+    return (
+        insert_for(session, Email)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=[Email.tenant_id, Email.idempotency_key])
+        .returning(Email)
+    )
+
+
+def existing_email_statement(email: Email):
+    return select(Email).where(
+        Email.tenant_id == email.tenant_id,
+        Email.idempotency_key == email.idempotency_key,
+    )
@@ -1,8 +1,60 @@
 import logging
 import sys
+import uuid
+from contextvars import ContextVar, Token
 
 from pythonjsonlogger import jsonlogger
 
+TRACE_HEADER = "X-Trace-Id"
+
+_trace_id: ContextVar[str | None] = ContextVar("trace_id", default=None)
+
+
+def get_trace_id() -> str | None:
+    return _trace_id.get()
+
+
+def set_trace_id(trace_id: str | None) -> Token:
+    return _trace_id.set(trace_id)
+
+
+def reset_trace_id(token: Token) -> None:
+    _trace_id.reset(token)
+
+
+class TraceIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "trace_id", None) is None:
+            record.trace_id = _trace_id.get()
+        return True
+
+
+class TraceIdMiddleware:
+    """Tags every log line of an HTTP request with the caller's X-Trace-Id, or a fresh one."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header = TRACE_HEADER.lower().encode()
+        provided = next((value for name, value in scope["headers"] if name == header), b"")
+        trace_id = provided.decode("latin-1")[:64] or uuid.uuid4().hex
+
+        async def send_with_trace(message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", []).append((header, trace_id.encode("latin-1")))
+            await send(message)
+
+        token = set_trace_id(trace_id)
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            reset_trace_id(token)
+
 
 def configure_logging(log_level: str) -> None:
     handler = logging.StreamHandler(sys.stdout)
@@ -10,6 +62,7 @@ def configure_logging(log_level: str) -> None:
         "%(asctime)s %(levelname)s %(name)s %(message)s %(trace_id)s %(tenant_id)s %(email_id)s %(provider)s %(event)s %(attempt)s %(latency_ms)s"
     )
     handler.setFormatter(formatter)
+    handler.addFilter(TraceIdFilter())
 
     root = logging.getLogger()
     root.handlers.clear()
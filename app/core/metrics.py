@@ -0,0 +1,113 @@
+import logging
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+from app.domain.models import Email
+from app.providers.base import ProviderResponse
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LAG_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0, 3600.0, 21600.0, 86400.0)
+
+RENDER_SECONDS = Histogram("mail_render_seconds", "Template render time per email", buckets=LATENCY_BUCKETS)
+PROVIDER_SEND_SECONDS = Histogram(
+    "mail_provider_send_seconds",
+    "Provider send call time",
+    ["provider", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_SECONDS = Histogram("mail_db_seconds", "Send pipeline database time", ["operation"], buckets=LATENCY_BUCKETS)
+ENQUEUE_TO_SEND_SECONDS = Histogram(
+    "mail_enqueue_to_send_seconds",
+    "Time from enqueue (or scheduled time) to provider acceptance",
+    ["provider"],
+    buckets=LAG_BUCKETS,
+)
+STATUS_TRANSITIONS = Counter(
+    "mail_status_transitions_total",
+    "Email status transitions",
+    ["status", "provider", "tenant_id"],
+)
+CACHE_LOOKUPS = Counter("mail_cache_lookups_total", "In-process cache lookups", ["cache", "result"])
+
+
+@contextmanager
+def observe_seconds(histogram: Histogram, **labels: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        (histogram.labels(**labels) if labels else histogram).observe(time.perf_counter() - start)
+
+
+def record_transition(status: str, provider: str | None, tenant_id: str, count: int = 1) -> None:
+    STATUS_TRANSITIONS.labels(status=status, provider=provider or "", tenant_id=tenant_id).inc(count)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def send_outcome(response: ProviderResponse | None) -> str:
+    if response is None:
+        return "error"
+    if response.accepted:
+        return "accepted"
+    return "transient" if response.transient else "rejected"
+
+
+def observe_send(email: Email, response: ProviderResponse | None, seconds: float) -> None:
+    outcome = send_outcome(response)
+    PROVIDER_SEND_SECONDS.labels(provider=email.provider_name, outcome=outcome).observe(seconds)
+    if response is not None and response.accepted:
+        enqueued_at = max(email.created_at, email.scheduled_at or email.created_at)
+        lag = (datetime.utcnow() - enqueued_at).total_seconds()
+        ENQUEUE_TO_SEND_SECONDS.labels(provider=email.provider_name).observe(max(lag, 0.0))
+    logger.info(
+        "provider send",
+        extra={
+            "email_id": email.id,
+            "tenant_id": email.tenant_id,
+            "provider": email.provider_name,
+            "attempt": email.attempt_count + 1,
+            "latency_ms": round(seconds * 1000, 1),
+            "event": outcome,
+        },
+    )
+
+
+def metrics_registry() -> CollectorRegistry:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int) -> None:
+    if port:
+        start_http_server(port, registry=metrics_registry())
+
+
+def mark_process_dead(pid: int) -> None:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,33 @@
+from functools import lru_cache
+
+from app.core.config import get_settings
+from app.core.rate_limit import RateLimiter
+from app.db.session import get_redis
+
+
+class SendPacer:
+    def __init__(self, limiter: RateLimiter, provider_limit: int, tenant_limit: int = 0) -> None:
+        self.limiter = limiter
+        self.provider_limit = provider_limit
+        self.tenant_limit = tenant_limit
+
+    def acquire(self, provider: str, tenant_id: str) -> int:
+        buckets = [(f"pace:provider:{provider}", self.provider_limit)]
+        if self.tenant_limit:
+            buckets.append((f"pace:tenant:{tenant_id}:{provider}", self.tenant_limit))
+        result = self.limiter.consume(buckets)
+        if result.allowed:
+            return 0
+        return max(1, result.retry_after_seconds)
+
+
+@lru_cache(maxsize=1)
+def get_send_pacer() -> SendPacer | None:
+    settings = get_settings()
+    if settings.pacing_provider_per_window <= 0:
+        return None
+    return SendPacer(
+        RateLimiter(get_redis(), settings.pacing_window_seconds),
+        provider_limit=settings.pacing_provider_per_window,
+        tenant_limit=settings.pacing_tenant_per_window,
+    )
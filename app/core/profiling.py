@@ -0,0 +1,259 @@
+import cProfile
+import logging
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from app.core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+PROFILED_TASKS = frozenset(
+    {
+        "app.queue.tasks_send.process_email_task",
+        "app.queue.tasks_send.process_email_batch_task",
+        "app.queue.tasks_bulk.process_bulk_task",
+        "app.queue.tasks_bulk.process_bulk_chunk_task",
+    }
+)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})".replace(";", ":")
+
+
+class StackSampler:
+    """Process-wide sampler over sys._current_frames(); one thread serves every subscribed profile."""
+
+    def __init__(self, interval_seconds: float) -> None:
+        self.interval_seconds = interval_seconds
+        self._subscribers: dict[int, tuple[set[int] | None, Counter[str]]] = {}
+        self._next_key = 0
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def subscribe(self, thread_ids: set[int] | None = None) -> int:
+        with self._lock:
+            self._next_key += 1
+            key = self._next_key
+            self._subscribers[key] = (thread_ids, Counter())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+                self._thread.start()
+        return key
+
+    def unsubscribe(self, key: int) -> Counter[str]:
+        with self._lock:
+            _, samples = self._subscribers.pop(key, (None, Counter()))
+        return samples
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while True:
+            time.sleep(self.interval_seconds)
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+                subscribers = list(self._subscribers.values())
+            wanted: set[int] | None = set()
+            for thread_ids, _ in subscribers:
+                if thread_ids is None:
+                    wanted = None
+                    break
+                wanted |= thread_ids
+
+            stacks: dict[int, str] = {}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (wanted is not None and thread_id not in wanted):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack.append(names.get(thread_id, str(thread_id)))
+                stacks[thread_id] = ";".join(reversed(stack))
+
+            with self._lock:
+                for thread_ids, samples in subscribers:
+                    for thread_id, stack in stacks.items():
+                        if thread_ids is None or thread_id in thread_ids:
+                            samples[stack] += 1
+
+
+@dataclass(slots=True)
+class ProfileSession:
+    label: str
+    sampled: bool
+    started_at: float
+    sample_key: int | None = None
+    profile: cProfile.Profile | None = None
+
+
+class Profiler:
+    def __init__(
+        self,
+        enabled: bool,
+        sample_every: int,
+        slow_threshold_ms: int,
+        output_format: str,
+        interval_ms: int,
+        directory: str,
+    ) -> None:
+        self.enabled = enabled
+        self.sample_every = sample_every
+        self.slow_threshold_ms = slow_threshold_ms
+        self.output_format = output_format
+        self.interval_seconds = interval_ms / 1000
+        self.directory = Path(directory)
+        self.executions = 0
+        self.written = 0
+        self._lock = threading.Lock()
+        self._stats: pstats.Stats | None = None
+        self.sampler = StackSampler(self.interval_seconds)
+
+    def toggle(self, *_args) -> None:
+        self.enabled = not self.enabled
+        logger.warning("profiling toggled", extra={"event": "enabled" if self.enabled else "disabled"})
+
+    def begin(self, label: str, all_threads: bool = False) -> ProfileSession | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            self.executions += 1
+            sampled = self.sample_every > 0 and self.executions % self.sample_every == 0
+        if not sampled and self.slow_threshold_ms <= 0:
+            return None
+
+        session = ProfileSession(label=label, sampled=sampled, started_at=time.perf_counter())
+        # cProfile only sees the calling thread, so whole-process sessions always use the sampler.
+        if self.output_format == "pstats" and not all_threads:
+            session.profile = cProfile.Profile()
+            try:
+                session.profile.enable()
+            except ValueError:
+                # Another profiler is already active on this thread (e.g. an overlapping session).
+                logger.debug("profiler already active, skipping", extra={"event": label})
+                return None
+        else:
+            session.sample_key = self.sampler.subscribe(None if all_threads else {threading.get_ident()})
+        return session
+
+    def end(self, session: ProfileSession | None) -> None:
+        if session is None:
+            return
+        elapsed_ms = (time.perf_counter() - session.started_at) * 1000
+        if session.profile is not None:
+            session.profile.disable()
+        samples = self.sampler.unsubscribe(session.sample_key) if session.sample_key is not None else None
+        if not session.sampled and elapsed_ms < self.slow_threshold_ms:
+            return
+
+        try:
+            self._write(session, samples)
+        except OSError:
+            logger.warning("profile write failed", exc_info=True)
+            return
+        logger.info("profile written", extra={"event": session.label, "latency_ms": round(elapsed_ms, 1)})
+
+    def _write(self, session: ProfileSession, samples: Counter[str] | None) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        pid = os.getpid()
+        with self._lock:
+            if session.profile is not None:
+                if self._stats is None:
+                    self._stats = pstats.Stats(session.profile)
+                else:
+                    self._stats.add(session.profile)
+                self._stats.dump_stats(self.directory / f"profile-{pid}.pstats")
+            elif samples:
+                root = session.label.replace(";", ":")
+                with open(self.directory / f"profile-{pid}.collapsed", "a", encoding="utf-8") as out:
+                    for stack, count in samples.items():
+                        out.write(f"{root};{stack} {count}\n")
+            self.written += 1
+
+    def reset_after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._stats = None
+        # The sampler thread does not survive fork().
+        self.sampler = StackSampler(self.interval_seconds)
+
+
+def build_profiler(settings: Settings) -> Profiler:
+    return Profiler(
+        enabled=settings.profiling_enabled,
+        sample_every=settings.profiling_sample_every,
+        slow_threshold_ms=settings.profiling_slow_threshold_ms,
+        output_format=settings.profiling_format,
+        interval_ms=settings.profiling_interval_ms,
+        directory=settings.profiling_dir,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_profiler() -> Profiler:
+    return build_profiler(get_settings())
+
+
+def install_profiling_signal() -> None:
+    try:
+        signal.signal(signal.SIGUSR2, get_profiler().toggle)
+    except ValueError:
+        logger.warning("profiling signal not installed outside the main thread")
+
+
+class ProfilingMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        profiler = get_profiler()
+        if scope["type"] != "http" or not profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        # Sync endpoints run on threadpool threads, so sample the whole process; concurrent requests
+        # share the one sampler thread and each stack is tagged with the thread it was taken on.
+        session = profiler.begin(f"{scope['method']} {scope['path']}", all_threads=True)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.end(session)
+
+
+_task_sessions: dict[str, ProfileSession] = {}
+
+
+def profile_task_start(task_id: str, task, **kwargs) -> None:
+    profiler = get_profiler()
+    if profiler.enabled and task.name in PROFILED_TASKS:
+        session = profiler.begin(task.name)
+        if session is not None:
+            _task_sessions[task_id] = session
+
+
+def profile_task_end(task_id: str, **kwargs) -> None:
+    session = _task_sessions.pop(task_id, None)
+    if session is not None:
+        get_profiler().end(session)
+
+
+def reset_profiler_after_fork() -> None:
+    _task_sessions.clear()
+    if get_profiler.cache_info().currsize:
+        get_profiler().reset_after_fork()
+
+
+os.register_at_fork(after_in_child=reset_profiler_after_fork)
@@ -1,24 +1,137 @@
+import math
+from dataclasses import dataclass
+
 from redis import Redis
+from redis import asyncio as aioredis
+
+TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local cost = tonumber(ARGV[1])
+local allowed = 1
+local retry_after = 0
+local remaining = -1
+local levels = {}
+
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[2 * i])
+  local window = tonumber(ARGV[2 * i + 1])
+  if capacity <= 0 then
+    levels[i] = 0
+    allowed = 0
+    retry_after = math.max(retry_after, window)
+  else
+    local rate = capacity / window
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if tokens < cost then
+      allowed = 0
+      retry_after = math.max(retry_after, math.ceil((cost - tokens) / rate))
+    end
+  end
+end
+
+for i, key in ipairs(KEYS) do
+  local tokens = levels[i]
+  if allowed == 1 then
+    tokens = tokens - cost
+  end
+  redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+  redis.call('PEXPIRE', key, tonumber(ARGV[2 * i + 1]))
+  local whole = math.floor(tokens)
+  if remaining < 0 or whole < remaining then
+    remaining = whole
+  end
+end
+
+return {allowed, remaining, retry_after}
+"""
+
+
+@dataclass(slots=True)
+class RateLimitResult:
+    allowed: bool
+    remaining: int
+    retry_after_ms: int
+
+    @property
+    def retry_after_seconds(self) -> int:
+        return math.ceil(self.retry_after_ms / 1000)
 
 
 class RateLimitExceededError(RuntimeError):
-    pass
+    def __init__(self, message: str, result: RateLimitResult) -> None:
+        super().__init__(message)
+        self.result = result
 
 
 class RateLimiter:
     def __init__(self, redis_client: Redis, window_seconds: int) -> None:
         self.redis = redis_client
         self.window_seconds = window_seconds
+        self._script = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def consume(self, buckets: list[tuple[str, int]], cost: int = 1) -> RateLimitResult:
+        keys, args = bucket_args(buckets, cost, self.window_seconds)
+        allowed, remaining, retry_after_ms = self._script(keys=keys, args=args)
+        return RateLimitResult(allowed=bool(allowed), remaining=int(remaining), retry_after_ms=int(retry_after_ms))
+
+    def check(self, tenant_id: str, provider: str, tenant_limit: int, provider_limit: int) -> RateLimitResult:
+        return checked(self.consume(send_buckets(tenant_id, provider, tenant_limit, provider_limit)), tenant_id, provider)
+
+    def check_tenant(self, tenant_id: str, limit: int) -> RateLimitResult:
+        return self._check_one(tenant_key(tenant_id), limit)
+
+    def check_provider(self, tenant_id: str, provider: str, limit: int) -> RateLimitResult:
+        return self._check_one(provider_key(tenant_id, provider), limit)
+
+    def _check_one(self, key: str, limit: int) -> RateLimitResult:
+        result = self.consume([(key, limit)])
+        if not result.allowed:
+            raise RateLimitExceededError(f"rate limit exceeded for {key}", result)
+        return result
+
+
+class AsyncRateLimiter:
+    def __init__(self, redis_client: aioredis.Redis, window_seconds: int) -> None:
+        self.redis = redis_client
+        self.window_seconds = window_seconds
+        self._script = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def consume(self, buckets: list[tuple[str, int]], cost: int = 1) -> RateLimitResult:
+        keys, args = bucket_args(buckets, cost, self.window_seconds)
+        allowed, remaining, retry_after_ms = await self._script(keys=keys, args=args)
+        return RateLimitResult(allowed=bool(allowed), remaining=int(remaining), retry_after_ms=int(retry_after_ms))
+
+    async def check(self, tenant_id: str, provider: str, tenant_limit: int, provider_limit: int) -> RateLimitResult:
+        result = await self.consume(send_buckets(tenant_id, provider, tenant_limit, provider_limit))
+        return checked(result, tenant_id, provider)
+
+
+def bucket_args(buckets: list[tuple[str, int]], cost: int, window_seconds: int) -> tuple[list[str], list[int]]:
+    window_ms = window_seconds * 1000
+    args: list[int] = [cost]
+    for _, limit in buckets:
+        args.extend([limit, window_ms])
+    return [key for key, _ in buckets], args
+
+
+def send_buckets(tenant_id: str, provider: str, tenant_limit: int, provider_limit: int) -> list[tuple[str, int]]:
+    return [(tenant_key(tenant_id), tenant_limit), (provider_key(tenant_id, provider), provider_limit)]
+
+
+def checked(result: RateLimitResult, tenant_id: str, provider: str) -> RateLimitResult:
+    if not result.allowed:
+        raise RateLimitExceededError(f"rate limit exceeded for tenant {tenant_id} on {provider}", result)
+    return result
+
 
-    def _consume(self, key: str, limit: int) -> None:
-        count = self.redis.incr(key)
-        if count == 1:
-            self.redis.expire(key, self.window_seconds)
-        if count > limit:
-            raise RateLimitExceededError(f"rate limit exceeded for {key}")
+def tenant_key(tenant_id: str) -> str:
+    return f"rate:bucket:tenant:{tenant_id}"
 
-    def check_tenant(self, tenant_id: str, limit: int) -> None:
-        self._consume(f"rate:tenant:{tenant_id}", limit)
 
-    def check_provider(self, tenant_id: str, provider: str, limit: int) -> None:
-        self._consume(f"rate:provider:{tenant_id}:{provider}", limit)
+def provider_key(tenant_id: str, provider: str) -> str:
+    return f"rate:bucket:provider:{tenant_id}:{provider}"
@@ -0,0 +1,39 @@
+"""baseline schema from 001_init.sql and 002_analytics_rollups.sql
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+"""
+from pathlib import Path
+
+from alembic import op
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+SQL_DIR = Path(__file__).resolve().parents[2] / "migrations"
+SQL_FILES = ("001_init.sql", "002_analytics_rollups.sql")
+
+
+def upgrade() -> None:
+    for name in SQL_FILES:
+        for statement in (SQL_DIR / name).read_text().split(";"):
+            if statement.strip():
+                op.execute(statement)
+
+
+def downgrade() -> None:
+    for table in (
+        "analytics_rollup_state",
+        "email_event_rollups",
+        "dead_letters",
+        "bulk_jobs",
+        "provider_webhook_events",
+        "email_events",
+        "emails",
+        "templates",
+        "tenants",
+    ):
+        op.execute(f"DROP TABLE IF EXISTS {table}")
@@ -0,0 +1,80 @@
+"""indexes for webhook correlation, claim and analytics hot paths
+
+Revision ID: 0002_hot_path_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_hot_path_indexes"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_emails_provider_message_id",
+            "emails",
+            ["provider_message_id"],
+            postgresql_where=sa.text("provider_message_id IS NOT NULL"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "idx_emails_tenant_created_template",
+            "emails",
+            ["tenant_id", "created_at", "template_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "idx_emails_queued_due",
+            "emails",
+            ["created_at", "next_retry_at"],
+            postgresql_where=sa.text("status = 'queued'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "idx_emails_scheduled_due",
+            "emails",
+            ["scheduled_at"],
+            postgresql_where=sa.text("status = 'scheduled'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "idx_email_events_tenant_time_type",
+            "email_events",
+            ["tenant_id", "event_time", "event_type"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "idx_email_events_tenant_event_time",
+            table_name="email_events",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_email_events_tenant_event_time",
+            "email_events",
+            ["tenant_id", "event_time"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name, table in (
+            ("idx_email_events_tenant_time_type", "email_events"),
+            ("idx_emails_scheduled_due", "emails"),
+            ("idx_emails_queued_due", "emails"),
+            ("idx_emails_tenant_created_template", "emails"),
+            ("idx_emails_provider_message_id", "emails"),
+        ):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,36 @@
+"""staged bulk recipients referenced by bulk job id
+
+Revision ID: 0003_bulk_recipient_staging
+Revises: 0002_hot_path_indexes
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0003_bulk_recipient_staging"
+down_revision = "0002_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("bulk_jobs", sa.Column("chunk_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column(
+        "bulk_jobs",
+        sa.Column("request_json", postgresql.JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")),
+    )
+    op.create_table(
+        "bulk_recipient_chunks",
+        sa.Column("bulk_job_id", sa.String(36), sa.ForeignKey("bulk_jobs.id"), primary_key=True),
+        sa.Column("chunk_index", sa.Integer(), primary_key=True),
+        sa.Column("recipient_count", sa.Integer(), nullable=False),
+        sa.Column("recipients_json", postgresql.JSONB(), nullable=False, server_default=sa.text("'[]'::jsonb")),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.text("NOW()")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("bulk_recipient_chunks")
+    op.drop_column("bulk_jobs", "request_json")
+    op.drop_column("bulk_jobs", "chunk_count")
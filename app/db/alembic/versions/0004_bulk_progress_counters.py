@@ -0,0 +1,33 @@
+"""bulk job progress counters and resumable chunks
+
+Revision ID: 0004_bulk_progress_counters
+Revises: 0003_bulk_recipient_staging
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_bulk_progress_counters"
+down_revision = "0003_bulk_recipient_staging"
+branch_labels = None
+depends_on = None
+
+BULK_JOB_COUNTERS = ("sent_count", "failed_count", "skipped_count", "completed_chunks")
+
+
+def upgrade() -> None:
+    for column in BULK_JOB_COUNTERS:
+        op.add_column("bulk_jobs", sa.Column(column, sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("bulk_recipient_chunks", sa.Column("next_offset", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column(
+        "bulk_recipient_chunks", sa.Column("status", sa.String(32), nullable=False, server_default="pending")
+    )
+    op.add_column("emails", sa.Column("bulk_job_id", sa.String(36), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("emails", "bulk_job_id")
+    op.drop_column("bulk_recipient_chunks", "status")
+    op.drop_column("bulk_recipient_chunks", "next_offset")
+    for column in reversed(BULK_JOB_COUNTERS):
+        op.drop_column("bulk_jobs", column)
@@ -0,0 +1,33 @@
+"""index email_events.created_at for the analytics compaction watermark
+
+Revision ID: 0005_event_compaction_watermark
+Revises: 0004_bulk_progress_counters
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0005_event_compaction_watermark"
+down_revision = "0004_bulk_progress_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_email_events_created_at",
+            "email_events",
+            ["created_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_email_events_created_at",
+            table_name="email_events",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
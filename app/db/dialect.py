@@ -0,0 +1,21 @@
+from sqlalchemy import DateTime, Table, func, type_coerce
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+SQLITE_TRUNC_FORMATS = {"hour": "%Y-%m-%d %H:00:00", "day": "%Y-%m-%d 00:00:00"}
+
+
+def insert_for(db: Session, table: Table | type):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"ON CONFLICT inserts are not supported on {dialect}")
+
+
+def date_trunc_for(db: Session, unit: str, column):
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return type_coerce(func.strftime(SQLITE_TRUNC_FORMATS[unit], column), DateTime)
+    return func.date_trunc(unit, column)
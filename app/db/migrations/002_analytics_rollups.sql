@@ -0,0 +1,18 @@
+CREATE TABLE IF NOT EXISTS email_event_rollups (
+  id BIGSERIAL PRIMARY KEY,
+  tenant_id VARCHAR(64) NOT NULL,
+  template_id VARCHAR(64) NOT NULL,
+  provider VARCHAR(64) NOT NULL DEFAULT '',
+  event_type VARCHAR(64) NOT NULL,
+  bucket_start TIMESTAMP NOT NULL,
+  event_count INT NOT NULL DEFAULT 0,
+  CONSTRAINT uq_email_event_rollup UNIQUE (tenant_id, template_id, provider, event_type, bucket_start)
+);
+
+CREATE INDEX IF NOT EXISTS idx_email_event_rollups_tenant_bucket ON email_event_rollups(tenant_id, bucket_start);
+
+CREATE TABLE IF NOT EXISTS analytics_rollup_state (
+  name VARCHAR(64) PRIMARY KEY,
+  compacted_until TIMESTAMP NOT NULL,
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
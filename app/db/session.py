@@ -1,18 +1,121 @@
+import os
+import time
+from dataclasses import asdict, dataclass
 from functools import lru_cache
+from threading import Lock
 
-from redis import Redis
+from redis import BlockingConnectionPool, Redis
+from redis import asyncio as aioredis
 from sqlalchemy import Engine, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+psycopg",
+    "postgresql+psycopg": "postgresql+psycopg",
+    "postgresql+psycopg2": "postgresql+psycopg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+@dataclass(slots=True)
+class PoolStats:
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+
+class TimedQueuePool(QueuePool):
+    # Engine.dispose() recreates the pool, so the post-fork dispose also starts fresh stats.
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+        self._stats_lock = Lock()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.stats.checkouts += 1
+                self.stats.wait_seconds_total += waited
+                self.stats.wait_seconds_max = max(self.stats.wait_seconds_max, waited)
+
+
+class CountingBlockingConnectionPool(BlockingConnectionPool):
+    """Blocking Redis pool that counts connections it creates and hands out."""
+
+    def reset(self) -> None:
+        # Also runs from __init__ and after fork, so counters always match the pool's connections.
+        self._stats_lock = Lock()
+        self.created = 0
+        self.in_use = 0
+        self.checkouts = 0
+        super().reset()
+
+    def make_connection(self):
+        connection = super().make_connection()
+        with self._stats_lock:
+            self.created += 1
+        return connection
+
+    def get_connection(self, *args, **kwargs):
+        connection = super().get_connection(*args, **kwargs)
+        with self._stats_lock:
+            self.checkouts += 1
+            self.in_use += 1
+        return connection
+
+    def release(self, connection) -> None:
+        with self._stats_lock:
+            self.in_use = max(0, self.in_use - 1)
+        super().release(connection)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "max_connections": self.max_connections,
+                "created": self.created,
+                "idle": self.created - self.in_use,
+                "in_use": self.in_use,
+                "checkouts": self.checkouts,
+            }
+
+
+def _pool_options(settings: Settings, database_url: str) -> dict:
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+    }
 
 
 @lru_cache(maxsize=1)
 def get_engine() -> Engine:
     settings = get_settings()
-    return create_engine(settings.database_url, pool_pre_ping=True, future=True)
+    options = _pool_options(settings, settings.database_url)
+    if options:
+        options["poolclass"] = TimedQueuePool
+    return create_engine(settings.database_url, pool_pre_ping=True, future=True, **options)
 
 
+@lru_cache(maxsize=1)
 def get_session_factory() -> sessionmaker:
     return sessionmaker(bind=get_engine(), autoflush=False, autocommit=False, class_=Session)
 
@@ -25,6 +128,107 @@ def get_db_session():
         db.close()
 
 
+async def get_async_db_session():
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+def async_database_url(database_url: str) -> str:
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    settings = get_settings()
+    database_url = settings.async_database_url or async_database_url(settings.database_url)
+    return create_async_engine(database_url, pool_pre_ping=True, **_pool_options(settings, database_url))
+
+
+@lru_cache(maxsize=1)
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(bind=get_async_engine(), autoflush=False, expire_on_commit=False)
+
+
+@lru_cache(maxsize=1)
+def get_redis_pool() -> CountingBlockingConnectionPool:
+    settings = get_settings()
+    return CountingBlockingConnectionPool.from_url(
+        settings.redis_url,
+        decode_responses=True,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout_seconds,
+        socket_timeout=settings.redis_socket_timeout_seconds,
+        socket_connect_timeout=settings.redis_socket_timeout_seconds,
+        health_check_interval=30,
+    )
+
+
+@lru_cache(maxsize=1)
 def get_redis() -> Redis:
+    return Redis(connection_pool=get_redis_pool())
+
+
+@lru_cache(maxsize=1)
+def get_async_redis_pool() -> aioredis.BlockingConnectionPool:
     settings = get_settings()
-    return Redis.from_url(settings.redis_url, decode_responses=True)
+    return aioredis.BlockingConnectionPool.from_url(
+        settings.redis_url,
+        decode_responses=True,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout_seconds,
+        socket_timeout=settings.redis_socket_timeout_seconds,
+        socket_connect_timeout=settings.redis_socket_timeout_seconds,
+        health_check_interval=30,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_async_redis() -> aioredis.Redis:
+    return aioredis.Redis(connection_pool=get_async_redis_pool())
+
+
+def reset_pools_after_fork() -> None:
+    if get_engine.cache_info().currsize:
+        get_engine().dispose(close=False)
+    if get_async_engine.cache_info().currsize:
+        get_async_engine().sync_engine.dispose(close=False)
+    if get_redis_pool.cache_info().currsize:
+        get_redis_pool().reset()
+    if get_async_redis_pool.cache_info().currsize:
+        get_async_redis_pool.cache_clear()
+    # The cached client holds the parent's pool, so drop it together with the pool.
+    get_async_redis.cache_clear()
+
+
+def get_pool_stats() -> dict:
+    stats: dict = {}
+    if get_engine.cache_info().currsize:
+        stats["db"] = db_pool_stats(get_engine().pool)
+    if get_redis_pool.cache_info().currsize:
+        stats["redis"] = redis_pool_stats(get_redis_pool())
+    return stats
+
+
+def db_pool_stats(pool) -> dict:
+    stats = {"status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    if isinstance(pool, TimedQueuePool):
+        with pool._stats_lock:
+            stats.update(asdict(pool.stats))
+    return stats
+
+
+def redis_pool_stats(pool: BlockingConnectionPool) -> dict:
+    if isinstance(pool, CountingBlockingConnectionPool):
+        return pool.stats()
+    return {"max_connections": pool.max_connections}
+
+os.register_at_fork(after_in_child=reset_pools_after_fork)
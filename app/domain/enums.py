@@ -26,7 +26,13 @@ class EventType(StrEnum):
     dead_lettered = "dead_lettered"
 
 
+class BulkChunkStatus(StrEnum):
+    pending = "pending"
+    complete = "complete"
+
+
 class BulkStatus(StrEnum):
+    receiving = "receiving"
     queued = "queued"
     processing = "processing"
     complete = "complete"
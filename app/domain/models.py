@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import JSON, Boolean, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import JSON, Boolean, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -33,7 +33,29 @@ class Template(Base):
 
 class Email(Base):
     __tablename__ = "emails"
-    __table_args__ = (UniqueConstraint("tenant_id", "idempotency_key", name="uq_email_tenant_idempotency"),)
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "idempotency_key", name="uq_email_tenant_idempotency"),
+        Index(
+            "idx_emails_provider_message_id",
+            "provider_message_id",
+            postgresql_where=text("provider_message_id IS NOT NULL"),
+            sqlite_where=text("provider_message_id IS NOT NULL"),
+        ),
+        Index("idx_emails_tenant_created_template", "tenant_id", "created_at", "template_id"),
+        Index(
+            "idx_emails_queued_due",
+            "created_at",
+            "next_retry_at",
+            postgresql_where=text("status = 'queued'"),
+            sqlite_where=text("status = 'queued'"),
+        ),
+        Index(
+            "idx_emails_scheduled_due",
+            "scheduled_at",
+            postgresql_where=text("status = 'scheduled'"),
+            sqlite_where=text("status = 'scheduled'"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     tenant_id: Mapped[str] = mapped_column(ForeignKey("tenants.id"), nullable=False, index=True)
@@ -54,6 +76,7 @@ class Email(Base):
     failure_reason: Mapped[str | None] = mapped_column(Text, nullable=True)
     attempt_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     next_retry_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    bulk_job_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
@@ -62,10 +85,14 @@ class Email(Base):
 
 class EmailEvent(Base):
     __tablename__ = "email_events"
+    __table_args__ = (
+        Index("idx_email_events_tenant_time_type", "tenant_id", "event_time", "event_type"),
+        Index("idx_email_events_created_at", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     email_id: Mapped[str] = mapped_column(ForeignKey("emails.id"), nullable=False, index=True)
-    tenant_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    tenant_id: Mapped[str] = mapped_column(String(64), nullable=False)
     event_type: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
     event_time: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     provider: Mapped[str | None] = mapped_column(String(64), nullable=True)
@@ -97,10 +124,28 @@ class BulkJob(Base):
     template_id: Mapped[str] = mapped_column(String(64), nullable=False)
     total_count: Mapped[int] = mapped_column(Integer, nullable=False)
     queued_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sent_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    skipped_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    chunk_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completed_chunks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    request_json: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
     status: Mapped[str] = mapped_column(String(32), nullable=False, default="queued")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
 
+class BulkRecipientChunk(Base):
+    __tablename__ = "bulk_recipient_chunks"
+
+    bulk_job_id: Mapped[str] = mapped_column(ForeignKey("bulk_jobs.id"), primary_key=True)
+    chunk_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    recipient_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    next_offset: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    status: Mapped[str] = mapped_column(String(32), nullable=False, default="pending")
+    recipients_json: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 class DeadLetter(Base):
     __tablename__ = "dead_letters"
 
@@ -111,3 +156,29 @@ class DeadLetter(Base):
     attempt_count: Mapped[int] = mapped_column(Integer, nullable=False)
     moved_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     payload_json: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+
+
+class EmailEventRollup(Base):
+    __tablename__ = "email_event_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "tenant_id", "template_id", "provider", "event_type", "bucket_start", name="uq_email_event_rollup"
+        ),
+        Index("idx_email_event_rollups_tenant_bucket", "tenant_id", "bucket_start"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    tenant_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    template_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    provider: Mapped[str] = mapped_column(String(64), nullable=False, default="")
+    event_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    event_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class AnalyticsRollupState(Base):
+    __tablename__ = "analytics_rollup_state"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    compacted_until: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -31,12 +31,14 @@ class BulkRecipient(BaseModel):
     name: str | None = None
 
 
-class BulkSendRequest(BaseModel):
+class StagedRecipient(BulkRecipient):
+    variables: dict[str, Any] = Field(default_factory=dict)
+
+
+class BulkJobSpec(BaseModel):
     tenant_id: str
     template_id: str
-    recipients: list[BulkRecipient]
     shared_variables: dict[str, Any] = Field(default_factory=dict)
-    per_recipient_variables: dict[str, dict[str, Any]] = Field(default_factory=dict)
     metadata: dict[str, Any] = Field(default_factory=dict)
     batch_size: int = Field(default=100, ge=1, le=1000)
     provider_hint: str | None = None
@@ -44,11 +46,43 @@ class BulkSendRequest(BaseModel):
     idempotency_key: str
 
 
+class BulkSendRequest(BulkJobSpec):
+    recipients: list[BulkRecipient]
+    per_recipient_variables: dict[str, dict[str, Any]] = Field(default_factory=dict)
+
+
 class BulkSendResponse(BaseModel):
     bulk_id: str
     queued_count: int
 
 
+class BulkUploadError(BaseModel):
+    line: int
+    error: str
+
+
+class BulkUploadResponse(BulkSendResponse):
+    rejected_count: int
+    errors: list[BulkUploadError]
+
+
+class BulkJobResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    tenant_id: str
+    template_id: str
+    status: str
+    total_count: int
+    queued_count: int
+    sent_count: int
+    failed_count: int
+    skipped_count: int
+    chunk_count: int
+    completed_chunks: int
+    created_at: datetime
+
+
 class EmailResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -80,6 +114,15 @@ class WebhookEventPayload(BaseModel):
     payload: dict[str, Any] = Field(default_factory=dict)
 
 
+class WebhookBatchResult(BaseModel):
+    event_id: str | None
+    status: str
+
+
+class WebhookBatchResponse(BaseModel):
+    results: list[WebhookBatchResult]
+
+
 class AnalyticsResponse(BaseModel):
     totals: dict[str, int]
     rates: dict[str, float]
@@ -1,5 +1,6 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from redis.exceptions import RedisError
 from sqlalchemy import text
 
 from app.api.routes_analytics import router as analytics_router
@@ -8,9 +9,16 @@ from app.api.routes_emails import router as emails_router
 from app.api.routes_send import router as send_router
 from app.api.routes_webhooks import router as webhooks_router
 from app.core.config import get_settings
-from app.core.logging import configure_logging
+from app.core.logging import TraceIdMiddleware, configure_logging
+from app.core.metrics import render_metrics
+from app.core.profiling import ProfilingMiddleware, install_profiling_signal
 from app.db.base import Base
-from app.db.session import get_engine, get_redis
+from app.db.session import get_engine, get_pool_stats, get_redis
+from app.providers.circuit_breaker import get_circuit_breaker
+from app.providers.registry import registry
+from app.queue.webhook_stream import get_webhook_stream
+from app.services.event_writer import close_event_writer, get_event_writer
+from app.templates.render_stage import get_render_stage
 
 settings = get_settings()
 configure_logging(settings.log_level)
@@ -23,11 +31,21 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(TraceIdMiddleware)
 
 
 @app.on_event("startup")
 def startup() -> None:
-    Base.metadata.create_all(bind=get_engine())
+    # PostgreSQL schemas are owned by Alembic; create_all would race the migrations and skip new columns.
+    if get_engine().dialect.name == "sqlite":
+        Base.metadata.create_all(bind=get_engine())
+    install_profiling_signal()
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    close_event_writer()
 
 
 @app.get("/health/live")
@@ -51,7 +69,47 @@ def health_ready():
     except Exception:
         redis_ok = False
 
-    return {"status": "ok" if db_ok and redis_ok else "degraded", "db": db_ok, "redis": redis_ok}
+    providers = {}
+    breaker = get_circuit_breaker()
+    if breaker is not None and redis_ok:
+        providers = {name: breaker.state(name) for name in registry.names()}
+
+    return {
+        "status": "ok" if db_ok and redis_ok else "degraded",
+        "db": db_ok,
+        "redis": redis_ok,
+        "providers": providers,
+    }
+
+
+@app.get("/health/pools")
+def health_pools():
+    return get_pool_stats()
+
+
+@app.get("/health/events")
+def health_events():
+    writer = get_event_writer()
+    return {"mode": settings.event_writer_mode, "writer": writer.snapshot() if writer else None}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
+
+
+@app.get("/health/render")
+def health_render():
+    return get_render_stage().stats()
+
+
+@app.get("/health/webhooks")
+def health_webhooks():
+    try:
+        return {"status": "ok", **get_webhook_stream().stats()}
+    except RedisError:
+        return {"status": "degraded"}
 
 
 app.include_router(send_router)
@@ -1,3 +1,4 @@
+import asyncio
 from dataclasses import dataclass
 
 
@@ -28,3 +29,6 @@ class ProviderAdapter:
 
     def send(self, email: EmailMessage) -> ProviderResponse:
         raise NotImplementedError
+
+    async def send_async(self, email: EmailMessage) -> ProviderResponse:
+        return await asyncio.to_thread(self.send, email)
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+
+from redis import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import Settings, get_settings
+from app.db.session import get_redis
+from app.providers.base import EmailMessage, ProviderAdapter, ProviderResponse
+
+logger = logging.getLogger(__name__)
+
+ALLOW_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'state', 'open_until')
+if state[1] ~= 'open' then
+  return {1, 0, 0}
+end
+local open_until = tonumber(state[2]) or 0
+if now < open_until then
+  return {0, 0, open_until - now}
+end
+if redis.call('SET', KEYS[2], '1', 'NX', 'PX', tonumber(ARGV[1])) then
+  return {1, 1, 0}
+end
+return {0, 0, math.max(redis.call('PTTL', KEYS[2]), 1)}
+"""
+
+RECORD_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local ok = tonumber(ARGV[1]) == 1
+local probe = tonumber(ARGV[2]) == 1
+local threshold = tonumber(ARGV[3])
+local error_rate = tonumber(ARGV[4])
+local min_requests = tonumber(ARGV[5])
+local window_ms = tonumber(ARGV[6])
+local open_ms = tonumber(ARGV[7])
+
+local h = redis.call('HMGET', KEYS[1], 'state', 'failures', 'window_start', 'window_total', 'window_errors')
+local state = h[1] or 'closed'
+local failures = tonumber(h[2]) or 0
+local window_start = tonumber(h[3]) or now
+local total = tonumber(h[4]) or 0
+local errors = tonumber(h[5]) or 0
+if now - window_start >= window_ms then
+  window_start = now
+  total = 0
+  errors = 0
+end
+total = total + 1
+
+if ok then
+  failures = 0
+  if probe then
+    state = 'closed'
+    total = 0
+    errors = 0
+    window_start = now
+    redis.call('DEL', KEYS[2])
+  end
+else
+  failures = failures + 1
+  errors = errors + 1
+  local tripped = failures >= threshold or (total >= min_requests and errors / total >= error_rate)
+  if probe or (state ~= 'open' and tripped) then
+    state = 'open'
+    failures = 0
+    total = 0
+    errors = 0
+    window_start = now
+    redis.call('HSET', KEYS[1], 'open_until', now + open_ms)
+    redis.call('DEL', KEYS[2])
+  end
+end
+
+redis.call('HSET', KEYS[1], 'state', state, 'failures', failures,
+  'window_start', window_start, 'window_total', total, 'window_errors', errors)
+redis.call('PEXPIRE', KEYS[1], math.max(window_ms, open_ms) * 10)
+return state
+"""
+
+
+@dataclass(slots=True)
+class BreakerDecision:
+    allowed: bool
+    probe: bool
+    retry_after_ms: int
+
+    @property
+    def retry_after_seconds(self) -> int:
+        return max(1, math.ceil(self.retry_after_ms / 1000))
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, provider: str, decision: BreakerDecision) -> None:
+        super().__init__(f"circuit open for provider {provider}")
+        self.provider = provider
+        self.decision = decision
+
+    @property
+    def retry_after_seconds(self) -> int:
+        return self.decision.retry_after_seconds
+
+
+class CircuitBreaker:
+    def __init__(self, redis_client: Redis, settings: Settings) -> None:
+        self.redis = redis_client
+        self.failure_threshold = settings.circuit_breaker_failure_threshold
+        self.error_rate = settings.circuit_breaker_error_rate
+        self.min_requests = settings.circuit_breaker_min_requests
+        self.window_ms = settings.circuit_breaker_window_seconds * 1000
+        self.open_ms = settings.circuit_breaker_open_seconds * 1000
+        self.probe_timeout_ms = settings.circuit_breaker_probe_timeout_seconds * 1000
+        self._allow = redis_client.register_script(ALLOW_SCRIPT)
+        self._record = redis_client.register_script(RECORD_SCRIPT)
+
+    # A Redis outage must not stop sending, so both calls fail open.
+    def allow(self, provider: str) -> BreakerDecision:
+        try:
+            allowed, probe, retry_after_ms = self._allow(keys=self._keys(provider), args=[self.probe_timeout_ms])
+        except RedisError:
+            logger.warning("circuit breaker unavailable, allowing send", extra={"provider": provider}, exc_info=True)
+            return BreakerDecision(allowed=True, probe=False, retry_after_ms=0)
+        return BreakerDecision(allowed=bool(allowed), probe=bool(probe), retry_after_ms=int(retry_after_ms))
+
+    def record(self, provider: str, healthy: bool, probe: bool = False) -> str | None:
+        try:
+            return self._record(
+                keys=self._keys(provider),
+                args=[
+                    int(healthy),
+                    int(probe),
+                    self.failure_threshold,
+                    self.error_rate,
+                    self.min_requests,
+                    self.window_ms,
+                    self.open_ms,
+                ],
+            )
+        except RedisError:
+            logger.warning("circuit breaker unavailable, result not recorded", extra={"provider": provider}, exc_info=True)
+            return None
+
+    def state(self, provider: str) -> dict:
+        state, failures, open_until = self.redis.hmget(self._keys(provider)[0], "state", "failures", "open_until")
+        return {
+            "state": state or "closed",
+            "consecutive_failures": int(failures or 0),
+            "open_until_ms": int(open_until) if open_until and state == "open" else None,
+        }
+
+    def _keys(self, provider: str) -> list[str]:
+        return [f"breaker:{provider}", f"breaker:{provider}:probe"]
+
+
+# Only transport-level failures count against the provider; per-recipient 4xx replies (greylisting,
+# full mailbox) are the recipient's problem and must not open the circuit for everyone.
+PROVIDER_FAILURE_CODES = frozenset({"transport_error", "421"})
+
+
+def is_provider_failure(response: ProviderResponse) -> bool:
+    return not response.accepted and response.error_code in PROVIDER_FAILURE_CODES
+
+
+class CircuitBreakerAdapter(ProviderAdapter):
+    def __init__(self, adapter: ProviderAdapter, breaker: CircuitBreaker) -> None:
+        self.adapter = adapter
+        self.breaker = breaker
+        self.name = adapter.name
+
+    def send(self, email: EmailMessage) -> ProviderResponse:
+        decision = self._admit()
+        try:
+            response = self.adapter.send(email)
+        except Exception:
+            self.breaker.record(self.name, healthy=False, probe=decision.probe)
+            raise
+        self.breaker.record(self.name, healthy=not is_provider_failure(response), probe=decision.probe)
+        return response
+
+    async def send_async(self, email: EmailMessage) -> ProviderResponse:
+        decision = await asyncio.to_thread(self._admit)
+        try:
+            response = await self.adapter.send_async(email)
+        except Exception:
+            await asyncio.to_thread(self.breaker.record, self.name, False, decision.probe)
+            raise
+        await asyncio.to_thread(self.breaker.record, self.name, not is_provider_failure(response), decision.probe)
+        return response
+
+    def _admit(self) -> BreakerDecision:
+        decision = self.breaker.allow(self.name)
+        if not decision.allowed:
+            raise CircuitOpenError(self.name, decision)
+        return decision
+
+
+@lru_cache(maxsize=1)
+def get_circuit_breaker() -> CircuitBreaker | None:
+    settings = get_settings()
+    if not settings.circuit_breaker_enabled:
+        return None
+    return CircuitBreaker(get_redis(), settings)
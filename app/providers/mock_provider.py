@@ -24,3 +24,6 @@ class MockProvider(ProviderAdapter):
             raw_status="mock_sent",
             transient=False,
         )
+
+    async def send_async(self, email: EmailMessage) -> ProviderResponse:
+        return self.send(email)
@@ -1,5 +1,6 @@
 from app.core.config import get_settings
 from app.providers.base import ProviderAdapter
+from app.providers.circuit_breaker import CircuitBreakerAdapter, get_circuit_breaker
 from app.providers.mock_provider import MockProvider
 from app.providers.smtp_provider import SMTPProvider
 
@@ -16,7 +17,13 @@ class ProviderRegistry:
         provider = self._providers.get(name)
         if not provider:
             raise KeyError(f"unknown provider {name}")
+        breaker = get_circuit_breaker()
+        if breaker is not None:
+            return CircuitBreakerAdapter(provider, breaker)
         return provider
 
+    def names(self) -> list[str]:
+        return list(self._providers)
+
 
 registry = ProviderRegistry()
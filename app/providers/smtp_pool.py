@@ -0,0 +1,220 @@
+import asyncio
+import os
+import smtplib
+import ssl
+import time
+from collections import deque
+from dataclasses import dataclass
+from threading import Lock
+
+from app.core.config import Settings
+
+try:
+    import aiosmtplib
+except ImportError:
+    aiosmtplib = None
+
+
+@dataclass(slots=True)
+class PooledConnection:
+    server: smtplib.SMTP
+    created_at: float
+    last_used_at: float
+    messages_sent: int = 0
+
+
+class SMTPConnectionPool:
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self.connects = 0
+        self.reuses = 0
+        self.discards = 0
+        self._idle: deque[PooledConnection] = deque()
+        self._lock = Lock()
+        self._pid = os.getpid()
+
+    def acquire(self) -> PooledConnection:
+        self._reset_after_fork()
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._connect()
+            if self._usable(conn):
+                self.reuses += 1
+                return conn
+            self.discard(conn)
+
+    def release(self, conn: PooledConnection) -> None:
+        conn.last_used_at = time.monotonic()
+        if conn.messages_sent < self.settings.smtp_pool_max_messages_per_connection:
+            with self._lock:
+                if len(self._idle) < self.settings.smtp_pool_size:
+                    self._idle.append(conn)
+                    return
+        self._close(conn)
+
+    def discard(self, conn: PooledConnection) -> None:
+        self.discards += 1
+        self._close(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            self._close(conn)
+
+    def stats(self) -> dict:
+        with self._lock:
+            idle = len(self._idle)
+        return {"idle": idle, "connects": self.connects, "reuses": self.reuses, "discards": self.discards}
+
+    def _connect(self) -> PooledConnection:
+        settings = self.settings
+        if settings.smtp_tls:
+            server = smtplib.SMTP_SSL(
+                settings.smtp_host,
+                settings.smtp_port,
+                context=ssl.create_default_context(),
+                timeout=settings.smtp_timeout_seconds,
+            )
+        else:
+            server = smtplib.SMTP(settings.smtp_host, settings.smtp_port, timeout=settings.smtp_timeout_seconds)
+        try:
+            if settings.smtp_user:
+                server.login(settings.smtp_user, settings.smtp_pass)
+        except Exception:
+            server.close()
+            raise
+        self.connects += 1
+        now = time.monotonic()
+        return PooledConnection(server=server, created_at=now, last_used_at=now)
+
+    def _usable(self, conn: PooledConnection) -> bool:
+        settings = self.settings
+        now = time.monotonic()
+        if now - conn.last_used_at > settings.smtp_pool_max_idle_seconds:
+            return False
+        if now - conn.created_at > settings.smtp_pool_max_lifetime_seconds:
+            return False
+        if now - conn.last_used_at < settings.smtp_pool_noop_after_seconds:
+            return True
+        try:
+            code, _ = conn.server.noop()
+        except (OSError, smtplib.SMTPException):
+            return False
+        return code == 250
+
+    def _close(self, conn: PooledConnection) -> None:
+        try:
+            conn.server.quit()
+        except (OSError, smtplib.SMTPException):
+            conn.server.close()
+
+    def _reset_after_fork(self) -> None:
+        pid = os.getpid()
+        if pid == self._pid:
+            return
+        with self._lock:
+            self._idle = deque()
+            self._pid = pid
+
+
+@dataclass(slots=True)
+class AsyncPooledConnection:
+    client: object
+    created_at: float
+    last_used_at: float
+    messages_sent: int = 0
+
+
+class AsyncSMTPConnectionPool:
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self.connects = 0
+        self.reuses = 0
+        self.discards = 0
+        self._idle: deque[AsyncPooledConnection] = deque()
+        # Caps open sessions, not just idle ones, so engine concurrency queues here instead of reconnecting.
+        self._slots = asyncio.Semaphore(max(1, settings.smtp_pool_size))
+
+    async def acquire(self) -> AsyncPooledConnection:
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                conn = self._idle.pop()
+                if await self._usable(conn):
+                    self.reuses += 1
+                    return conn
+                self.discards += 1
+                await self._close(conn)
+            return await self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def release(self, conn: AsyncPooledConnection) -> None:
+        conn.last_used_at = time.monotonic()
+        try:
+            if (
+                conn.messages_sent < self.settings.smtp_pool_max_messages_per_connection
+                and len(self._idle) < self.settings.smtp_pool_size
+            ):
+                self._idle.append(conn)
+                return
+            await self._close(conn)
+        finally:
+            self._slots.release()
+
+    async def discard(self, conn: AsyncPooledConnection) -> None:
+        self.discards += 1
+        try:
+            await self._close(conn)
+        finally:
+            self._slots.release()
+
+    async def close(self) -> None:
+        idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            await self._close(conn)
+
+    async def _connect(self) -> AsyncPooledConnection:
+        settings = self.settings
+        client = aiosmtplib.SMTP(
+            hostname=settings.smtp_host,
+            port=settings.smtp_port,
+            use_tls=settings.smtp_tls,
+            start_tls=False,
+            timeout=settings.smtp_timeout_seconds,
+        )
+        await client.connect()
+        try:
+            if settings.smtp_user:
+                await client.login(settings.smtp_user, settings.smtp_pass)
+        except Exception:
+            client.close()
+            raise
+        self.connects += 1
+        now = time.monotonic()
+        return AsyncPooledConnection(client=client, created_at=now, last_used_at=now)
+
+    async def _usable(self, conn: AsyncPooledConnection) -> bool:
+        settings = self.settings
+        now = time.monotonic()
+        if now - conn.last_used_at > settings.smtp_pool_max_idle_seconds:
+            return False
+        if now - conn.created_at > settings.smtp_pool_max_lifetime_seconds:
+            return False
+        if now - conn.last_used_at < settings.smtp_pool_noop_after_seconds:
+            return True
+        try:
+            response = await conn.client.noop()
+        except (OSError, aiosmtplib.SMTPException):
+            return False
+        return response.code == 250
+
+    async def _close(self, conn: AsyncPooledConnection) -> None:
+        try:
+            await conn.client.quit()
+        except (OSError, aiosmtplib.SMTPException):
+            conn.client.close()
@@ -1,10 +1,12 @@
 import smtplib
-import ssl
 import uuid
 from email.message import EmailMessage as SMTPEmailMessage
 
 from app.core.config import Settings
 from app.providers.base import EmailMessage, ProviderAdapter, ProviderResponse
+from app.providers.smtp_pool import AsyncSMTPConnectionPool, SMTPConnectionPool, aiosmtplib
+
+SERVICE_NOT_AVAILABLE = 421
 
 
 class SMTPProvider(ProviderAdapter):
@@ -12,49 +14,125 @@ class SMTPProvider(ProviderAdapter):
 
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
+        self.pool = SMTPConnectionPool(settings)
+        self.async_pool = AsyncSMTPConnectionPool(settings) if aiosmtplib is not None else None
 
     def send(self, email: EmailMessage) -> ProviderResponse:
+        msg = self._build_message(email)
+        reconnected = False
+        while True:
+            conn = None
+            try:
+                conn = self.pool.acquire()
+                conn.server.send_message(msg)
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as exc:
+                code, message = _rejection(exc)
+                if conn is not None:
+                    # smtplib resets the transaction after a rejection; only 421 means the session is gone.
+                    if code == SERVICE_NOT_AVAILABLE:
+                        self.pool.discard(conn)
+                    else:
+                        self.pool.release(conn)
+                if code == SERVICE_NOT_AVAILABLE and conn is not None and conn.messages_sent and not reconnected:
+                    reconnected = True
+                    continue
+                return _response_error(code, message)
+            except (TimeoutError, OSError, smtplib.SMTPException) as exc:
+                if conn is not None:
+                    self.pool.discard(conn)
+                    if conn.messages_sent and not reconnected:
+                        reconnected = True
+                        continue
+                return _transport_error(exc)
+
+            conn.messages_sent += 1
+            self.pool.release(conn)
+            return _accepted()
+
+    async def send_async(self, email: EmailMessage) -> ProviderResponse:
+        if self.async_pool is None:
+            return await super().send_async(email)
+
+        msg = self._build_message(email)
+        reconnected = False
+        while True:
+            conn = None
+            try:
+                conn = await self.async_pool.acquire()
+                await conn.client.send_message(msg)
+            except (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused) as exc:
+                code, message = _async_rejection(exc)
+                if conn is not None:
+                    if code == SERVICE_NOT_AVAILABLE:
+                        await self.async_pool.discard(conn)
+                    else:
+                        await self.async_pool.release(conn)
+                if code == SERVICE_NOT_AVAILABLE and conn is not None and conn.messages_sent and not reconnected:
+                    reconnected = True
+                    continue
+                return _response_error(code, message)
+            except (TimeoutError, OSError, aiosmtplib.SMTPException) as exc:
+                if conn is not None:
+                    await self.async_pool.discard(conn)
+                    if conn.messages_sent and not reconnected:
+                        reconnected = True
+                        continue
+                return _transport_error(exc)
+
+            conn.messages_sent += 1
+            await self.async_pool.release(conn)
+            return _accepted()
+
+    def _build_message(self, email: EmailMessage) -> SMTPEmailMessage:
         msg = SMTPEmailMessage()
         msg["Subject"] = email.subject
         msg["From"] = self.settings.smtp_user or "no-reply@example.com"
         msg["To"] = email.to_email
         msg.set_content(email.text_body)
         msg.add_alternative(email.html_body, subtype="html")
+        return msg
+
+
+def _accepted() -> ProviderResponse:
+    return ProviderResponse(
+        provider_message_id=str(uuid.uuid4()),
+        accepted=True,
+        raw_status="accepted",
+        transient=False,
+    )
+
+
+def _rejection(exc: smtplib.SMTPResponseException | smtplib.SMTPRecipientsRefused) -> tuple[int, bytes | str]:
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return next(iter(exc.recipients.values()))
+    return exc.smtp_code, exc.smtp_error
+
+
+def _async_rejection(exc: Exception) -> tuple[int, str]:
+    if isinstance(exc, aiosmtplib.SMTPRecipientsRefused):
+        exc = exc.recipients[0]
+    return exc.code, exc.message
+
+
+def _response_error(code: int, message: bytes | str) -> ProviderResponse:
+    if isinstance(message, bytes):
+        message = message.decode("utf-8", errors="ignore")
+    return ProviderResponse(
+        provider_message_id="",
+        accepted=False,
+        raw_status=f"smtp_{code}",
+        transient=400 <= code < 500,
+        error_code=str(code),
+        error_message=message,
+    )
+
 
-        try:
-            if self.settings.smtp_tls:
-                context = ssl.create_default_context()
-                with smtplib.SMTP_SSL(self.settings.smtp_host, self.settings.smtp_port, context=context, timeout=15) as server:
-                    if self.settings.smtp_user:
-                        server.login(self.settings.smtp_user, self.settings.smtp_pass)
-                    server.send_message(msg)
-            else:
-                with smtplib.SMTP(self.settings.smtp_host, self.settings.smtp_port, timeout=15) as server:
-                    if self.settings.smtp_user:
-                        server.login(self.settings.smtp_user, self.settings.smtp_pass)
-                    server.send_message(msg)
-            return ProviderResponse(
-                provider_message_id=str(uuid.uuid4()),
-                accepted=True,
-                raw_status="accepted",
-                transient=False,
-            )
-        except smtplib.SMTPResponseException as exc:
-            transient = 400 <= exc.smtp_code < 500
-            return ProviderResponse(
-                provider_message_id="",
-                accepted=False,
-                raw_status=f"smtp_{exc.smtp_code}",
-                transient=transient,
-                error_code=str(exc.smtp_code),
-                error_message=exc.smtp_error.decode("utf-8", errors="ignore"),
-            )
-        except (TimeoutError, OSError, smtplib.SMTPException) as exc:
-            return ProviderResponse(
-                provider_message_id="",
-                accepted=False,
-                raw_status="transport_error",
-                transient=True,
-                error_code="transport_error",
-                error_message=str(exc),
-            )
+def _transport_error(exc: Exception) -> ProviderResponse:
+    return ProviderResponse(
+        provider_message_id="",
+        accepted=False,
+        raw_status="transport_error",
+        transient=True,
+        error_code="transport_error",
+        error_message=str(exc),
+    )
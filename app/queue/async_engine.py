@@ -0,0 +1,174 @@
+import asyncio
+import contextlib
+import logging
+import signal
+import time
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.core.logging import configure_logging
+from app.core.metrics import DB_SECONDS, observe_send, observe_seconds, start_metrics_server
+from app.core.pacing import get_send_pacer
+from app.db.session import get_async_session_factory
+from app.domain.models import Email, Template
+from app.providers.base import ProviderResponse
+from app.providers.circuit_breaker import CircuitOpenError
+from app.providers.registry import registry
+from app.services.mail_service import MailService, build_message, claim_due_emails_statement, error_response
+from app.templates.render_stage import RenderOutput, get_render_stage
+from app.templates.warmup import start_template_warmup
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSendEngine:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        concurrency: int,
+        batch_size: int,
+        poll_seconds: float,
+    ) -> None:
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.processed = 0
+        self._in_flight: set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run(self) -> None:
+        while not self._stopping.is_set():
+            if await self.run_once() == 0:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_seconds)
+        await self.drain()
+
+    async def run_until_idle(self) -> int:
+        start = self.processed
+        while True:
+            if await self.run_once() == 0:
+                if not self._in_flight:
+                    return self.processed - start
+                await asyncio.wait(self._in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+    async def run_once(self) -> int:
+        if len(self._in_flight) >= self.concurrency:
+            await asyncio.wait(self._in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+        slots = min(self.batch_size, self.concurrency - len(self._in_flight))
+        async with self.session_factory() as db:
+            emails, templates = await self._claim(db, slots)
+
+        rendered = await asyncio.to_thread(
+            get_render_stage().render_many, [(templates[email.template_id], email.variables_json) for email in emails]
+        )
+        for email, output in zip(emails, rendered):
+            task = asyncio.create_task(self._send(email, templates[email.template_id], output))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+        return len(emails)
+
+    async def drain(self) -> None:
+        if self._in_flight:
+            await asyncio.wait(self._in_flight)
+
+    async def _claim(self, db: AsyncSession, limit: int) -> tuple[list[Email], dict[str, Template]]:
+        with observe_seconds(DB_SECONDS, operation="claim"):
+            claimed_ids = list((await db.execute(claim_due_emails_statement(limit, datetime.utcnow()))).scalars())
+            await db.commit()
+        if not claimed_ids:
+            return [], {}
+
+        emails = list((await db.execute(select(Email).where(Email.id.in_(claimed_ids)))).scalars())
+        template_ids = {email.template_id for email in emails}
+        templates = {
+            template.id: template
+            for template in (await db.execute(select(Template).where(Template.id.in_(template_ids)))).scalars()
+        }
+        return emails, templates
+
+    async def _send(self, email: Email, template: Template, rendered: RenderOutput | Exception | None = None) -> None:
+        try:
+            await self._deliver(email, template, rendered)
+        except Exception:
+            logger.exception("async send failed", extra={"email_id": email.id})
+            # Requeue from a fresh session so the claimed row does not stay in processing.
+            try:
+                await self._defer(email, get_settings().retry_base_seconds)
+            except Exception:
+                logger.exception("could not requeue email", extra={"email_id": email.id})
+
+    async def _deliver(self, email: Email, template: Template, rendered: RenderOutput | Exception | None) -> None:
+        pacer = get_send_pacer()
+        if pacer is not None:
+            delay = await asyncio.to_thread(pacer.acquire, email.provider_name, email.tenant_id)
+            if delay:
+                await self._defer(email, delay)
+                return
+
+        try:
+            provider = registry.get(email.provider_name)
+            message = build_message(email, template, rendered)
+        except Exception as exc:
+            logger.warning("email cannot be built", extra={"email_id": email.id, "error": str(exc)})
+            await self._record(email, error_response(exc, "build_error", transient=False))
+            return
+        start = time.perf_counter()
+        try:
+            response = await provider.send_async(message)
+        except CircuitOpenError as exc:
+            await self._defer(email, exc.retry_after_seconds)
+            return
+        except Exception as exc:
+            observe_send(email, None, time.perf_counter() - start)
+            logger.exception("provider send raised", extra={"email_id": email.id, "provider": email.provider_name})
+            response = error_response(exc, "provider_error", transient=True)
+        else:
+            observe_send(email, response, time.perf_counter() - start)
+        await self._record(email, response)
+
+    async def _record(self, email: Email, response: ProviderResponse) -> None:
+        async with self.session_factory() as db:
+            email = await db.merge(email, load=False)
+            MailService(db.sync_session).record_response(email, response)
+            with observe_seconds(DB_SECONDS, operation="commit"):
+                await db.commit()
+        self.processed += 1
+
+    async def _defer(self, email: Email, delay: int) -> None:
+        async with self.session_factory() as db:
+            email = await db.merge(email, load=False)
+            MailService(db.sync_session).defer(email, delay)
+            await db.commit()
+
+
+def main() -> None:
+    settings = get_settings()
+    configure_logging(settings.log_level)
+    engine = AsyncSendEngine(
+        session_factory=get_async_session_factory(),
+        concurrency=settings.send_engine_concurrency,
+        batch_size=settings.send_batch_size,
+        poll_seconds=settings.send_engine_poll_seconds,
+    )
+
+    async def run() -> None:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, engine.stop)
+        await engine.run()
+
+    start_metrics_server(settings.metrics_port)
+    start_template_warmup()
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,17 @@
 from celery import Celery
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+)
 
 from app.core.config import get_settings
+from app.core.logging import get_trace_id, reset_trace_id, set_trace_id
+from app.core.profiling import install_profiling_signal, profile_task_end, profile_task_start
+from app.db.session import reset_pools_after_fork
 
 settings = get_settings()
 
@@ -8,14 +19,100 @@ celery_app = Celery(
     "mailsystem",
     broker=settings.redis_url,
     backend=settings.redis_url,
+    include=[
+        "app.queue.tasks_send",
+        "app.queue.tasks_bulk",
+        "app.queue.tasks_analytics",
+    ],
 )
 
 celery_app.conf.update(
     task_default_queue="mail.send",
     task_routes={
         "app.queue.tasks_send.process_email_task": {"queue": "mail.send"},
+        "app.queue.tasks_send.process_email_batch_task": {"queue": "mail.send"},
         "app.queue.tasks_bulk.process_bulk_task": {"queue": "mail.bulk"},
+        "app.queue.tasks_bulk.process_bulk_chunk_task": {"queue": "mail.bulk"},
+        "app.queue.tasks_send.sweep_due_emails_task": {"queue": "mail.maintenance"},
+        "app.queue.tasks_send.reclaim_stale_emails_task": {"queue": "mail.maintenance"},
+        "app.queue.tasks_analytics.compact_rollups_task": {"queue": "mail.maintenance"},
+    },
+    beat_schedule={
+        "compact-analytics-rollups": {
+            "task": "app.queue.tasks_analytics.compact_rollups_task",
+            "schedule": settings.analytics_rollup_interval_seconds,
+        },
+        "reclaim-stale-emails": {
+            "task": "app.queue.tasks_send.reclaim_stale_emails_task",
+            "schedule": settings.send_processing_reclaim_interval_seconds,
+        },
     },
     task_acks_late=True,
     worker_prefetch_multiplier=1,
 )
+
+if settings.scheduler_mode == "sweeper":
+    celery_app.conf.beat_schedule["sweep-due-emails"] = {
+        "task": "app.queue.tasks_send.sweep_due_emails_task",
+        "schedule": settings.scheduler_sweep_interval_seconds,
+    }
+
+
+@worker_init.connect
+def init_worker(**kwargs) -> None:
+    from app.core.metrics import start_metrics_server
+
+    start_metrics_server(settings.metrics_port)
+    install_profiling_signal()
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs) -> None:
+    reset_pools_after_fork()
+    install_profiling_signal()
+
+    from app.templates.warmup import start_template_warmup
+
+    start_template_warmup()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(pid: int, **kwargs) -> None:
+    from app.core.metrics import mark_process_dead
+    from app.services.event_writer import close_event_writer
+
+    close_event_writer()
+    mark_process_dead(pid)
+
+
+_trace_tokens: dict = {}
+
+
+@before_task_publish.connect
+def propagate_trace_id(headers: dict | None = None, **kwargs) -> None:
+    trace_id = get_trace_id()
+    if trace_id and headers is not None:
+        headers.setdefault("trace_id", trace_id)
+
+
+@task_prerun.connect
+def start_task_trace(task_id: str, task, **kwargs) -> None:
+    # Tasks published from a request keep its trace id; anything else (beat, eager) is traced by task id.
+    _trace_tokens[task_id] = set_trace_id(getattr(task.request, "trace_id", None) or task_id)
+
+
+@task_postrun.connect
+def end_task_trace(task_id: str, **kwargs) -> None:
+    token = _trace_tokens.pop(task_id, None)
+    if token is not None:
+        reset_trace_id(token)
+
+
+@task_prerun.connect
+def start_task_profile(task_id: str, task, **kwargs) -> None:
+    profile_task_start(task_id, task)
+
+
+@task_postrun.connect
+def end_task_profile(task_id: str, **kwargs) -> None:
+    profile_task_end(task_id)
@@ -0,0 +1,12 @@
+from app.db.session import get_session_factory
+from app.queue.celery_app import celery_app
+from app.services.analytics_service import AnalyticsService
+
+
+@celery_app.task(name="app.queue.tasks_analytics.compact_rollups_task", bind=True, max_retries=0)
+def compact_rollups_task(self):
+    db = get_session_factory()()
+    try:
+        return AnalyticsService(db).compact()
+    finally:
+        db.close()
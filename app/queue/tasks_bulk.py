@@ -1,12 +1,43 @@
+from app.core.config import get_settings
 from app.db.session import get_session_factory
 from app.queue.celery_app import celery_app
 from app.services.bulk_service import BulkService
 
 
 @celery_app.task(name="app.queue.tasks_bulk.process_bulk_task", bind=True, max_retries=0)
-def process_bulk_task(self, bulk_id: str, payload: dict):
+def process_bulk_task(self, bulk_id: str, payload: dict | None = None):
     db = get_session_factory()()
     try:
-        BulkService(db).process_bulk(bulk_id=bulk_id, payload=payload)
+        service = BulkService(db)
+        try:
+            chunks = service.prepare(bulk_id=bulk_id, payload=payload)
+        except Exception:
+            service.fail_job(bulk_id)
+            raise
+    finally:
+        db.close()
+
+    for chunk_index in chunks:
+        process_bulk_chunk_task.delay(bulk_id, chunk_index)
+    return len(chunks)
+
+
+@celery_app.task(
+    name="app.queue.tasks_bulk.process_bulk_chunk_task",
+    bind=True,
+    max_retries=get_settings().bulk_chunk_max_retries,
+)
+def process_bulk_chunk_task(self, bulk_id: str, chunk_index: int):
+    db = get_session_factory()()
+    try:
+        service = BulkService(db)
+        try:
+            return service.process_chunk(bulk_id, chunk_index)
+        except Exception as exc:
+            if self.request.retries >= self.max_retries:
+                service.fail_job(bulk_id)
+                raise
+            db.rollback()
+            raise self.retry(exc=exc, countdown=2**self.request.retries)
     finally:
         db.close()
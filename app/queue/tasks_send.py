@@ -1,6 +1,17 @@
+import asyncio
+import math
+from collections import Counter
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+
+from app.core.config import get_settings
 from app.db.session import get_session_factory
+from app.domain.enums import EmailStatus
 from app.queue.celery_app import celery_app
 from app.services.mail_service import MailService
+from app.services.scheduler_service import SchedulerService
 
 
 @celery_app.task(name="app.queue.tasks_send.process_email_task", bind=True, max_retries=0)
@@ -10,3 +21,106 @@ def process_email_task(self, email_id: str):
         MailService(db).process_email(email_id)
     finally:
         db.close()
+
+
+@celery_app.task(name="app.queue.tasks_send.process_email_batch_task", bind=True, max_retries=0)
+def process_email_batch_task(self, limit: int | None = None):
+    limit = limit or get_settings().send_batch_size
+    db = get_session_factory()()
+    try:
+        processed, retry_delays = MailService(db).process_batch(limit)
+    finally:
+        db.close()
+
+    if get_settings().scheduler_mode != "sweeper":
+        for delay in sorted(set(retry_delays)):
+            process_email_batch_task.apply_async(countdown=delay, queue="mail.send")
+    if processed >= limit:
+        process_email_batch_task.apply_async(queue="mail.send")
+    return processed
+
+
+@celery_app.task(name="app.queue.tasks_send.sweep_due_emails_task", bind=True, max_retries=0)
+def sweep_due_emails_task(self):
+    settings = get_settings()
+    limit = settings.scheduler_sweep_batch_size
+    if settings.send_dispatch_mode == "engine":
+        return 0
+
+    db = get_session_factory()()
+    try:
+        service = SchedulerService(db)
+        if settings.send_dispatch_mode == "batch":
+            due = service.count_due(limit)
+            for _ in range(math.ceil(due / settings.send_batch_size)):
+                process_email_batch_task.apply_async(queue="mail.send")
+            return due
+
+        dispatched = 0
+        while True:
+            leased = service.lease_due(limit)
+            for email_id in leased:
+                process_email_task.apply_async(args=[email_id], queue="mail.send")
+            dispatched += len(leased)
+            if len(leased) < limit:
+                return dispatched
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.queue.tasks_send.reclaim_stale_emails_task", bind=True, max_retries=0)
+def reclaim_stale_emails_task(self):
+    limit = get_settings().scheduler_sweep_batch_size
+    db = get_session_factory()()
+    try:
+        service = SchedulerService(db)
+        reclaimed = 0
+        while True:
+            email_ids = service.reclaim_stale(limit)
+            dispatch_emails([(email_id, EmailStatus.queued.value, None) for email_id in email_ids])
+            reclaimed += len(email_ids)
+            if len(email_ids) < limit:
+                return reclaimed
+    finally:
+        db.close()
+
+
+def dispatch_email(email_id: str, status: str, scheduled_at: datetime | None) -> None:
+    dispatch_emails([(email_id, status, scheduled_at)])
+
+
+async def dispatch_email_async(email_id: str, status: str, scheduled_at: datetime | None) -> None:
+    if get_settings().send_dispatch_mode == "engine":
+        return
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(get_publish_executor(), dispatch_email, email_id, status, scheduled_at)
+
+
+@lru_cache(maxsize=1)
+def get_publish_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=get_settings().send_api_publish_threads, thread_name_prefix="send-publish")
+
+
+def dispatch_emails(emails: Iterable[tuple[str, str, datetime | None]]) -> None:
+    settings = get_settings()
+    if settings.send_dispatch_mode == "engine":
+        return
+    if settings.scheduler_mode == "sweeper":
+        emails = [email for email in emails if email[1] != EmailStatus.scheduled.value]
+    if settings.send_dispatch_mode != "batch":
+        for email_id, status, scheduled_at in emails:
+            if status == EmailStatus.scheduled.value and scheduled_at is not None:
+                process_email_task.apply_async(args=[email_id], eta=scheduled_at, queue="mail.scheduled")
+            else:
+                process_email_task.apply_async(args=[email_id], queue="mail.send")
+        return
+
+    due_counts = Counter(
+        scheduled_at if status == EmailStatus.scheduled.value else None for _, status, scheduled_at in emails
+    )
+    for eta, count in due_counts.items():
+        for _ in range(math.ceil(count / settings.send_batch_size)):
+            if eta is not None:
+                process_email_batch_task.apply_async(eta=eta, queue="mail.scheduled")
+            else:
+                process_email_batch_task.apply_async(queue="mail.send")
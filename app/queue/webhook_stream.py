@@ -0,0 +1,255 @@
+import json
+import logging
+import os
+import signal
+import socket
+from collections import defaultdict
+from dataclasses import dataclass
+
+from redis import Redis
+from redis.exceptions import ResponseError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import Settings, get_settings
+from app.core.logging import configure_logging
+from app.db.session import get_redis, get_session_factory
+from app.services.webhook_service import WebhookService
+
+logger = logging.getLogger(__name__)
+
+INVALID_EVENT = "invalid webhook event"
+
+
+@dataclass(slots=True)
+class StreamEntry:
+    entry_id: str
+    provider: str
+    event_id: str
+    payload: str
+
+    def event(self) -> dict:
+        parsed = json.loads(self.payload)
+        if not isinstance(parsed, dict):
+            raise ValueError("webhook payload must be a JSON object")
+        return {**parsed, "event_id": self.event_id}
+
+
+class WebhookStream:
+    def __init__(self, redis_client: Redis, settings: Settings) -> None:
+        self.redis = redis_client
+        self.stream = settings.webhook_stream_name
+        self.group = settings.webhook_stream_group
+        self.dead_letter_stream = settings.webhook_stream_dead_letter_name
+        self.maxlen = settings.webhook_stream_maxlen
+        self.claim_idle_ms = settings.webhook_stream_claim_idle_ms
+        self.max_deliveries = settings.webhook_stream_max_deliveries
+
+    def publish(self, provider: str, events: list[tuple[str, str]]) -> list[str]:
+        pipe = self.redis.pipeline(transaction=False)
+        for event_id, payload in events:
+            pipe.xadd(
+                self.stream,
+                {"provider": provider, "event_id": event_id, "payload": payload},
+                maxlen=self.maxlen,
+                approximate=True,
+            )
+        return pipe.execute()
+
+    def ensure_group(self) -> None:
+        try:
+            self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    def read(self, consumer: str, count: int, block_ms: int) -> list[StreamEntry]:
+        claimed = self.redis.xautoclaim(
+            self.stream, self.group, consumer, self.claim_idle_ms, start_id="0-0", count=count
+        )[1]
+        if claimed:
+            return self._entries(claimed)
+        response = self.redis.xreadgroup(self.group, consumer, {self.stream: ">"}, count=count, block=block_ms)
+        return self._entries(response[0][1]) if response else []
+
+    def ack(self, entry_ids: list[str]) -> None:
+        if entry_ids:
+            self.redis.xack(self.stream, self.group, *entry_ids)
+
+    def delivery_counts(self, entries: list[StreamEntry]) -> dict[str, int]:
+        pipe = self.redis.pipeline(transaction=False)
+        for entry in entries:
+            pipe.xpending_range(self.stream, self.group, min=entry.entry_id, max=entry.entry_id, count=1)
+        return {
+            entry.entry_id: rows[0]["times_delivered"] if rows else 0
+            for entry, rows in zip(entries, pipe.execute())
+        }
+
+    def dead_letter(self, failures: list[tuple[StreamEntry, str]]) -> None:
+        pipe = self.redis.pipeline()
+        for entry, reason in failures:
+            pipe.xadd(
+                self.dead_letter_stream,
+                {
+                    "provider": entry.provider,
+                    "event_id": entry.event_id,
+                    "payload": entry.payload,
+                    "source_id": entry.entry_id,
+                    "reason": reason,
+                },
+                maxlen=self.maxlen,
+                approximate=True,
+            )
+        pipe.xack(self.stream, self.group, *(entry.entry_id for entry, _ in failures))
+        pipe.execute()
+
+    def stats(self) -> dict:
+        try:
+            groups = self.redis.xinfo_groups(self.stream)
+        except ResponseError:
+            groups = []
+        group = next((group for group in groups if group["name"] == self.group), {})
+        return {
+            "length": self.redis.xlen(self.stream),
+            "lag": group.get("lag"),
+            "pending": group.get("pending", 0),
+            "consumers": group.get("consumers", 0),
+            "dead_lettered": self.redis.xlen(self.dead_letter_stream),
+        }
+
+    def _entries(self, raw: list) -> list[StreamEntry]:
+        entries: list[StreamEntry] = []
+        trimmed: list[str] = []
+        for entry_id, fields in raw:
+            if not fields:
+                trimmed.append(entry_id)
+                continue
+            entries.append(
+                StreamEntry(
+                    entry_id=entry_id,
+                    provider=fields.get("provider", ""),
+                    event_id=fields.get("event_id", ""),
+                    payload=fields.get("payload", ""),
+                )
+            )
+        self.ack(trimmed)
+        return entries
+
+
+def get_webhook_stream() -> WebhookStream:
+    return WebhookStream(get_redis(), get_settings())
+
+
+class WebhookApplier:
+    def __init__(
+        self,
+        stream: WebhookStream,
+        session_factory: sessionmaker,
+        consumer: str,
+        batch_size: int,
+        block_ms: int,
+    ) -> None:
+        self.stream = stream
+        self.session_factory = session_factory
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.applied = 0
+        self.dead_lettered = 0
+        self._stopping = False
+
+    def stop(self, *_args) -> None:
+        self._stopping = True
+
+    def run(self) -> None:
+        self.stream.ensure_group()
+        while not self._stopping:
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("webhook applier iteration failed")
+
+    def run_until_idle(self) -> int:
+        self.stream.ensure_group()
+        start = self.applied
+        while self.run_once():
+            pass
+        return self.applied - start
+
+    def run_once(self) -> int:
+        entries = self.stream.read(self.consumer, self.batch_size, self.block_ms)
+        if not entries:
+            return 0
+        try:
+            invalid = self._apply(entries)
+        except Exception:
+            logger.warning("webhook batch apply failed, retrying entries one by one", exc_info=True)
+            self._apply_individually(entries)
+        else:
+            rejected = {entry.entry_id for entry in invalid}
+            applied = [entry.entry_id for entry in entries if entry.entry_id not in rejected]
+            self.stream.ack(applied)
+            self.applied += len(applied)
+            self._dead_letter([(entry, INVALID_EVENT) for entry in invalid])
+        return len(entries)
+
+    def _apply(self, entries: list[StreamEntry]) -> list[StreamEntry]:
+        """Apply entries in one session and return those the service rejected as invalid."""
+        by_provider: dict[str, list[StreamEntry]] = defaultdict(list)
+        for entry in entries:
+            by_provider[entry.provider].append(entry)
+        invalid: list[StreamEntry] = []
+        with self.session_factory() as db:
+            service = WebhookService(db)
+            for provider, provider_entries in by_provider.items():
+                results = service.apply_events(provider, [entry.event() for entry in provider_entries])
+                invalid.extend(
+                    entry for entry, result in zip(provider_entries, results) if result["status"] == "invalid"
+                )
+        return invalid
+
+    def _apply_individually(self, entries: list[StreamEntry]) -> None:
+        deliveries = self.stream.delivery_counts(entries)
+        applied: list[str] = []
+        failures: list[tuple[StreamEntry, str]] = []
+        for entry in entries:
+            try:
+                invalid = self._apply([entry])
+            except ValueError as exc:
+                failures.append((entry, str(exc)))
+            except Exception as exc:
+                logger.exception("webhook apply failed", extra={"entry_id": entry.entry_id})
+                if deliveries.get(entry.entry_id, 0) >= self.stream.max_deliveries:
+                    failures.append((entry, f"{type(exc).__name__}: {exc}"))
+            else:
+                if invalid:
+                    failures.append((entry, INVALID_EVENT))
+                else:
+                    applied.append(entry.entry_id)
+
+        self.stream.ack(applied)
+        self.applied += len(applied)
+        self._dead_letter(failures)
+
+    def _dead_letter(self, failures: list[tuple[StreamEntry, str]]) -> None:
+        if failures:
+            self.stream.dead_letter(failures)
+            self.dead_lettered += len(failures)
+            logger.warning("webhook events dead-lettered", extra={"count": len(failures)})
+
+def main() -> None:
+    settings = get_settings()
+    configure_logging(settings.log_level)
+    applier = WebhookApplier(
+        stream=get_webhook_stream(),
+        session_factory=get_session_factory(),
+        consumer=f"{socket.gethostname()}-{os.getpid()}",
+        batch_size=settings.webhook_stream_batch_size,
+        block_ms=settings.webhook_stream_block_ms,
+    )
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, applier.stop)
+    applier.run()
+
+
+if __name__ == "__main__":
+    main()
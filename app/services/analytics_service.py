@@ -1,25 +1,68 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.domain.models import Email, EmailEvent
+from app.core.config import get_settings
+from app.db.dialect import date_trunc_for, insert_for
+from app.domain.models import AnalyticsRollupState, Email, EmailEvent, EmailEventRollup
+
+ROLLUP_STATE_NAME = "email_events_hourly"
+
+
+def floor_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_hour(value: datetime) -> datetime:
+    floored = floor_hour(value)
+    return floored if floored == value else floored + timedelta(hours=1)
+
+
+def naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
 
 
 class AnalyticsService:
     def __init__(self, db: Session) -> None:
         self.db = db
+        self.settings = get_settings()
 
     def summary(self, tenant_id: str, from_dt, to_dt, group_by: str, template_id: str | None = None) -> dict:
-        where = [Email.tenant_id == tenant_id, Email.created_at >= from_dt, Email.created_at <= to_dt]
-        if template_id:
-            where.append(Email.template_id == template_id)
+        unit = "hour" if group_by == "hour" else "day"
+        from_dt, to_dt = naive_utc(from_dt), naive_utc(to_dt)
+        counts: dict[tuple[datetime, str], int] = defaultdict(int)
 
-        totals_rows = self.db.execute(
-            select(Email.status, func.count(Email.id)).where(*where).group_by(Email.status)
-        ).all()
-        totals = {status: count for status, count in totals_rows}
+        watermark = self.compacted_until()
+        rollup_start = ceil_hour(from_dt)
+        rollup_end = min(watermark, floor_hour(to_dt)) if watermark else rollup_start
+        if rollup_start < rollup_end:
+            for bucket, event_type, count in self._rollup_counts(tenant_id, rollup_start, rollup_end, unit, template_id):
+                counts[(bucket, event_type)] += int(count)
+            # Rollups only hold rows stored before the watermark; late rows for those hours are still raw.
+            raw_ranges = [
+                (from_dt, rollup_start, False, None),
+                (rollup_start, rollup_end, False, watermark),
+                (rollup_end, to_dt, True, None),
+            ]
+        else:
+            raw_ranges = [(from_dt, to_dt, True, None)]
+
+        for range_start, range_end, inclusive, stored_from in raw_ranges:
+            for bucket, event_type, count in self._raw_counts(
+                tenant_id, range_start, range_end, inclusive, unit, template_id, stored_from
+            ):
+                counts[(bucket, event_type)] += int(count)
+
+        totals: dict[str, int] = defaultdict(int)
+        for (_, event_type), count in counts.items():
+            totals[event_type] += count
 
-        sent = totals.get("sent", 0) + totals.get("delivered", 0) + totals.get("opened", 0)
-        delivered = totals.get("delivered", 0) + totals.get("opened", 0)
+        sent = totals.get("sent", 0)
+        delivered = totals.get("delivered", 0)
         opened = totals.get("opened", 0)
 
         rates = {
@@ -27,14 +70,112 @@ class AnalyticsService:
             "open_rate": (opened / delivered) if delivered else 0.0,
         }
 
-        bucket = func.date_trunc("hour" if group_by == "hour" else "day", EmailEvent.event_time)
-        events_q = (
-            select(bucket.label("bucket"), EmailEvent.event_type, func.count(EmailEvent.id))
-            .where(EmailEvent.tenant_id == tenant_id, EmailEvent.event_time >= from_dt, EmailEvent.event_time <= to_dt)
-            .group_by(bucket, EmailEvent.event_type)
-            .order_by(bucket)
-        )
-        series_rows = self.db.execute(events_q).all()
-
-        series = [{"bucket": str(row[0]), "event_type": row[1], "count": row[2]} for row in series_rows]
-        return {"totals": totals, "rates": rates, "series": series}
+        series = [
+            {"bucket": str(bucket), "event_type": event_type, "count": count}
+            for (bucket, event_type), count in sorted(counts.items())
+        ]
+        return {"totals": dict(totals), "rates": rates, "series": series}
+
+    def compacted_until(self) -> datetime | None:
+        return self.db.execute(
+            select(AnalyticsRollupState.compacted_until).where(AnalyticsRollupState.name == ROLLUP_STATE_NAME)
+        ).scalar_one_or_none()
+
+    def compact(self, now: datetime | None = None) -> int:
+        now = now or datetime.utcnow()
+        target = floor_hour(now - timedelta(seconds=self.settings.analytics_rollup_grace_seconds))
+
+        state = self.db.execute(
+            select(AnalyticsRollupState).where(AnalyticsRollupState.name == ROLLUP_STATE_NAME).with_for_update()
+        ).scalar_one_or_none()
+        if state is None:
+            first_event = self.db.execute(select(func.min(EmailEvent.created_at))).scalar_one_or_none()
+            state = AnalyticsRollupState(name=ROLLUP_STATE_NAME, compacted_until=floor_hour(first_event or target))
+            self.db.add(state)
+
+        start = state.compacted_until
+        end = min(target, start + timedelta(hours=self.settings.analytics_rollup_max_hours_per_run))
+        if start >= end:
+            self.db.commit()
+            return 0
+
+        # The watermark follows created_at (when a row was stored), so an event stored late for an hour that is
+        # already compacted is added to that hour's rollup instead of being skipped.
+        bucket = date_trunc_for(self.db, "hour", EmailEvent.event_time)
+        provider = func.coalesce(EmailEvent.provider, "")
+        rows = self.db.execute(
+            select(EmailEvent.tenant_id, Email.template_id, provider, EmailEvent.event_type, bucket, func.count(EmailEvent.id))
+            .join(Email, Email.id == EmailEvent.email_id)
+            .where(EmailEvent.created_at >= start, EmailEvent.created_at < end)
+            .group_by(EmailEvent.tenant_id, Email.template_id, provider, EmailEvent.event_type, bucket)
+        ).all()
+
+        if rows:
+            upsert = insert_for(self.db, EmailEventRollup)
+            self.db.execute(
+                upsert.on_conflict_do_update(
+                    index_elements=[
+                        EmailEventRollup.tenant_id,
+                        EmailEventRollup.template_id,
+                        EmailEventRollup.provider,
+                        EmailEventRollup.event_type,
+                        EmailEventRollup.bucket_start,
+                    ],
+                    set_={"event_count": EmailEventRollup.event_count + upsert.excluded.event_count},
+                ),
+                [
+                    {
+                        "tenant_id": row[0],
+                        "template_id": row[1],
+                        "provider": row[2],
+                        "event_type": row[3],
+                        "bucket_start": row[4],
+                        "event_count": row[5],
+                    }
+                    for row in rows
+                ],
+            )
+        state.compacted_until = end
+        self.db.commit()
+        return len(rows)
+
+    def _rollup_counts(self, tenant_id: str, start: datetime, end: datetime, unit: str, template_id: str | None):
+        bucket = date_trunc_for(self.db, unit, EmailEventRollup.bucket_start)
+        where = [
+            EmailEventRollup.tenant_id == tenant_id,
+            EmailEventRollup.bucket_start >= start,
+            EmailEventRollup.bucket_start < end,
+        ]
+        if template_id:
+            where.append(EmailEventRollup.template_id == template_id)
+        return self.db.execute(
+            select(bucket, EmailEventRollup.event_type, func.sum(EmailEventRollup.event_count))
+            .where(*where)
+            .group_by(bucket, EmailEventRollup.event_type)
+        ).all()
+
+    def _raw_counts(
+        self,
+        tenant_id: str,
+        start: datetime,
+        end: datetime,
+        inclusive: bool,
+        unit: str,
+        template_id: str | None,
+        stored_from: datetime | None = None,
+    ):
+        if start > end or (start == end and not inclusive):
+            return []
+        bucket = date_trunc_for(self.db, unit, EmailEvent.event_time)
+        where = [
+            EmailEvent.tenant_id == tenant_id,
+            EmailEvent.event_time >= start,
+            EmailEvent.event_time <= end if inclusive else EmailEvent.event_time < end,
+        ]
+        if stored_from is not None:
+            where.append(EmailEvent.created_at >= stored_from)
+        query = select(bucket, EmailEvent.event_type, func.count(EmailEvent.id))
+        if template_id:
+            query = query.join(Email, Email.id == EmailEvent.email_id)
+            where.append(Email.template_id == template_id)
+        return self.db.execute(query.where(*where).group_by(bucket, EmailEvent.event_type)).all()
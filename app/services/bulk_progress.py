@@ -0,0 +1,45 @@
+from collections import defaultdict
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app.domain.models import BulkJob
+
+BULK_PROGRESS_KEY = "bulk_progress"
+BULK_COUNTERS = frozenset({"queued_count", "sent_count", "failed_count", "skipped_count", "completed_chunks"})
+
+
+def count_bulk_progress(db: Session, bulk_job_id: str | None, counter: str, amount: int = 1) -> None:
+    if not bulk_job_id or not amount:
+        return
+    if counter not in BULK_COUNTERS:
+        raise ValueError(f"unknown bulk counter {counter}")
+    tallies = db.info.setdefault(BULK_PROGRESS_KEY, defaultdict(int))
+    tallies[(bulk_job_id, counter)] += amount
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_bulk_progress(session: Session) -> None:
+    tallies = session.info.pop(BULK_PROGRESS_KEY, None)
+    if not tallies:
+        return
+    by_job: dict[str, dict[str, int]] = defaultdict(dict)
+    for (bulk_job_id, counter), amount in tallies.items():
+        by_job[bulk_job_id][counter] = amount
+    for bulk_job_id in sorted(by_job):
+        session.execute(
+            update(BulkJob)
+            .where(BulkJob.id == bulk_job_id)
+            .values(
+                {
+                    getattr(BulkJob, counter): getattr(BulkJob, counter) + amount
+                    for counter, amount in by_job[bulk_job_id].items()
+                }
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_bulk_progress(session: Session) -> None:
+    session.info.pop(BULK_PROGRESS_KEY, None)
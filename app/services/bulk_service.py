@@ -1,67 +1,261 @@
-from sqlalchemy import select
+import logging
+import uuid
+from collections.abc import Iterable
+from datetime import datetime
+
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
-from app.domain.enums import BulkStatus
-from app.domain.models import BulkJob
-from app.domain.schemas import BulkSendRequest, SendRequest
+from app.core.config import get_settings
+from app.core.metrics import record_transition
+from app.db.dialect import insert_for
+from app.domain.enums import BulkChunkStatus, BulkStatus, EmailStatus, EventType
+from app.domain.models import BulkJob, BulkRecipientChunk, Email, EmailEvent
+from app.domain.schemas import BulkJobSpec, BulkSendRequest
+from app.services.bulk_progress import count_bulk_progress
 from app.services.mail_service import MailService
 
+logger = logging.getLogger(__name__)
+
+
+def job_spec_json(spec: BulkJobSpec) -> dict:
+    return spec.model_dump(mode="json", include=set(BulkJobSpec.model_fields))
+
 
 class BulkService:
     def __init__(self, db: Session) -> None:
         self.db = db
+        self.settings = get_settings()
 
     def enqueue_bulk(self, request: BulkSendRequest) -> BulkJob:
+        bulk_job = self.create_job(request)
+        count, chunks = self.stage_request(bulk_job.id, request)
+        return self.start_job(bulk_job, count, chunks)
+
+    def create_job(self, spec: BulkJobSpec, status: str = BulkStatus.receiving.value) -> BulkJob:
         bulk_job = BulkJob(
-            tenant_id=request.tenant_id,
-            template_id=request.template_id,
-            total_count=len(request.recipients),
+            tenant_id=spec.tenant_id,
+            template_id=spec.template_id,
+            total_count=0,
             queued_count=0,
-            status=BulkStatus.queued.value,
+            request_json=job_spec_json(spec),
+            status=status,
         )
         self.db.add(bulk_job)
         self.db.commit()
         self.db.refresh(bulk_job)
+        return bulk_job
+
+    def stage_request(self, bulk_id: str, request: BulkSendRequest) -> tuple[int, int]:
+        size = self.settings.bulk_staging_chunk_size
+        chunks = 0
+        for start in range(0, len(request.recipients), size):
+            self.stage_chunk(
+                bulk_id,
+                chunks,
+                [
+                    {
+                        "email": str(recipient.email),
+                        "name": recipient.name,
+                        "variables": request.per_recipient_variables.get(str(recipient.email), {}),
+                    }
+                    for recipient in request.recipients[start : start + size]
+                ],
+            )
+            chunks += 1
+        return len(request.recipients), chunks
+
+    def stage_chunk(self, bulk_id: str, chunk_index: int, recipients: list[dict]) -> None:
+        self.db.execute(
+            insert(BulkRecipientChunk.__table__).values(
+                bulk_job_id=bulk_id,
+                chunk_index=chunk_index,
+                recipient_count=len(recipients),
+                recipients_json=recipients,
+                created_at=datetime.utcnow(),
+            )
+        )
+        self.db.commit()
+
+    def start_job(self, bulk_job: BulkJob, total_count: int, chunk_count: int) -> BulkJob:
+        bulk_job.total_count = total_count
+        bulk_job.chunk_count = chunk_count
+        bulk_job.status = BulkStatus.queued.value
+        self.db.commit()
 
         from app.queue.tasks_bulk import process_bulk_task
 
-        process_bulk_task.delay(bulk_job.id, request.model_dump(mode="json"))
+        process_bulk_task.delay(bulk_job.id)
         return bulk_job
 
-    def process_bulk(self, bulk_id: str, payload: dict) -> int:
+    def fail_job(self, bulk_id: str) -> None:
+        self.db.rollback()
+        self.db.execute(update(BulkJob).where(BulkJob.id == bulk_id).values(status=BulkStatus.failed.value))
+        self.db.commit()
+
+    def prepare(self, bulk_id: str, payload: dict | None = None) -> list[int]:
         bulk_job = self.db.execute(select(BulkJob).where(BulkJob.id == bulk_id)).scalar_one()
+        if payload is not None and not self._has_chunks(bulk_id):
+            request = BulkSendRequest.model_validate(payload)
+            bulk_job.request_json = job_spec_json(request)
+            bulk_job.total_count, bulk_job.chunk_count = self.stage_request(bulk_id, request)
+
+        spec = BulkJobSpec.model_validate(bulk_job.request_json)
+        try:
+            MailService(self.db).resolve_send_context(spec.tenant_id, spec.template_id)
+        except ValueError as exc:
+            logger.warning("bulk job rejected", extra={"tenant_id": spec.tenant_id, "event": str(exc)})
+            bulk_job.status = BulkStatus.failed.value
+            self.db.commit()
+            return []
+
         bulk_job.status = BulkStatus.processing.value
         self.db.commit()
+        pending = list(
+            self.db.execute(
+                select(BulkRecipientChunk.chunk_index)
+                .where(
+                    BulkRecipientChunk.bulk_job_id == bulk_id,
+                    BulkRecipientChunk.status != BulkChunkStatus.complete.value,
+                )
+                .order_by(BulkRecipientChunk.chunk_index)
+            ).scalars()
+        )
+        if not pending:
+            self._complete_if_done(bulk_id)
+        return pending
 
-        request = BulkSendRequest.model_validate(payload)
-        mail_service = MailService(self.db)
+    def process_chunk(self, bulk_id: str, chunk_index: int) -> int:
+        request_json = self.db.execute(select(BulkJob.request_json).where(BulkJob.id == bulk_id)).scalar_one()
+        spec = BulkJobSpec.model_validate(request_json)
+        chunk_key = (BulkRecipientChunk.bulk_job_id == bulk_id, BulkRecipientChunk.chunk_index == chunk_index)
+        recipients, offset, chunk_status = self.db.execute(
+            select(
+                BulkRecipientChunk.recipients_json, BulkRecipientChunk.next_offset, BulkRecipientChunk.status
+            ).where(*chunk_key)
+        ).one()
+        if chunk_status == BulkChunkStatus.complete.value:
+            return 0
+
+        from app.queue.tasks_send import dispatch_emails
+
+        chunks = BulkRecipientChunk.__table__
         queued = 0
+        while offset < len(recipients):
+            end = min(offset + spec.batch_size, len(recipients))
+            # Advancing the offset first locks the chunk row, so a redelivered copy of this
+            # task waits here and then backs off instead of double counting the batch.
+            claimed = self.db.execute(
+                update(chunks).where(*chunk_key, chunks.c.next_offset == offset).values(next_offset=end)
+            ).rowcount
+            if not claimed:
+                self.db.rollback()
+                return queued
 
-        for recipient in request.recipients:
-            vars_for_recipient = dict(request.shared_variables)
-            vars_for_recipient.update(request.per_recipient_variables.get(str(recipient.email), {}))
-
-            send_req = SendRequest(
-                tenant_id=request.tenant_id,
-                recipient=recipient,
-                template_id=request.template_id,
-                variables=vars_for_recipient,
-                metadata=request.metadata,
-                provider_hint=request.provider_hint,
-                send_at=request.send_at,
-                idempotency_key=f"{request.idempotency_key}:{recipient.email}",
-            )
-            email, reused = mail_service.enqueue_send(send_req)
-            if not reused:
-                from app.queue.tasks_send import process_email_task
-
-                if email.status == "scheduled" and email.scheduled_at is not None:
-                    process_email_task.apply_async(args=[email.id], eta=email.scheduled_at, queue="mail.scheduled")
-                else:
-                    process_email_task.apply_async(args=[email.id], queue="mail.send")
-                queued += 1
-
-        bulk_job.queued_count = queued
-        bulk_job.status = BulkStatus.complete.value
+            batch = recipients[offset:end]
+            new_rows = self._insert_chunk(spec, batch, bulk_id)
+            count_bulk_progress(self.db, bulk_id, "queued_count", len(new_rows))
+            count_bulk_progress(self.db, bulk_id, "skipped_count", len(batch) - len(new_rows))
+            self.db.commit()
+            dispatch_emails((row["id"], row["status"], row["scheduled_at"]) for row in new_rows)
+            if new_rows:
+                record_transition(new_rows[0]["status"], new_rows[0]["provider_name"], spec.tenant_id, len(new_rows))
+            queued += len(new_rows)
+            offset = end
+
+        completed = self.db.execute(
+            update(chunks)
+            .where(*chunk_key, chunks.c.status != BulkChunkStatus.complete.value)
+            .values(status=BulkChunkStatus.complete.value)
+        ).rowcount
+        count_bulk_progress(self.db, bulk_id, "completed_chunks", completed)
         self.db.commit()
+        if completed:
+            self._complete_if_done(bulk_id)
         return queued
+
+    def progress(self, bulk_id: str, tenant_id: str) -> BulkJob | None:
+        return self.db.execute(
+            select(BulkJob).where(BulkJob.id == bulk_id, BulkJob.tenant_id == tenant_id)
+        ).scalar_one_or_none()
+
+    def _complete_if_done(self, bulk_id: str) -> None:
+        self.db.execute(
+            update(BulkJob)
+            .where(
+                BulkJob.id == bulk_id,
+                BulkJob.status == BulkStatus.processing.value,
+                BulkJob.completed_chunks >= BulkJob.chunk_count,
+            )
+            .values(status=BulkStatus.complete.value)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+
+    def _has_chunks(self, bulk_id: str) -> bool:
+        return (
+            self.db.execute(
+                select(BulkRecipientChunk.chunk_index).where(BulkRecipientChunk.bulk_job_id == bulk_id).limit(1)
+            ).first()
+            is not None
+        )
+
+    def _insert_chunk(self, spec: BulkJobSpec, recipients: Iterable[dict], bulk_id: str) -> list[dict]:
+        provider = spec.provider_hint or self.settings.default_provider
+        status = EmailStatus.scheduled.value if spec.send_at else EmailStatus.queued.value
+        now = datetime.utcnow()
+
+        rows = []
+        for recipient in recipients:
+            variables = dict(spec.shared_variables)
+            variables.update(recipient.get("variables") or {})
+            rows.append(
+                {
+                    "id": str(uuid.uuid4()),
+                    "tenant_id": spec.tenant_id,
+                    "idempotency_key": f"{spec.idempotency_key}:{recipient['email']}",
+                    "recipient_email": recipient["email"],
+                    "recipient_name": recipient.get("name"),
+                    "template_id": spec.template_id,
+                    "variables_json": variables,
+                    "metadata_json": spec.metadata,
+                    "provider_name": provider,
+                    "status": status,
+                    "scheduled_at": spec.send_at,
+                    "attempt_count": 0,
+                    "bulk_job_id": bulk_id,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+        if not rows:
+            return []
+
+        emails = Email.__table__
+        stmt = (
+            insert_for(self.db, emails)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[emails.c.tenant_id, emails.c.idempotency_key])
+            .returning(emails.c.id)
+        )
+        inserted_ids = set(self.db.execute(stmt).scalars())
+        new_rows = [row for row in rows if row["id"] in inserted_ids]
+        if not new_rows:
+            return []
+
+        self.db.execute(
+            insert(EmailEvent.__table__),
+            [
+                {
+                    "email_id": row["id"],
+                    "tenant_id": row["tenant_id"],
+                    "event_type": EventType.queued.value,
+                    "event_time": now,
+                    "provider": provider,
+                    "payload_json": {"scheduled": bool(spec.send_at)},
+                    "created_at": now,
+                }
+                for row in new_rows
+            ],
+        )
+        return new_rows
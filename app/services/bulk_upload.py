@@ -0,0 +1,141 @@
+import codecs
+import csv
+import json
+
+from pydantic import ValidationError
+
+from app.domain.schemas import StagedRecipient
+
+UPLOAD_FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json-lines": "ndjson",
+    "text/csv": "csv",
+}
+
+
+class RecipientStreamParser:
+    def __init__(self, upload_format: str, max_errors: int = 20, max_record_size: int = 65536) -> None:
+        self.upload_format = upload_format
+        self.max_errors = max_errors
+        self.max_record_size = max_record_size
+        self.accepted = 0
+        self.rejected = 0
+        self.errors: list[dict] = []
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._partial = ""
+        self._record = ""
+        self._record_start = 1
+        self._line = 0
+        self._header: list[str] | None = None
+        # Set while skipping the rest of an oversized record; _quotes tracks CSV quote parity meanwhile.
+        self._oversized = False
+        self._quotes = 0
+
+    def feed(self, data: bytes) -> list[dict]:
+        return self._lines(self._decoder.decode(data))
+
+    def close(self) -> list[dict]:
+        recipients = self._lines(self._decoder.decode(b"", final=True))
+        if self._partial:
+            recipients.extend(self._line_complete(self._partial))
+            self._partial = ""
+        if self._record:
+            self._reject(self._record_start, "unterminated quoted field")
+            self._record = ""
+        self._oversized = False
+        return recipients
+
+    def _lines(self, text: str) -> list[dict]:
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        recipients: list[dict] = []
+        for line in lines:
+            recipients.extend(self._line_complete(line + "\n"))
+        if len(self._record) + len(self._partial) > self.max_record_size:
+            # Never hold more than one record's worth of an unterminated line or quoted field.
+            self._skip(self._partial)
+            self._partial = ""
+        return recipients
+
+    def _line_complete(self, line: str) -> list[dict]:
+        self._line += 1
+        if self._oversized:
+            self._quotes += line.count('"')
+            if self.upload_format == "ndjson" or self._quotes % 2 == 0:
+                self._oversized = False
+            return []
+        if self.upload_format == "ndjson":
+            if len(line) > self.max_record_size:
+                self._reject(self._line, f"record exceeds {self.max_record_size} characters")
+                return []
+            return self._ndjson(line)
+
+        if not self._record:
+            self._record_start = self._line
+        self._record += line
+        if self._record.count('"') % 2:
+            if len(self._record) > self.max_record_size:
+                self._skip("")
+            return []
+        record, self._record = self._record, ""
+        if len(record) > self.max_record_size:
+            self._reject(self._record_start, f"record exceeds {self.max_record_size} characters")
+            return []
+        return self._csv(record)
+
+    def _skip(self, text: str) -> None:
+        if not self._oversized:
+            start = self._record_start if self._record else self._line + 1
+            self._reject(start, f"record exceeds {self.max_record_size} characters")
+            self._oversized = True
+            self._quotes = self._record.count('"')
+            self._record = ""
+        self._quotes += text.count('"')
+
+    def _ndjson(self, line: str) -> list[dict]:
+        if not line.strip():
+            return []
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as exc:
+            self._reject(self._line, f"invalid json: {exc.msg}")
+            return []
+        if not isinstance(row, dict):
+            self._reject(self._line, "each line must be a JSON object")
+            return []
+        return self._validate(self._line, row)
+
+    def _csv(self, record: str) -> list[dict]:
+        if not record.strip():
+            return []
+        values = next(csv.reader([record]))
+        if self._header is None:
+            self._header = [column.strip() for column in values]
+            if "email" not in self._header:
+                self._reject(self._record_start, "csv header must include an email column")
+                self._header = []
+            return []
+        if not self._header:
+            return []
+        if len(values) != len(self._header):
+            self._reject(self._record_start, f"expected {len(self._header)} columns, got {len(values)}")
+            return []
+
+        row = dict(zip(self._header, values))
+        email, name = row.pop("email"), row.pop("name", None) or None
+        return self._validate(self._record_start, {"email": email, "name": name, "variables": row})
+
+    def _validate(self, line: int, row: dict) -> list[dict]:
+        try:
+            recipient = StagedRecipient.model_validate(row)
+        except ValidationError as exc:
+            self._reject(line, "; ".join(error["msg"] for error in exc.errors()))
+            return []
+        self.accepted += 1
+        return [recipient.model_dump(mode="json")]
+
+    def _reject(self, line: int, error: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "error": error})
@@ -0,0 +1,267 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from functools import lru_cache
+
+from sqlalchemy import Engine, event, insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.session import get_engine
+from app.domain.enums import EventType
+from app.domain.models import EmailEvent
+
+logger = logging.getLogger(__name__)
+
+PENDING_EVENTS_KEY = "pending_email_events"
+DURABLE_EVENT_TYPES = frozenset({EventType.failed.value, EventType.dead_lettered.value})
+COPY_COLUMNS = (
+    "email_id",
+    "tenant_id",
+    "event_type",
+    "event_time",
+    "provider",
+    "provider_event_id",
+    "payload_json",
+    "created_at",
+)
+# Errors caused by the rows themselves; retrying them can never succeed.
+ROW_ERRORS = (DataError, IntegrityError, TypeError, ValueError)
+
+
+@dataclass(slots=True)
+class EventWriterStats:
+    buffered: int = 0
+    flushes: int = 0
+    flushed_events: int = 0
+    failed_flushes: int = 0
+    dropped_events: int = 0
+    rejected_events: int = 0
+    last_flush_seconds: float = 0.0
+    max_flush_seconds: float = 0.0
+
+
+class EventWriter:
+    def __init__(self, engine: Engine, batch_size: int, flush_interval_seconds: float, max_buffered: int) -> None:
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_buffered = max_buffered
+        self.stats = EventWriterStats()
+        self._reset()
+
+    def add_many(self, rows: list[dict]) -> None:
+        with self._lock:
+            self._rows.extend(rows)
+            self._trim()
+            full = len(self._rows) >= self.batch_size
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+
+            start = time.perf_counter()
+            # rows[:done] are stored or rejected; only the rest may go back into the buffer.
+            done = written = rejected = 0
+            try:
+                while done < len(rows):
+                    chunk = rows[done : done + self.batch_size]
+                    try:
+                        self._write(chunk)
+                    except Exception as exc:
+                        if not self._rejects_rows(exc):
+                            raise
+                        for row in chunk:
+                            try:
+                                self._write([row])
+                            except Exception as row_exc:
+                                if not self._rejects_rows(row_exc):
+                                    raise
+                                rejected += 1
+                                logger.error(
+                                    "event rejected by the database, dropped",
+                                    extra={"email_id": row.get("email_id"), "event": row.get("event_type")},
+                                    exc_info=True,
+                                )
+                            else:
+                                written += 1
+                            done += 1
+                    else:
+                        written += len(chunk)
+                        done += len(chunk)
+            except Exception:
+                logger.exception("event flush failed", extra={"count": len(rows) - done})
+                with self._lock:
+                    self._rows[:0] = rows[done:]
+                    self._trim()
+                    self.stats.flushed_events += written
+                    self.stats.rejected_events += rejected
+                    self.stats.failed_flushes += 1
+                return written
+
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stats.buffered = len(self._rows)
+                self.stats.flushes += 1
+                self.stats.flushed_events += written
+                self.stats.rejected_events += rejected
+                self.stats.last_flush_seconds = elapsed
+                self.stats.max_flush_seconds = max(self.stats.max_flush_seconds, elapsed)
+            return written
+
+    def close(self) -> None:
+        self._stopping.set()
+        self._wake.set()
+        self.flush()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return asdict(self.stats)
+
+    def reset_after_fork(self) -> None:
+        self._reset()
+        self.stats = EventWriterStats()
+
+    def _reset(self) -> None:
+        self._rows: list[dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _trim(self) -> None:
+        overflow = len(self._rows) - self.max_buffered
+        if overflow > 0:
+            del self._rows[:overflow]
+            self.stats.dropped_events += overflow
+            logger.error("event buffer full, dropped events", extra={"count": overflow})
+        self.stats.buffered = len(self._rows)
+
+    def _rejects_rows(self, exc: Exception) -> bool:
+        dbapi = self.engine.dialect.dbapi
+        kinds = ROW_ERRORS + ((dbapi.DataError, dbapi.IntegrityError) if dbapi is not None else ())
+        return isinstance(exc, kinds) or isinstance(getattr(exc, "orig", None), kinds)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def _write(self, rows: list[dict]) -> None:
+        # created_at is the analytics compaction watermark, so stamp it when the row is actually stored.
+        stored_at = datetime.utcnow()
+        rows = [{**row, "created_at": stored_at} for row in rows]
+        with self.engine.begin() as conn:
+            if conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg":
+                cursor = conn.connection.dbapi_connection.cursor()
+                with cursor.copy(f"COPY email_events ({', '.join(COPY_COLUMNS)}) FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row([json.dumps(row[c]) if c == "payload_json" else row[c] for c in COPY_COLUMNS])
+            else:
+                conn.execute(insert(EmailEvent.__table__), rows)
+
+
+@lru_cache(maxsize=1)
+def get_event_writer() -> EventWriter | None:
+    settings = get_settings()
+    if settings.event_writer_mode == "sync":
+        return None
+    return EventWriter(
+        engine=get_engine(),
+        batch_size=settings.event_writer_batch_size,
+        flush_interval_seconds=settings.event_writer_flush_interval_seconds,
+        max_buffered=settings.event_writer_max_buffered,
+    )
+
+
+def append_event(
+    db: Session,
+    email_id: str,
+    tenant_id: str,
+    event_type: str,
+    provider: str | None,
+    payload: dict,
+    provider_event_id: str | None = None,
+) -> None:
+    writer = get_event_writer()
+    durable = get_settings().event_writer_mode == "durable" and event_type in DURABLE_EVENT_TYPES
+    if writer is None or durable:
+        db.add(
+            EmailEvent(
+                email_id=email_id,
+                tenant_id=tenant_id,
+                event_type=event_type,
+                provider=provider,
+                provider_event_id=provider_event_id,
+                payload_json=payload,
+            )
+        )
+        return
+
+    now = datetime.utcnow()
+    db.info.setdefault(PENDING_EVENTS_KEY, []).append(
+        {
+            "email_id": email_id,
+            "tenant_id": tenant_id,
+            "event_type": event_type,
+            "event_time": now,
+            "provider": provider,
+            "provider_event_id": provider_event_id,
+            "payload_json": payload,
+            "created_at": now,
+        }
+    )
+
+
+def reset_event_writer_after_fork() -> None:
+    if get_event_writer.cache_info().currsize:
+        writer = get_event_writer()
+        if writer is not None:
+            writer.reset_after_fork()
+
+
+def close_event_writer() -> None:
+    if get_event_writer.cache_info().currsize:
+        writer = get_event_writer()
+        if writer is not None:
+            writer.close()
+
+
+@event.listens_for(Session, "after_commit")
+def _hand_off_pending_events(session: Session) -> None:
+    rows = session.info.pop(PENDING_EVENTS_KEY, None)
+    if rows:
+        writer = get_event_writer()
+        if writer is not None:
+            writer.add_many(rows)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session: Session) -> None:
+    session.info.pop(PENDING_EVENTS_KEY, None)
+
+
+os.register_at_fork(after_in_child=reset_event_writer_after_fork)
+atexit.register(close_event_writer)
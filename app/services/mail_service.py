@@ -1,64 +1,167 @@
 import logging
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 
-from sqlalchemy import and_, select
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
-from app.core.idempotency import create_or_reuse_email
-from app.domain.enums import EmailStatus, EventType
-from app.domain.models import DeadLetter, Email, EmailEvent, Template, Tenant
+from app.core.idempotency import (
+    create_or_reuse_email,
+    create_or_reuse_email_async,
+    get_async_idempotency_cache,
+    get_idempotency_cache,
+)
+from app.core.metrics import DB_SECONDS, observe_send, observe_seconds, record_transition
+from app.core.pacing import SendPacer, get_send_pacer
+from app.domain.enums import EmailStatus, EventType, TenantStatus
+from app.domain.models import DeadLetter, Email, Template, Tenant
 from app.domain.schemas import SendRequest
-from app.providers.base import EmailMessage
+from app.providers.base import EmailMessage, ProviderResponse
+from app.providers.circuit_breaker import CircuitOpenError
 from app.providers.registry import registry
 from app.queue.retry_policy import compute_retry_delay
-from app.templates.renderer import render_template
+from app.services.bulk_progress import count_bulk_progress
+from app.services.event_writer import append_event
+from app.services.send_context import TemplateInfo, get_send_context_cache
+from app.templates.render_stage import RenderOutput, get_render_stage
 
 logger = logging.getLogger(__name__)
 
 
+def due_emails_condition(now: datetime):
+    return or_(
+        and_(
+            Email.status == EmailStatus.queued.value,
+            or_(Email.next_retry_at.is_(None), Email.next_retry_at <= now),
+        ),
+        and_(Email.status == EmailStatus.scheduled.value, Email.scheduled_at <= now),
+    )
+
+
+def swept_emails_condition(now: datetime):
+    # Fresh queued rows (next_retry_at IS NULL) were already published by /send or bulk, so the sweeper skips them.
+    return or_(
+        and_(Email.status == EmailStatus.queued.value, Email.next_retry_at <= now),
+        and_(Email.status == EmailStatus.scheduled.value, Email.scheduled_at <= now),
+    )
+
+
+def claim_due_emails_statement(limit: int, now: datetime, condition=None, **values):
+    due = (
+        select(Email.id)
+        .where(due_emails_condition(now) if condition is None else condition)
+        .order_by(Email.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(Email)
+        .where(Email.id.in_(due.scalar_subquery()))
+        .values(**{"status": EmailStatus.processing.value, "updated_at": now, **values})
+        .returning(Email.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def build_email(request: SendRequest, provider: str) -> Email:
+    return Email(
+        tenant_id=request.tenant_id,
+        idempotency_key=request.idempotency_key,
+        recipient_email=str(request.recipient.email),
+        recipient_name=request.recipient.name,
+        template_id=request.template_id,
+        variables_json=request.variables,
+        metadata_json=request.metadata,
+        provider_name=provider,
+        status=EmailStatus.scheduled.value if request.send_at else EmailStatus.queued.value,
+        scheduled_at=request.send_at,
+    )
+
+
+def check_send_context(tenant_id: str, status: str | None, template: TemplateInfo | None) -> TemplateInfo:
+    if status != TenantStatus.active.value:
+        raise ValueError("tenant not found or disabled")
+    if not template or template.tenant_id != tenant_id or not template.is_active:
+        raise ValueError("template not found")
+    return template
+
+
+def template_info_statement(template_id: str):
+    return select(Template.id, Template.tenant_id, Template.version, Template.is_active).where(Template.id == template_id)
+
+
+def template_info(row) -> TemplateInfo | None:
+    if row is None:
+        return None
+    return TemplateInfo(id=row.id, tenant_id=row.tenant_id, version=row.version, is_active=row.is_active)
+
+
+def error_response(exc: Exception, error_code: str, transient: bool) -> ProviderResponse:
+    return ProviderResponse(
+        provider_message_id="",
+        accepted=False,
+        raw_status=error_code,
+        transient=transient,
+        error_code=error_code,
+        error_message=str(exc) or type(exc).__name__,
+    )
+
+
+def build_message(email: Email, template: Template, rendered: RenderOutput | Exception | None = None) -> EmailMessage:
+    if rendered is None:
+        rendered = get_render_stage().render(template, email.variables_json)
+    if isinstance(rendered, Exception):
+        raise rendered
+    subject, html, text = rendered
+    return EmailMessage(
+        email_id=email.id,
+        tenant_id=email.tenant_id,
+        to_email=email.recipient_email,
+        to_name=email.recipient_name,
+        subject=subject,
+        html_body=html,
+        text_body=text,
+        metadata=email.metadata_json,
+    )
+
+
 class MailService:
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: Session, pacer: SendPacer | None = None) -> None:
         self.db = db
         self.settings = get_settings()
+        self.pacer = pacer if pacer is not None else get_send_pacer()
 
-    def enqueue_send(self, request: SendRequest) -> tuple[Email, bool]:
-        tenant = self.db.execute(
-            select(Tenant).where(Tenant.id == request.tenant_id, Tenant.status == "active")
-        ).scalar_one_or_none()
-        if not tenant:
+    def resolve_send_context(self, tenant_id: str, template_id: str) -> TemplateInfo:
+        cache = get_send_context_cache()
+        status = cache.tenant_status(
+            tenant_id,
+            lambda: self.db.execute(select(Tenant.status).where(Tenant.id == tenant_id)).scalar_one_or_none(),
+        )
+        if status != TenantStatus.active.value:
             raise ValueError("tenant not found or disabled")
 
-        template = self.db.execute(
-            select(Template).where(
-                Template.id == request.template_id,
-                Template.tenant_id == request.tenant_id,
-                Template.is_active.is_(True),
-            )
-        ).scalar_one_or_none()
-        if not template:
-            raise ValueError("template not found")
+        template = cache.template(template_id, lambda: self._load_template_info(template_id))
+        return check_send_context(tenant_id, status, template)
+
+    def _load_template_info(self, template_id: str) -> TemplateInfo | None:
+        return template_info(self.db.execute(template_info_statement(template_id)).one_or_none())
+
+    def enqueue_send(self, request: SendRequest) -> tuple[Email, bool]:
+        self.resolve_send_context(request.tenant_id, request.template_id)
 
         provider = request.provider_hint or self.settings.default_provider
-        status = EmailStatus.scheduled.value if request.send_at else EmailStatus.queued.value
-
-        email = Email(
-            tenant_id=request.tenant_id,
-            idempotency_key=request.idempotency_key,
-            recipient_email=str(request.recipient.email),
-            recipient_name=request.recipient.name,
-            template_id=request.template_id,
-            variables_json=request.variables,
-            metadata_json=request.metadata,
-            provider_name=provider,
-            status=status,
-            scheduled_at=request.send_at,
-        )
+        email = build_email(request, provider)
 
-        result = create_or_reuse_email(self.db, email)
+        cache = get_idempotency_cache()
+        result = create_or_reuse_email(self.db, email, cache)
         if not result.reused:
             self._append_event(result.email, EventType.queued.value, {"scheduled": bool(request.send_at)})
             self.db.commit()
+            record_transition(email.status, provider, request.tenant_id)
+            if cache is not None:
+                cache.remember(result.email)
 
         return result.email, result.reused
 
@@ -72,35 +175,88 @@ class MailService:
             return
 
         claim = self.db.query(Email).filter(
-            and_(Email.id == email.id, Email.status.in_([EmailStatus.queued.value, EmailStatus.scheduled.value, EmailStatus.processing.value]))
+            and_(Email.id == email.id, Email.status.in_([EmailStatus.queued.value, EmailStatus.scheduled.value]))
         ).update({Email.status: EmailStatus.processing.value}, synchronize_session=False)
-        self.db.commit()
+        with observe_seconds(DB_SECONDS, operation="claim"):
+            self.db.commit()
         if claim == 0:
             return
 
         email = self.db.execute(select(Email).where(Email.id == email_id)).scalar_one()
         template = self.db.execute(select(Template).where(Template.id == email.template_id)).scalar_one()
-        subject, html, text = render_template(
-            template.subject_template,
-            template.html_template,
-            template.text_template,
-            email.variables_json,
-        )
+        retry_delay = self._deliver(email, template)
+        with observe_seconds(DB_SECONDS, operation="commit"):
+            self.db.commit()
 
-        provider = registry.get(email.provider_name)
-        response = provider.send(
-            EmailMessage(
-                email_id=email.id,
-                tenant_id=email.tenant_id,
-                to_email=email.recipient_email,
-                to_name=email.recipient_name,
-                subject=subject,
-                html_body=html,
-                text_body=text,
-                metadata=email.metadata_json,
-            )
-        )
+        if retry_delay is not None and self.settings.scheduler_mode != "sweeper":
+            from app.queue.tasks_send import process_email_task
 
+            process_email_task.apply_async(args=[email.id], countdown=retry_delay, queue="mail.send")
+
+    def process_batch(self, limit: int) -> tuple[int, list[int]]:
+        with observe_seconds(DB_SECONDS, operation="claim"):
+            claimed_ids = list(self.db.execute(claim_due_emails_statement(limit, datetime.utcnow())).scalars())
+            self.db.commit()
+        if not claimed_ids:
+            return 0, []
+
+        emails = self.db.execute(select(Email).where(Email.id.in_(claimed_ids)).order_by(Email.created_at)).scalars().all()
+        template_ids = {email.template_id for email in emails}
+        templates = {
+            template.id: template
+            for template in self.db.execute(select(Template).where(Template.id.in_(template_ids))).scalars()
+        }
+
+        rendered = get_render_stage().render_many([(templates[email.template_id], email.variables_json) for email in emails])
+        retry_delays = []
+        for email, output in zip(emails, rendered):
+            retry_delay = self._deliver(email, templates[email.template_id], output)
+            if retry_delay is not None:
+                retry_delays.append(retry_delay)
+        with observe_seconds(DB_SECONDS, operation="commit"):
+            self.db.commit()
+        return len(emails), retry_delays
+
+    def _deliver(self, email: Email, template: Template, rendered: RenderOutput | Exception | None = None) -> int | None:
+        delay = self.pace(email)
+        if delay:
+            return delay
+
+        # Anything raised past this point would leave the claimed row in processing, so record it as a result.
+        try:
+            provider = registry.get(email.provider_name)
+            message = build_message(email, template, rendered)
+        except Exception as exc:
+            logger.warning("email cannot be built", extra={"email_id": email.id, "error": str(exc)})
+            return self.record_response(email, error_response(exc, "build_error", transient=False))
+        start = time.perf_counter()
+        try:
+            response = provider.send(message)
+        except CircuitOpenError as exc:
+            self.defer(email, exc.retry_after_seconds)
+            return exc.retry_after_seconds
+        except Exception as exc:
+            observe_send(email, None, time.perf_counter() - start)
+            logger.exception("provider send raised", extra={"email_id": email.id, "provider": email.provider_name})
+            response = error_response(exc, "provider_error", transient=True)
+        else:
+            observe_send(email, response, time.perf_counter() - start)
+        return self.record_response(email, response)
+
+    def pace(self, email: Email) -> int:
+        if self.pacer is None:
+            return 0
+        delay = self.pacer.acquire(email.provider_name, email.tenant_id)
+        if delay:
+            self.defer(email, delay)
+        return delay
+
+    def defer(self, email: Email, delay: int) -> None:
+        email.status = EmailStatus.queued.value
+        email.next_retry_at = datetime.utcnow() + timedelta(seconds=delay)
+        record_transition(email.status, email.provider_name, email.tenant_id)
+
+    def record_response(self, email: Email, response: ProviderResponse) -> int | None:
         email.attempt_count += 1
         if response.accepted:
             email.status = EmailStatus.sent.value
@@ -108,14 +264,15 @@ class MailService:
             email.provider_message_id = response.provider_message_id
             email.failure_reason = None
             self._append_event(email, EventType.sent.value, {"provider_status": response.raw_status})
-            self.db.commit()
-            return
+            count_bulk_progress(self.db, email.bulk_job_id, "sent_count")
+            record_transition(email.status, email.provider_name, email.tenant_id)
+            return None
 
         if response.transient and email.attempt_count < self.settings.max_retries:
             delay = compute_retry_delay(email.attempt_count, self.settings.retry_base_seconds, self.settings.retry_max_seconds)
             email.status = EmailStatus.queued.value
             email.failure_reason = response.error_message
-            email.next_retry_at = datetime.utcnow()
+            email.next_retry_at = datetime.utcnow() + timedelta(seconds=delay)
             self._append_event(
                 email,
                 EventType.retry_scheduled.value,
@@ -125,11 +282,8 @@ class MailService:
                     "error_code": response.error_code,
                 },
             )
-            self.db.commit()
-            from app.queue.tasks_send import process_email_task
-
-            process_email_task.apply_async(args=[email.id], countdown=delay, queue="mail.send")
-            return
+            record_transition(email.status, email.provider_name, email.tenant_id)
+            return delay
 
         email.status = EmailStatus.failed.value
         email.failed_at = datetime.utcnow()
@@ -149,15 +303,55 @@ class MailService:
             )
         )
         self._append_event(email, EventType.dead_lettered.value, {"reason": email.failure_reason})
-        self.db.commit()
+        count_bulk_progress(self.db, email.bulk_job_id, "failed_count")
+        record_transition(email.status, email.provider_name, email.tenant_id)
+        return None
 
     def _append_event(self, email: Email, event_type: str, payload: dict) -> None:
-        self.db.add(
-            EmailEvent(
-                email_id=email.id,
-                tenant_id=email.tenant_id,
-                event_type=event_type,
-                provider=email.provider_name,
-                payload_json=payload,
+        append_event(self.db, email.id, email.tenant_id, event_type, email.provider_name, payload)
+
+
+class AsyncMailService:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.settings = get_settings()
+
+    async def resolve_send_context(self, tenant_id: str, template_id: str) -> TemplateInfo:
+        cache = get_send_context_cache()
+        status = await cache.tenant_status_async(tenant_id, lambda: self._load_tenant_status(tenant_id))
+        if status != TenantStatus.active.value:
+            raise ValueError("tenant not found or disabled")
+
+        template = await cache.template_async(template_id, lambda: self._load_template_info(template_id))
+        return check_send_context(tenant_id, status, template)
+
+    async def _load_tenant_status(self, tenant_id: str) -> str | None:
+        return (await self.db.execute(select(Tenant.status).where(Tenant.id == tenant_id))).scalar_one_or_none()
+
+    async def _load_template_info(self, template_id: str) -> TemplateInfo | None:
+        return template_info((await self.db.execute(template_info_statement(template_id))).one_or_none())
+
+    async def enqueue_send(self, request: SendRequest) -> tuple[Email, bool]:
+        await self.resolve_send_context(request.tenant_id, request.template_id)
+
+        provider = request.provider_hint or self.settings.default_provider
+        email = build_email(request, provider)
+
+        cache = get_async_idempotency_cache()
+        result = await create_or_reuse_email_async(self.db, email, cache)
+        if not result.reused:
+            created = result.email
+            append_event(
+                self.db.sync_session,
+                created.id,
+                created.tenant_id,
+                EventType.queued.value,
+                created.provider_name,
+                {"scheduled": bool(request.send_at)},
             )
-        )
+            await self.db.commit()
+            record_transition(email.status, provider, request.tenant_id)
+            if cache is not None:
+                await cache.remember(created)
+
+        return result.email, result.reused
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.domain.enums import EmailStatus
+from app.domain.models import Email
+from app.services.mail_service import claim_due_emails_statement, swept_emails_condition
+
+
+class SchedulerService:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+        self.settings = get_settings()
+
+    def lease_due(self, limit: int, now: datetime | None = None) -> list[str]:
+        now = now or datetime.utcnow()
+        lease_until = now + timedelta(seconds=self.settings.scheduler_lease_seconds)
+        leased = list(
+            self.db.execute(
+                claim_due_emails_statement(
+                    limit,
+                    now,
+                    condition=swept_emails_condition(now),
+                    status=EmailStatus.queued.value,
+                    next_retry_at=lease_until,
+                )
+            ).scalars()
+        )
+        self.db.commit()
+        return leased
+
+    def count_due(self, limit: int, now: datetime | None = None) -> int:
+        due = select(Email.id).where(swept_emails_condition(now or datetime.utcnow())).limit(limit).subquery()
+        return self.db.execute(select(func.count()).select_from(due)).scalar_one()
+
+    def reclaim_stale(self, limit: int, now: datetime | None = None) -> list[str]:
+        now = now or datetime.utcnow()
+        stale_before = now - timedelta(seconds=self.settings.send_processing_lease_seconds)
+        stale = (
+            select(Email.id)
+            .where(Email.status == EmailStatus.processing.value, Email.updated_at <= stale_before)
+            .order_by(Email.updated_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        reclaimed = list(
+            self.db.execute(
+                update(Email)
+                .where(Email.id.in_(stale.scalar_subquery()))
+                .values(status=EmailStatus.queued.value, next_retry_at=None, updated_at=now)
+                .returning(Email.id)
+                .execution_options(synchronize_session=False)
+            ).scalars()
+        )
+        self.db.commit()
+        return reclaimed
@@ -0,0 +1,203 @@
+import asyncio
+import json
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+
+from redis import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.cache import MISSING, TTLCache
+from app.core.config import get_settings
+from app.core.metrics import record_cache_lookup
+from app.db.session import get_redis
+from app.domain.models import Template, Tenant
+
+STALE_CONTEXT_KEY = "stale_send_context"
+
+
+@dataclass(slots=True, frozen=True)
+class TemplateInfo:
+    id: str
+    tenant_id: str
+    version: int
+    is_active: bool
+
+
+class SendContextCache:
+    def __init__(self, maxsize: int, ttl_seconds: int, redis_client: Redis | None = None) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.redis = redis_client
+        self.tenants = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self.templates = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+
+    def tenant_status(self, tenant_id: str, loader: Callable[[], str | None]) -> str | None:
+        status = self._local(self.tenants, "send_context_tenant", tenant_id)
+        if status is not MISSING:
+            return status
+
+        status = self._redis_get(f"ctx:tenant:{tenant_id}")
+        if status is None:
+            status = loader()
+            if status is None:
+                return None
+            self._redis_set(f"ctx:tenant:{tenant_id}", status)
+        self.tenants.set(tenant_id, status)
+        return status
+
+    def template(self, template_id: str, loader: Callable[[], TemplateInfo | None]) -> TemplateInfo | None:
+        info = self._local(self.templates, "send_context_template", template_id)
+        if info is not MISSING:
+            return info
+
+        cached = self._redis_get(f"ctx:template:{template_id}")
+        if cached is not None:
+            info = TemplateInfo(**json.loads(cached))
+        else:
+            info = loader()
+            if info is None:
+                return None
+            self._redis_set(f"ctx:template:{template_id}", json.dumps(asdict(info)))
+        self.templates.set(template_id, info)
+        return info
+
+    async def tenant_status_async(self, tenant_id: str, loader: Callable[[], Awaitable[str | None]]) -> str | None:
+        status = self._local(self.tenants, "send_context_tenant", tenant_id)
+        if status is not MISSING:
+            return status
+
+        status = await self._redis_get_async(f"ctx:tenant:{tenant_id}")
+        if status is None:
+            status = await loader()
+            if status is None:
+                return None
+            await self._redis_set_async(f"ctx:tenant:{tenant_id}", status)
+        self.tenants.set(tenant_id, status)
+        return status
+
+    async def template_async(
+        self, template_id: str, loader: Callable[[], Awaitable[TemplateInfo | None]]
+    ) -> TemplateInfo | None:
+        info = self._local(self.templates, "send_context_template", template_id)
+        if info is not MISSING:
+            return info
+
+        cached = await self._redis_get_async(f"ctx:template:{template_id}")
+        if cached is not None:
+            info = TemplateInfo(**json.loads(cached))
+        else:
+            info = await loader()
+            if info is None:
+                return None
+            await self._redis_set_async(f"ctx:template:{template_id}", json.dumps(asdict(info)))
+        self.templates.set(template_id, info)
+        return info
+
+    def invalidate_tenant(self, tenant_id: str) -> None:
+        self.tenants.invalidate(tenant_id)
+        self._redis_delete(f"ctx:tenant:{tenant_id}")
+
+    def invalidate_template(self, template_id: str) -> None:
+        self.templates.invalidate(template_id)
+        self._redis_delete(f"ctx:template:{template_id}")
+
+    def clear(self) -> None:
+        self.tenants.clear()
+        self.templates.clear()
+
+    def stats(self) -> dict:
+        return {"tenants": self.tenants.stats(), "templates": self.templates.stats()}
+
+    def _local(self, cache: TTLCache, name: str, key: str):
+        value = cache.get(key)
+        record_cache_lookup(name, hit=value is not MISSING)
+        return value
+
+    def _redis_get(self, key: str) -> str | None:
+        if self.redis is None:
+            return None
+        try:
+            return self.redis.get(key)
+        except RedisError:
+            return None
+
+    def _redis_set(self, key: str, value: str) -> None:
+        if self.redis is None:
+            return
+        try:
+            self.redis.set(key, value, ex=self.ttl_seconds)
+        except RedisError:
+            pass
+
+    async def _redis_get_async(self, key: str) -> str | None:
+        if self.redis is None:
+            return None
+        return await asyncio.to_thread(self._redis_get, key)
+
+    async def _redis_set_async(self, key: str, value: str) -> None:
+        if self.redis is None:
+            return
+        await asyncio.to_thread(self._redis_set, key, value)
+
+    def _redis_delete(self, key: str) -> None:
+        if self.redis is None:
+            return
+        try:
+            self.redis.delete(key)
+        except RedisError:
+            pass
+
+
+@lru_cache(maxsize=1)
+def get_send_context_cache() -> SendContextCache:
+    settings = get_settings()
+    return SendContextCache(
+        maxsize=settings.send_context_cache_size,
+        ttl_seconds=settings.send_context_cache_ttl_seconds,
+        redis_client=get_redis() if settings.send_context_cache_redis else None,
+    )
+
+
+# Invalidate only after commit: dropping the keys at flush time lets another process re-cache the
+# still-committed old row (e.g. an active tenant that is being disabled) for the whole TTL.
+def _mark_stale(target: Tenant | Template, kind: str) -> None:
+    session = object_session(target)
+    if session is None:
+        _invalidate(get_send_context_cache(), kind, target.id)
+        return
+    session.info.setdefault(STALE_CONTEXT_KEY, set()).add((kind, target.id))
+
+
+def _invalidate(cache: SendContextCache, kind: str, key: str) -> None:
+    if kind == "tenant":
+        cache.invalidate_tenant(key)
+    else:
+        cache.invalidate_template(key)
+
+
+@event.listens_for(Tenant, "after_update")
+@event.listens_for(Tenant, "after_delete")
+def _invalidate_tenant(mapper, connection, target: Tenant) -> None:
+    _mark_stale(target, "tenant")
+
+
+@event.listens_for(Template, "after_update")
+@event.listens_for(Template, "after_delete")
+def _invalidate_template(mapper, connection, target: Template) -> None:
+    _mark_stale(target, "template")
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    stale = session.info.pop(STALE_CONTEXT_KEY, None)
+    if stale:
+        cache = get_send_context_cache()
+        for kind, key in stale:
+            _invalidate(cache, kind, key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale(session: Session) -> None:
+    session.info.pop(STALE_CONTEXT_KEY, None)
@@ -1,14 +1,30 @@
 import hashlib
+import json
 from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import or_, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
+from app.core.metrics import record_transition
 from app.core.security import verify_webhook_signature
+from app.db.dialect import insert_for
 from app.domain.enums import EmailStatus
-from app.domain.models import Email, EmailEvent, ProviderWebhookEvent
+from app.domain.models import Email, ProviderWebhookEvent
+from app.services.event_writer import append_event
+
+EVENT_STRING_FIELDS = ("email_id", "provider_message_id", "tenant_id", "event_type", "reason")
+
+
+def valid_event_fields(event) -> bool:
+    return isinstance(event, dict) and all(
+        event.get(field) is None or isinstance(event[field], str) for field in EVENT_STRING_FIELDS
+    )
+
+
+def valid_event(event) -> bool:
+    return valid_event_fields(event) and isinstance(event.get("event_id"), str) and bool(event["event_id"])
 
 
 class WebhookService:
@@ -16,6 +32,16 @@ class WebhookService:
         self.db = db
         self.settings = get_settings()
 
+    def verify(self, provider: str, payload: bytes, signature: str, timestamp: str) -> None:
+        secret = self._secret_for(provider)
+        verify_webhook_signature(
+            payload=payload,
+            provided_signature=signature,
+            timestamp=timestamp,
+            secret=secret,
+            replay_window_seconds=self.settings.webhook_replay_window_seconds,
+        )
+
     def process_event(
         self,
         provider: str,
@@ -25,14 +51,9 @@ class WebhookService:
         timestamp: str,
         event_id: str,
     ) -> None:
-        secret = self._secret_for(provider)
-        verify_webhook_signature(
-            payload=payload,
-            provided_signature=signature,
-            timestamp=timestamp,
-            secret=secret,
-            replay_window_seconds=self.settings.webhook_replay_window_seconds,
-        )
+        self.verify(provider, payload, signature, timestamp)
+        if not valid_event_fields(parsed_payload):
+            raise ValueError("invalid webhook event")
 
         record = ProviderWebhookEvent(
             provider=provider,
@@ -59,8 +80,89 @@ class WebhookService:
         if not email:
             return
 
-        event_type = parsed_payload.get("event_type", "")
+        if self._apply(provider, event_id, email, parsed_payload, datetime.utcnow()):
+            self.db.commit()
+
+    def process_batch(
+        self,
+        provider: str,
+        payload: bytes,
+        events: list,
+        signature: str,
+        timestamp: str,
+    ) -> list[dict]:
+        self.verify(provider, payload, signature, timestamp)
+        if len(events) > self.settings.webhook_batch_max_events:
+            raise ValueError(f"batch exceeds {self.settings.webhook_batch_max_events} events")
+        return self.apply_events(provider, events)
+
+    def apply_events(self, provider: str, events: list) -> list[dict]:
+        results = [{"event_id": None, "status": "invalid"} for _ in events]
+        candidates: list[tuple[int, dict]] = []
+        for index, event in enumerate(events):
+            if valid_event(event):
+                results[index]["event_id"] = event["event_id"]
+                candidates.append((index, event))
+        if not candidates:
+            return results
+
         now = datetime.utcnow()
+        webhook_events = ProviderWebhookEvent.__table__
+        inserted = set(
+            self.db.execute(
+                insert_for(self.db, webhook_events)
+                .values(
+                    [
+                        {
+                            "provider": provider,
+                            "provider_event_id": event["event_id"],
+                            "tenant_id": event.get("tenant_id"),
+                            "signature_valid": True,
+                            "received_at": now,
+                            "payload_hash": hashlib.sha256(json.dumps(event, sort_keys=True).encode("utf-8")).hexdigest(),
+                        }
+                        for _, event in candidates
+                    ]
+                )
+                .on_conflict_do_nothing(index_elements=[webhook_events.c.provider, webhook_events.c.provider_event_id])
+                .returning(webhook_events.c.provider_event_id)
+            ).scalars()
+        )
+
+        fresh: list[tuple[int, dict]] = []
+        for index, event in candidates:
+            if event["event_id"] in inserted:
+                inserted.discard(event["event_id"])
+                fresh.append((index, event))
+            else:
+                results[index]["status"] = "duplicate"
+
+        email_ids = {event["email_id"] for _, event in fresh if event.get("email_id")}
+        message_ids = {event["provider_message_id"] for _, event in fresh if event.get("provider_message_id")}
+        by_id: dict[str, Email] = {}
+        by_message_id: dict[str, Email] = {}
+        if email_ids or message_ids:
+            for email in self.db.execute(
+                select(Email).where(or_(Email.id.in_(email_ids), Email.provider_message_id.in_(message_ids)))
+            ).scalars():
+                by_id[email.id] = email
+                if email.provider_message_id:
+                    by_message_id[email.provider_message_id] = email
+
+        for index, event in fresh:
+            email = by_id.get(event.get("email_id")) or by_message_id.get(event.get("provider_message_id"))
+            if not email:
+                results[index]["status"] = "email_not_found"
+            elif self._apply(provider, event["event_id"], email, event, now):
+                results[index]["status"] = "applied"
+            else:
+                results[index]["status"] = "ignored"
+
+        self.db.commit()
+        return results
+
+    def _apply(self, provider: str, event_id: str, email: Email, parsed_payload: dict, now: datetime) -> bool:
+        event_type = parsed_payload.get("event_type", "")
 
         if event_type == "delivered" and email.status in {EmailStatus.sent.value, EmailStatus.delivered.value}:
             email.status = EmailStatus.delivered.value
@@ -77,19 +179,11 @@ class WebhookService:
             email.failed_at = now
             email.failure_reason = parsed_payload.get("reason", "provider_failed")
         else:
-            return
+            return False
 
-        self.db.add(
-            EmailEvent(
-                email_id=email.id,
-                tenant_id=email.tenant_id,
-                event_type=event_type,
-                provider=provider,
-                provider_event_id=event_id,
-                payload_json=parsed_payload,
-            )
-        )
-        self.db.commit()
+        append_event(self.db, email.id, email.tenant_id, event_type, provider, parsed_payload, provider_event_id=event_id)
+        record_transition(email.status, email.provider_name, email.tenant_id)
+        return True
 
     def _secret_for(self, provider: str) -> str:
         if provider == "smtp":
@@ -0,0 +1,48 @@
+import logging
+from functools import lru_cache
+
+from jinja2 import BytecodeCache, FileSystemBytecodeCache
+from jinja2.bccache import Bucket
+from redis import Redis, RedisError
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class RedisBytecodeCache(BytecodeCache):
+    def __init__(self, client: Redis, ttl_seconds: int, prefix: str = "jinja:bytecode:") -> None:
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def load_bytecode(self, bucket: Bucket) -> None:
+        try:
+            data = self.client.get(self.prefix + bucket.key)
+        except RedisError:
+            logger.warning("bytecode cache read failed", exc_info=True)
+            return
+        if data:
+            bucket.bytecode_from_string(data)
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        try:
+            self.client.set(self.prefix + bucket.key, bucket.bytecode_to_string(), ex=self.ttl_seconds)
+        except RedisError:
+            logger.warning("bytecode cache write failed", exc_info=True)
+
+
+@lru_cache(maxsize=1)
+def get_bytecode_cache() -> BytecodeCache | None:
+    settings = get_settings()
+    if settings.template_bytecode_cache == "redis":
+        # Bytecode is binary, so this cannot share the decode_responses pool from app.db.session.
+        client = Redis.from_url(
+            settings.redis_url,
+            socket_timeout=settings.redis_socket_timeout_seconds,
+            socket_connect_timeout=settings.redis_socket_timeout_seconds,
+        )
+        return RedisBytecodeCache(client, ttl_seconds=settings.template_bytecode_cache_ttl_seconds)
+    if settings.template_bytecode_cache == "disk":
+        return FileSystemBytecodeCache(directory=settings.template_bytecode_cache_dir or None)
+    return None
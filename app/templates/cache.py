@@ -0,0 +1,113 @@
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+from threading import Lock
+
+from jinja2 import BytecodeCache
+from sqlalchemy import event
+
+from app.core.config import get_settings
+from app.core.metrics import record_cache_lookup
+from app.domain.models import Template
+from app.templates.bytecode_cache import get_bytecode_cache
+from app.templates.renderer import CompiledTemplate, compile_template
+
+
+def content_hash(subject_template: str, html_template: str, text_template: str | None) -> str:
+    digest = hashlib.sha256()
+    for part in (subject_template, html_template, text_template or ""):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class TemplateCache:
+    def __init__(self, maxsize: int, bytecode_cache: BytecodeCache | None = None) -> None:
+        self.maxsize = maxsize
+        self.bytecode_cache = bytecode_cache
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple[str, int, str], CompiledTemplate] = OrderedDict()
+        self._lock = Lock()
+
+    def get_or_compile(
+        self,
+        template_id: str,
+        version: int,
+        subject_template: str,
+        html_template: str,
+        text_template: str | None,
+    ) -> CompiledTemplate:
+        key = (template_id, version, content_hash(subject_template, html_template, text_template))
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                record_cache_lookup("template", hit=True)
+                return compiled
+            self.misses += 1
+        record_cache_lookup("template", hit=False)
+
+        compiled = compile_template(
+            subject_template,
+            html_template,
+            text_template,
+            name=f"{template_id}:{version}",
+            bytecode_cache=self.bytecode_cache,
+        )
+        if self.maxsize <= 0:
+            return compiled
+
+        with self._lock:
+            self._entries[key] = compiled
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return compiled
+
+    def get_for(self, template: Template) -> CompiledTemplate:
+        return self.get_or_compile(
+            template.id,
+            template.version,
+            template.subject_template,
+            template.html_template,
+            template.text_template,
+        )
+
+    def invalidate(self, template_id: str) -> int:
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == template_id]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_template_cache() -> TemplateCache:
+    return TemplateCache(maxsize=get_settings().template_cache_size, bytecode_cache=get_bytecode_cache())
+
+
+@event.listens_for(Template, "after_update")
+@event.listens_for(Template, "after_delete")
+def _invalidate_template(mapper, connection, target: Template) -> None:
+    get_template_cache().invalidate(target.id)
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from threading import Lock
+
+from app.core.config import get_settings
+from app.core.metrics import RENDER_SECONDS
+from app.domain.models import Template
+from app.templates.cache import content_hash, get_template_cache
+from app.templates.renderer import render_compiled
+
+logger = logging.getLogger(__name__)
+
+RenderOutput = tuple[str, str, str]
+
+
+@dataclass(slots=True)
+class TemplateRenderStats:
+    renders: int = 0
+    cache_hits: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+def variables_hash(variables: dict) -> str:
+    encoded = json.dumps(variables, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _render_job(
+    template_id: str,
+    version: int,
+    subject_template: str,
+    html_template: str,
+    text_template: str | None,
+    variables: dict,
+) -> tuple[RenderOutput, float]:
+    start = time.perf_counter()
+    compiled = get_template_cache().get_or_compile(template_id, version, subject_template, html_template, text_template)
+    output = render_compiled(compiled, variables)
+    return output, time.perf_counter() - start
+
+
+class RenderStage:
+    def __init__(self, processes: int, cache_size: int) -> None:
+        self.processes = processes
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._outputs: OrderedDict[tuple[str, int, str, str], RenderOutput] = OrderedDict()
+        self._templates: dict[str, TemplateRenderStats] = {}
+        self._lock = Lock()
+        self._executor: ProcessPoolExecutor | None = None
+
+    def render(self, template: Template, variables: dict) -> RenderOutput:
+        result = self.render_many([(template, variables)])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def render_many(self, items: Sequence[tuple[Template, dict]]) -> list[RenderOutput | Exception]:
+        results: list[RenderOutput | Exception | None] = [None] * len(items)
+        pending: dict[tuple[str, int, str, str], list[int]] = {}
+        with self._lock:
+            for index, (template, variables) in enumerate(items):
+                key = (
+                    template.id,
+                    template.version,
+                    content_hash(template.subject_template, template.html_template, template.text_template),
+                    variables_hash(variables),
+                )
+                output = self._outputs.get(key)
+                if output is not None:
+                    self._outputs.move_to_end(key)
+                    self.hits += 1
+                    self._stats_for(template.id).cache_hits += 1
+                    results[index] = output
+                else:
+                    pending.setdefault(key, []).append(index)
+
+        jobs = []
+        for indexes in pending.values():
+            template, variables = items[indexes[0]]
+            jobs.append(
+                (
+                    template.id,
+                    template.version,
+                    template.subject_template,
+                    template.html_template,
+                    template.text_template,
+                    variables,
+                )
+            )
+        outcomes = self._run(jobs)
+
+        with self._lock:
+            for (key, indexes), outcome in zip(pending.items(), outcomes):
+                stats = self._stats_for(key[0])
+                if isinstance(outcome, Exception):
+                    stats.errors += 1
+                    self.misses += len(indexes)
+                    for index in indexes:
+                        results[index] = outcome
+                    continue
+
+                output, elapsed = outcome
+                RENDER_SECONDS.observe(elapsed)
+                self.misses += 1
+                self.hits += len(indexes) - 1
+                stats.renders += 1
+                stats.cache_hits += len(indexes) - 1
+                stats.total_seconds += elapsed
+                stats.max_seconds = max(stats.max_seconds, elapsed)
+                for index in indexes:
+                    results[index] = output
+                if self.cache_size > 0:
+                    self._outputs[key] = output
+                    while len(self._outputs) > self.cache_size:
+                        self._outputs.popitem(last=False)
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "processes": self.processes,
+                "cache": {
+                    "size": len(self._outputs),
+                    "maxsize": self.cache_size,
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                },
+                "templates": {template_id: asdict(stats) for template_id, stats in self._templates.items()},
+            }
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def reset_after_fork(self) -> None:
+        self._lock = Lock()
+        self._executor = None
+
+    def _stats_for(self, template_id: str) -> TemplateRenderStats:
+        stats = self._templates.get(template_id)
+        if stats is None:
+            stats = self._templates[template_id] = TemplateRenderStats()
+        return stats
+
+    def _run(self, jobs: list[tuple]) -> list[tuple[RenderOutput, float] | Exception]:
+        # A single render is cheaper in-process than a round trip to the pool.
+        if self.processes > 0 and len(jobs) > 1:
+            try:
+                return self._run_in_pool(jobs)
+            except (AssertionError, OSError, BrokenProcessPool):
+                logger.warning("render pool unavailable, rendering inline", exc_info=True)
+                self.close()
+                self.processes = 0
+        return [self._call(job) for job in jobs]
+
+    def _run_in_pool(self, jobs: list[tuple]) -> list[tuple[RenderOutput, float] | Exception]:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes, mp_context=multiprocessing.get_context("spawn")
+            )
+        futures = [self._executor.submit(_render_job, *job) for job in jobs]
+        outcomes = []
+        for future in futures:
+            try:
+                outcomes.append(future.result())
+            except BrokenProcessPool:
+                raise
+            except Exception as exc:
+                outcomes.append(exc)
+        return outcomes
+
+    @staticmethod
+    def _call(job: tuple) -> tuple[RenderOutput, float] | Exception:
+        try:
+            return _render_job(*job)
+        except Exception as exc:
+            return exc
+
+
+@lru_cache(maxsize=1)
+def get_render_stage() -> RenderStage:
+    settings = get_settings()
+    return RenderStage(processes=settings.render_pool_processes, cache_size=settings.render_cache_size)
+
+
+def reset_render_stage_after_fork() -> None:
+    if get_render_stage.cache_info().currsize:
+        get_render_stage().reset_after_fork()
+
+
+os.register_at_fork(after_in_child=reset_render_stage_after_fork)
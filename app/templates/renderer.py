@@ -1,6 +1,8 @@
 import re
+from dataclasses import dataclass
 
-from jinja2 import Environment, StrictUndefined
+from jinja2 import BytecodeCache, Environment, StrictUndefined
+from jinja2 import Template as JinjaTemplate
 
 from app.templates.validators import ensure_template_input
 
@@ -14,12 +16,51 @@ def html_to_text(html: str) -> str:
     return re.sub(r"\n{3,}", "\n\n", stripped).strip()
 
 
-def render_template(subject_template: str, html_template: str, text_template: str | None, variables: dict) -> tuple[str, str, str]:
+@dataclass(slots=True)
+class CompiledTemplate:
+    subject: JinjaTemplate
+    html: JinjaTemplate
+    text: JinjaTemplate | None
+
+
+def compile_source(source: str, name: str | None = None, bytecode_cache: BytecodeCache | None = None) -> JinjaTemplate:
+    if bytecode_cache is None or name is None:
+        return env.from_string(source)
+    # Environment.from_string never consults a bytecode cache, so go through a bucket like a loader would.
+    bucket = bytecode_cache.get_bucket(env, name, None, source)
+    if bucket.code is None:
+        bucket.code = env.compile(source, name)
+        bytecode_cache.set_bucket(bucket)
+    return env.template_class.from_code(env, bucket.code, env.make_globals(None), None)
+
+
+def compile_template(
+    subject_template: str,
+    html_template: str,
+    text_template: str | None,
+    name: str | None = None,
+    bytecode_cache: BytecodeCache | None = None,
+) -> CompiledTemplate:
+    def part(source: str, suffix: str) -> JinjaTemplate:
+        return compile_source(source, f"{name}:{suffix}" if name else None, bytecode_cache)
+
+    return CompiledTemplate(
+        subject=part(subject_template, "subject"),
+        html=part(html_template, "html"),
+        text=part(text_template, "text") if text_template else None,
+    )
+
+
+def render_compiled(compiled: CompiledTemplate, variables: dict) -> tuple[str, str, str]:
     ensure_template_input(variables)
-    subject = env.from_string(subject_template).render(**variables)
-    html = env.from_string(html_template).render(**variables)
-    if text_template:
-        text = env.from_string(text_template).render(**variables)
+    subject = compiled.subject.render(**variables)
+    html = compiled.html.render(**variables)
+    if compiled.text is not None:
+        text = compiled.text.render(**variables)
     else:
         text = html_to_text(html)
     return subject, html, text
+
+
+def render_template(subject_template: str, html_template: str, text_template: str | None, variables: dict) -> tuple[str, str, str]:
+    return render_compiled(compile_template(subject_template, html_template, text_template), variables)
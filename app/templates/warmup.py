@@ -0,0 +1,81 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.session import get_session_factory
+from app.domain.enums import EventType
+from app.domain.models import EmailEventRollup, Template
+from app.templates.cache import TemplateCache, get_template_cache
+
+logger = logging.getLogger(__name__)
+
+
+def busiest_tenants(db: Session, limit: int, since: datetime) -> list[str]:
+    volume = func.sum(EmailEventRollup.event_count)
+    return list(
+        db.execute(
+            select(EmailEventRollup.tenant_id)
+            .where(EmailEventRollup.event_type == EventType.queued.value, EmailEventRollup.bucket_start >= since)
+            .group_by(EmailEventRollup.tenant_id)
+            .order_by(volume.desc())
+            .limit(limit)
+        ).scalars()
+    )
+
+
+def warm_template_cache(db: Session, cache: TemplateCache, tenants: int, limit: int, lookback_hours: int) -> int:
+    tenant_ids = busiest_tenants(db, tenants, datetime.utcnow() - timedelta(hours=lookback_hours))
+    if not tenant_ids:
+        return 0
+
+    templates = db.execute(
+        select(Template)
+        .where(Template.tenant_id.in_(tenant_ids), Template.is_active.is_(True))
+        .order_by(Template.version.desc())
+        .limit(limit)
+    ).scalars()
+    warmed = 0
+    for template in templates:
+        try:
+            cache.get_for(template)
+        except Exception:
+            logger.warning("template warm-up failed", extra={"template_id": template.id}, exc_info=True)
+            continue
+        warmed += 1
+    return warmed
+
+
+def warm_templates() -> int:
+    settings = get_settings()
+    if settings.template_warmup_tenants <= 0:
+        return 0
+    start = time.perf_counter()
+    with get_session_factory()() as db:
+        warmed = warm_template_cache(
+            db,
+            get_template_cache(),
+            tenants=settings.template_warmup_tenants,
+            limit=settings.template_warmup_limit,
+            lookback_hours=settings.template_warmup_lookback_hours,
+        )
+    logger.info("templates warmed", extra={"count": warmed, "seconds": round(time.perf_counter() - start, 3)})
+    return warmed
+
+
+def _warm_templates_safely() -> None:
+    try:
+        warm_templates()
+    except Exception:
+        logger.warning("template warm-up aborted", exc_info=True)
+
+
+def start_template_warmup() -> threading.Thread:
+    # Runs beside the worker: worker_process_init must return within Celery's process-alive timeout.
+    thread = threading.Thread(target=_warm_templates_safely, name="template-warmup", daemon=True)
+    thread.start()
+    return thread
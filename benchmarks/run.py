@@ -0,0 +1,369 @@
+"""End-to-end throughput benchmarks.
+
+    python -m benchmarks.run                       # SQLite + fakeredis, results under benchmarks/results/
+    python -m benchmarks.run --database-url postgresql+psycopg://... --redis-url redis://localhost:6379/15
+
+Everything runs in-process: the API through FastAPI's TestClient, Celery tasks eagerly, and SMTP
+deliveries against a local sink. Point --database-url at a disposable database; it is seeded and
+written to.
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.smtp_sink import ThreadedSMTPSink
+
+ROOT = Path(__file__).resolve().parents[1]
+SCENARIOS = ("send", "delivery", "bulk", "webhooks", "analytics")
+WEBHOOK_SECRET = "bench-secret"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(count: int, seconds: float, latencies: list[float]) -> dict:
+    return {
+        "count": count,
+        "seconds": round(seconds, 4),
+        "per_second": round(count / seconds, 2) if seconds else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def configure_environment(args: argparse.Namespace, sink_port: int) -> None:
+    os.environ.update(
+        {
+            "DATABASE_URL": args.database_url,
+            "REDIS_URL": args.redis_url or "redis://localhost:6379/15",
+            "SMTP_HOST": "127.0.0.1",
+            "SMTP_PORT": str(sink_port),
+            "SMTP_TLS": "false",
+            "SMTP_USER": "",
+            "WEBHOOK_SECRET_SMTP": WEBHOOK_SECRET,
+            "WEBHOOK_SECRET_MOCK": WEBHOOK_SECRET,
+            # Measure the pipeline, not the API's per-tenant quota.
+            "RATE_LIMIT_TENANT_PER_WINDOW": "1000000000",
+            "RATE_LIMIT_PROVIDER_PER_WINDOW": "1000000000",
+            # Deliveries are driven by the delivery scenario instead of Celery.
+            "SEND_DISPATCH_MODE": "engine",
+            "WEBHOOK_INGEST_MODE": "direct",
+            "LOG_LEVEL": "WARNING",
+        }
+    )
+
+
+def redis_client(args: argparse.Namespace):
+    if args.redis_url:
+        from redis import Redis
+
+        return Redis.from_url(args.redis_url, decode_responses=True), "redis"
+    try:
+        import fakeredis
+    except ImportError:
+        raise SystemExit("pass --redis-url or install the bench extra (fakeredis[lua])") from None
+    return fakeredis.FakeRedis(decode_responses=True), "fakeredis"
+
+
+def prepare_database(database_url: str) -> None:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from app.db.base import Base
+    from app.domain.models import Template, Tenant
+
+    engine = create_engine(database_url)
+    if engine.dialect.name == "postgresql":
+        from alembic import command
+        from alembic.config import Config
+
+        config = Config(str(ROOT / "alembic.ini"))
+        config.set_main_option("script_location", str(ROOT / "app/db/alembic"))
+        config.set_main_option("sqlalchemy.url", database_url.replace("%", "%%"))
+        command.upgrade(config, "head")
+    else:
+        Base.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        if session.get(Tenant, "bench-tenant") is None:
+            session.add(Tenant(id="bench-tenant", name="Bench", status="active"))
+            session.add(
+                Template(
+                    id="bench-tpl",
+                    tenant_id="bench-tenant",
+                    name="bench",
+                    version=1,
+                    subject_template="Hello {{ name }}",
+                    html_template="<p>Hi {{ name }}, your code is {{ code }}</p>",
+                    text_template=None,
+                    is_active=True,
+                )
+            )
+            session.commit()
+    engine.dispose()
+
+
+def bench_send(client, run_id: str, count: int) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for i in range(count):
+        payload = {
+            "tenant_id": "bench-tenant",
+            "template_id": "bench-tpl",
+            "recipient": {"email": f"send{i}@example.com"},
+            "variables": {"name": f"User {i}", "code": i},
+            "provider_hint": "smtp",
+            "idempotency_key": f"{run_id}-send-{i}",
+        }
+        t0 = time.perf_counter()
+        response = client.post("/send", json=payload)
+        latencies.append(time.perf_counter() - t0)
+        response.raise_for_status()
+    return summarize(count, time.perf_counter() - start, latencies)
+
+
+def bench_delivery(sink: ThreadedSMTPSink, batch_size: int) -> dict:
+    from sqlalchemy import select
+
+    from app.db.session import get_session_factory
+    from app.domain.enums import EmailStatus
+    from app.domain.models import Email
+    from app.services.mail_service import MailService
+
+    delivered_before = len(sink.messages)
+    batch_latencies = []
+    sent = 0
+    start = time.perf_counter()
+    with get_session_factory()() as db:
+        service = MailService(db)
+        while True:
+            t0 = time.perf_counter()
+            processed, _ = service.process_batch(batch_size)
+            if not processed:
+                break
+            batch_latencies.append((time.perf_counter() - t0) / processed)
+            sent += processed
+            db.expunge_all()
+        seconds = time.perf_counter() - start
+        lags = [
+            (sent_at - max(created_at, scheduled_at or created_at)).total_seconds()
+            for sent_at, created_at, scheduled_at in db.execute(
+                select(Email.sent_at, Email.created_at, Email.scheduled_at).where(
+                    Email.status == EmailStatus.sent.value, Email.sent_at.is_not(None)
+                )
+            )
+        ]
+
+    result = summarize(sent, seconds, batch_latencies)
+    result["delivered_to_sink"] = len(sink.messages) - delivered_before
+    result["enqueue_to_send_p50_ms"] = round(percentile(lags, 50) * 1000, 3)
+    result["enqueue_to_send_p99_ms"] = round(percentile(lags, 99) * 1000, 3)
+    return result
+
+
+def bench_bulk(client, run_id: str, size: int) -> dict:
+    from celery.signals import task_postrun, task_prerun
+
+    chunk_started: dict[str, float] = {}
+    chunk_latencies: list[float] = []
+
+    def on_prerun(task_id, task, **kwargs):
+        if task.name.endswith("process_bulk_chunk_task"):
+            chunk_started[task_id] = time.perf_counter()
+
+    def on_postrun(task_id, task, **kwargs):
+        if task_id in chunk_started:
+            chunk_latencies.append(time.perf_counter() - chunk_started.pop(task_id))
+
+    task_prerun.connect(on_prerun, weak=False)
+    task_postrun.connect(on_postrun, weak=False)
+    payload = {
+        "tenant_id": "bench-tenant",
+        "template_id": "bench-tpl",
+        "recipients": [{"email": f"bulk{i}@example.com"} for i in range(size)],
+        "shared_variables": {"name": "friend", "code": 0},
+        "batch_size": 500,
+        "provider_hint": "mock",
+        "idempotency_key": f"{run_id}-bulk-{size}",
+    }
+    try:
+        start = time.perf_counter()
+        response = client.post("/send/bulk", json=payload)
+        seconds = time.perf_counter() - start
+    finally:
+        task_prerun.disconnect(on_prerun)
+        task_postrun.disconnect(on_postrun)
+    response.raise_for_status()
+
+    result = summarize(size, seconds, chunk_latencies)
+    result["latency_unit"] = "staging chunk"
+    progress = client.get(f"/send/bulk/{response.json()['bulk_id']}", params={"tenant_id": "bench-tenant"}).json()
+    result["queued"] = progress["queued_count"]
+    result["status"] = progress["status"]
+    return result
+
+
+def bench_webhooks(client, limit: int, batch_size: int) -> dict:
+    from sqlalchemy import select
+
+    from app.db.session import get_session_factory
+    from app.domain.enums import EmailStatus
+    from app.domain.models import Email
+
+    with get_session_factory()() as db:
+        message_ids = list(
+            db.execute(
+                select(Email.provider_message_id)
+                .where(Email.status == EmailStatus.sent.value, Email.provider_message_id.is_not(None))
+                .limit(limit // 2)
+            ).scalars()
+        )
+    events = [
+        {"event_id": f"{message_id}-{event_type}", "provider_message_id": message_id, "event_type": event_type}
+        for event_type in ("delivered", "opened")
+        for message_id in message_ids
+    ]
+
+    latencies = []
+    start = time.perf_counter()
+    for offset in range(0, len(events), batch_size):
+        raw = json.dumps(events[offset : offset + batch_size]).encode("utf-8")
+        ts = str(int(time.time()))
+        signature = hmac.new(WEBHOOK_SECRET.encode(), f"{ts}.".encode() + raw, hashlib.sha256).hexdigest()
+        t0 = time.perf_counter()
+        response = client.post(
+            "/webhooks/smtp/batch",
+            content=raw,
+            headers={"X-Signature": signature, "X-Timestamp": ts, "Content-Type": "application/json"},
+        )
+        latencies.append(time.perf_counter() - t0)
+        response.raise_for_status()
+    result = summarize(len(events), time.perf_counter() - start, latencies)
+    result["latency_unit"] = f"batch of {batch_size}"
+    return result
+
+
+def bench_analytics(client, queries: int) -> dict:
+    now = datetime.utcnow()
+    params = {
+        "tenant_id": "bench-tenant",
+        "from": (now - timedelta(days=7)).isoformat(),
+        "to": (now + timedelta(hours=1)).isoformat(),
+        "group_by": "hour",
+    }
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(queries):
+        t0 = time.perf_counter()
+        response = client.get("/analytics", params=params)
+        latencies.append(time.perf_counter() - t0)
+        response.raise_for_status()
+    return summarize(queries, time.perf_counter() - start, latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to a fresh SQLite file")
+    parser.add_argument("--redis-url", help="defaults to an in-process fakeredis")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--send-count", type=int, default=1000)
+    parser.add_argument("--delivery-batch-size", type=int, default=100)
+    parser.add_argument("--bulk-sizes", default="10000,100000")
+    parser.add_argument("--webhook-events", type=int, default=2000)
+    parser.add_argument("--webhook-batch-size", type=int, default=100)
+    parser.add_argument("--analytics-queries", type=int, default=200)
+    parser.add_argument("--output", type=Path, help="defaults to benchmarks/results/<timestamp>-<commit>.json")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    if not args.database_url:
+        args.database_url = f"sqlite:///{Path(tempfile.mkdtemp(prefix='mailsystem-bench-')) / 'bench.db'}"
+
+    started_at = datetime.utcnow()
+    commit = git_commit()
+    output = args.output or ROOT / "benchmarks/results" / f"{started_at:%Y%m%dT%H%M%S}-{(commit or 'nogit')[:12]}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    excluded = {"output", "database_url", "redis_url"}
+    results: dict[str, dict] = {}
+    report = {
+        "commit": commit,
+        "started_at": started_at.isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": args.database_url.split(":", 1)[0],
+        "redis": None,
+        "parameters": {key: value for key, value in vars(args).items() if key not in excluded},
+        "results": results,
+    }
+
+    with ThreadedSMTPSink() as sink:
+        configure_environment(args, sink.port)
+        from fastapi.testclient import TestClient
+
+        from app.api.deps import redis_dep
+        from app.main import app
+        from app.queue.celery_app import celery_app
+
+        prepare_database(args.database_url)
+        fake_or_real_redis, report["redis"] = redis_client(args)
+        app.dependency_overrides[redis_dep] = lambda: fake_or_real_redis
+        celery_app.conf.task_always_eager = True
+
+        run_id = f"bench-{int(time.time())}"
+        with TestClient(app) as client:
+            runs = []
+            if "send" in scenarios:
+                runs.append(("send", lambda: bench_send(client, run_id, args.send_count)))
+            if "delivery" in scenarios:
+                runs.append(("delivery", lambda: bench_delivery(sink, args.delivery_batch_size)))
+            if "bulk" in scenarios:
+                for size in (int(value) for value in args.bulk_sizes.split(",") if value):
+                    runs.append((f"bulk_{size}", lambda size=size: bench_bulk(client, run_id, size)))
+            if "webhooks" in scenarios:
+                runs.append(("webhooks", lambda: bench_webhooks(client, args.webhook_events, args.webhook_batch_size)))
+            if "analytics" in scenarios:
+                runs.append(("analytics", lambda: bench_analytics(client, args.analytics_queries)))
+
+            failed = False
+            for name, run in runs:
+                try:
+                    results[name] = run()
+                except Exception as exc:
+                    failed = True
+                    results[name] = {"error": f"{type(exc).__name__}: {exc}"}
+                # Rewrite after every scenario so a later failure keeps what was measured.
+                output.write_text(json.dumps(report, indent=2) + "\n")
+
+    print(json.dumps(results, indent=2))
+    print(f"wrote {output}")
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import time
+
+
+class SMTPSink:
+    def __init__(self) -> None:
+        self.messages: list[bytes] = []
+        self.received_at: list[float] = []
+        self.port = 0
+        self._server = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.write(b"220 sink ESMTP\r\n")
+        await writer.drain()
+        in_data = False
+        lines: list[bytes] = []
+        while line := await reader.readline():
+            if in_data:
+                if line.rstrip(b"\r\n") == b".":
+                    self.messages.append(b"".join(lines))
+                    self.received_at.append(time.perf_counter())
+                    lines, in_data = [], False
+                    writer.write(b"250 queued\r\n")
+                    await writer.drain()
+                else:
+                    lines.append(line)
+                continue
+
+            command = line[:4].upper()
+            if command == b"EHLO":
+                writer.write(b"250-sink\r\n250 8BITMIME\r\n")
+            elif command in {b"HELO", b"MAIL", b"RCPT", b"RSET", b"NOOP"}:
+                writer.write(b"250 OK\r\n")
+            elif command == b"DATA":
+                in_data = True
+                writer.write(b"354 end with <CRLF>.<CRLF>\r\n")
+            elif command == b"QUIT":
+                writer.write(b"221 bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"502 unsupported\r\n")
+            await writer.drain()
+        writer.close()
+
+
+class ThreadedSMTPSink(SMTPSink):
+    """Runs the sink on its own event loop thread for synchronous callers."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="smtp-sink", daemon=True)
+
+    def __enter__(self) -> "ThreadedSMTPSink":
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.start(), self._loop).result()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -0,0 +1,234 @@
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import Connection, create_engine, func, insert, select, text
+from sqlalchemy.engine import make_url
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.domain.enums import EmailStatus  # noqa: E402
+from app.domain.models import Email, EmailEvent, Template, Tenant  # noqa: E402
+from app.services.mail_service import claim_due_emails_statement  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE_REVISION = "0001_baseline"
+EVENT_TYPES = ("queued", "sent", "delivered", "opened")
+
+
+def alembic_config(database_url: str) -> Config:
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "app/db/alembic"))
+    config.set_main_option("sqlalchemy.url", database_url.replace("%", "%%"))
+    return config
+
+
+def seed(conn: Connection, emails: int, tenants: int, templates_per_tenant: int, days: int, rng: random.Random) -> None:
+    now = datetime.utcnow()
+    conn.execute(
+        insert(Tenant),
+        [{"id": f"tenant-{t}", "name": f"Tenant {t}", "status": "active", "created_at": now} for t in range(tenants)],
+    )
+    template_ids = [f"tpl-{t}-{n}" for t in range(tenants) for n in range(templates_per_tenant)]
+    conn.execute(
+        insert(Template),
+        [
+            {
+                "id": template_id,
+                "tenant_id": template_id.rsplit("-", 1)[0].replace("tpl", "tenant"),
+                "name": template_id,
+                "version": 1,
+                "subject_template": "Hello {{ name }}",
+                "html_template": "<p>Hi {{ name }}</p>",
+                "text_template": None,
+                "is_active": True,
+                "created_at": now,
+            }
+            for template_id in template_ids
+        ],
+    )
+
+    chunk = 10000
+    for offset in range(0, emails, chunk):
+        email_rows, event_rows = [], []
+        for i in range(offset, min(offset + chunk, emails)):
+            template_id = rng.choice(template_ids)
+            tenant_id = template_id.rsplit("-", 1)[0].replace("tpl", "tenant")
+            created_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+            roll = rng.random()
+            if roll < 0.02:
+                status, message_id = EmailStatus.queued.value, None
+            elif roll < 0.03:
+                status, message_id = EmailStatus.scheduled.value, None
+            else:
+                status, message_id = rng.choice(EVENT_TYPES[1:]), f"msg-{i}"
+            email_id = str(uuid.uuid4())
+            email_rows.append(
+                {
+                    "id": email_id,
+                    "tenant_id": tenant_id,
+                    "idempotency_key": f"bench-{i}",
+                    "recipient_email": f"user{i}@example.com",
+                    "template_id": template_id,
+                    "variables_json": {},
+                    "metadata_json": {},
+                    "provider_name": "mock",
+                    "provider_message_id": message_id,
+                    "status": status,
+                    "scheduled_at": now + timedelta(hours=1) if status == EmailStatus.scheduled.value else None,
+                    "next_retry_at": now + timedelta(minutes=5) if roll < 0.01 else None,
+                    "attempt_count": 0,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+            )
+            reached = EVENT_TYPES.index(status) + 1 if status in EVENT_TYPES else 1
+            for step, event_type in enumerate(EVENT_TYPES[:reached]):
+                event_rows.append(
+                    {
+                        "email_id": email_id,
+                        "tenant_id": tenant_id,
+                        "event_type": event_type,
+                        "event_time": created_at + timedelta(minutes=step),
+                        "provider": "mock",
+                        "payload_json": {},
+                        "created_at": created_at,
+                    }
+                )
+        conn.execute(insert(Email), email_rows)
+        conn.execute(insert(EmailEvent), event_rows)
+        conn.commit()
+
+
+def hot_path_queries(conn: Connection, days: int) -> dict:
+    now = datetime.utcnow()
+    sample = conn.execute(
+        select(Email.tenant_id, Email.template_id, Email.provider_message_id)
+        .where(Email.provider_message_id.is_not(None))
+        .limit(1)
+    ).one()
+    window_start = now - timedelta(days=min(days, 7))
+    day = func.date_trunc("day", EmailEvent.event_time)
+    return {
+        "webhook_lookup": select(Email).where(Email.provider_message_id == sample.provider_message_id),
+        "claim_due_emails": claim_due_emails_statement(100, now),
+        "analytics_raw_counts": select(day, EmailEvent.event_type, func.count(EmailEvent.id))
+        .where(
+            EmailEvent.tenant_id == sample.tenant_id,
+            EmailEvent.event_time >= window_start,
+            EmailEvent.event_time <= now,
+        )
+        .group_by(day, EmailEvent.event_type),
+        "analytics_event_type": select(func.count(EmailEvent.id)).where(
+            EmailEvent.tenant_id == sample.tenant_id,
+            EmailEvent.event_time >= window_start,
+            EmailEvent.event_type == "delivered",
+        ),
+        "emails_by_template": select(Email.template_id, func.count(Email.id))
+        .where(Email.tenant_id == sample.tenant_id, Email.created_at >= window_start, Email.created_at <= now)
+        .group_by(Email.template_id),
+        "emails_for_template": select(func.count(Email.id)).where(
+            Email.tenant_id == sample.tenant_id,
+            Email.created_at >= window_start,
+            Email.template_id == sample.template_id,
+        ),
+    }
+
+
+def plan_nodes(node: dict) -> list[str]:
+    label = node["Node Type"]
+    if node.get("Index Name"):
+        label = f"{label} using {node['Index Name']}"
+    nodes = [label]
+    for child in node.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+def measure(conn: Connection, queries: dict, repeat: int) -> dict:
+    report = {}
+    for name, statement in queries.items():
+        compiled = statement.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+        sql, params = str(compiled), compiled.params
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.exec_driver_sql(sql, params).all()
+            timings.append((time.perf_counter() - start) * 1000)
+            conn.rollback()
+
+        plan = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params).scalar_one()[0]
+        conn.rollback()
+        report[name] = {
+            "median_ms": round(statistics.median(timings), 3),
+            "max_ms": round(max(timings), 3),
+            "execution_ms": plan["Execution Time"],
+            "plan": plan_nodes(plan["Plan"]),
+        }
+    return report
+
+
+def print_report(before: dict, after: dict) -> None:
+    for name in before:
+        print(f"\n{name}")
+        for label, report in (("before", before[name]), ("after", after[name])):
+            print(f"  {label:<6} median {report['median_ms']:>10.3f} ms  max {report['max_ms']:>10.3f} ms")
+            print(f"         plan   {' -> '.join(report['plan'])}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare hot-path query plans before and after the index migration.")
+    parser.add_argument("--database-url", required=True, help="empty PostgreSQL database, migrated and seeded here")
+    parser.add_argument("--emails", type=int, default=200000)
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--templates-per-tenant", type=int, default=5)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse data seeded by a previous run")
+    parser.add_argument("--json", dest="json_path", help="also write the report to this file")
+    args = parser.parse_args()
+
+    if make_url(args.database_url).get_backend_name() != "postgresql":
+        parser.error("the index benchmark needs PostgreSQL (partial indexes, EXPLAIN ANALYZE)")
+
+    config = alembic_config(args.database_url)
+    if args.skip_seed:
+        command.downgrade(config, BASELINE_REVISION)
+    else:
+        command.upgrade(config, BASELINE_REVISION)
+    engine = create_engine(args.database_url, future=True)
+
+    with engine.connect() as conn:
+        if not args.skip_seed:
+            seed(conn, args.emails, args.tenants, args.templates_per_tenant, args.days, random.Random(args.seed))
+        conn.execute(text("ANALYZE emails"))
+        conn.execute(text("ANALYZE email_events"))
+        conn.commit()
+        queries = hot_path_queries(conn, args.days)
+        before = measure(conn, queries, args.repeat)
+
+    command.upgrade(config, "head")
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE emails"))
+        conn.execute(text("ANALYZE email_events"))
+        conn.commit()
+        after = measure(conn, queries, args.repeat)
+    engine.dispose()
+
+    print_report(before, after)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps({"before": before, "after": after}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,9 +13,11 @@ os.environ.setdefault("WEBHOOK_SECRET_SMTP", "test-secret")
 from app.api.deps import db_session_dep, redis_dep
 from app.core.config import get_settings
 from app.db.base import Base
-from app.db.session import get_engine
-from app.domain.models import Template, Tenant
+from app.db.session import get_engine, get_session_factory
+from app.domain.enums import EmailStatus
+from app.domain.models import Email, Template, Tenant
 from app.main import app
+from app.services.send_context import get_send_context_cache
 
 
 class DummyRedis:
@@ -29,16 +31,24 @@ class DummyRedis:
     def expire(self, key, ttl):
         return True
 
+    def register_script(self, script):
+        def run(keys=(), args=(), client=None):
+            return [1, 100, 0]
+
+        return run
+
     def ping(self):
         return True
 
 
 @pytest.fixture()
-def client(tmp_path):
+def session_factory(tmp_path):
     db_path = tmp_path / "test.db"
     os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
     get_settings.cache_clear()
     get_engine.cache_clear()
+    get_session_factory.cache_clear()
+    get_send_context_cache.cache_clear()
 
     engine = create_engine(os.environ["DATABASE_URL"], future=True)
     TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
@@ -60,6 +70,39 @@ def client(tmp_path):
         )
         session.commit()
 
+    yield TestingSessionLocal
+    engine.dispose()
+
+
+@pytest.fixture()
+def db_session(session_factory):
+    with session_factory() as session:
+        yield session
+
+
+@pytest.fixture()
+def make_email():
+    def factory(idempotency_key: str, **overrides) -> Email:
+        fields = {
+            "tenant_id": "tenant-1",
+            "idempotency_key": idempotency_key,
+            "recipient_email": f"{idempotency_key}@example.com",
+            "template_id": "tpl-1",
+            "variables_json": {"name": "A"},
+            "metadata_json": {},
+            "provider_name": "mock",
+            "status": EmailStatus.queued.value,
+        }
+        fields.update(overrides)
+        return Email(**fields)
+
+    return factory
+
+
+@pytest.fixture()
+def client(session_factory):
+    TestingSessionLocal = session_factory
+
     def override_db():
         db = TestingSessionLocal()
         try:
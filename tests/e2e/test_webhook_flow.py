@@ -21,3 +21,100 @@ def test_webhook_endpoint_accepts_signed_event(client):
     )
     assert r.status_code == 200
     assert r.json()["ok"] is True
+
+
+def test_webhook_batch_endpoint_reports_per_event_results(client, session_factory):
+    from app.domain.models import Email
+
+    with session_factory() as session:
+        session.add(
+            Email(
+                id="email-1",
+                tenant_id="tenant-1",
+                idempotency_key="k1",
+                recipient_email="a@example.com",
+                template_id="tpl-1",
+                provider_name="mock",
+                provider_message_id="msg-1",
+                status="sent",
+            )
+        )
+        session.commit()
+
+    events = [
+        {"event_id": "evt-1", "provider_message_id": "msg-1", "event_type": "delivered"},
+        {"event_id": "evt-2", "email_id": "email-1", "event_type": "opened"},
+        {"event_id": "evt-1", "provider_message_id": "msg-1", "event_type": "delivered"},
+        {"event_id": "evt-3", "email_id": "missing-email", "event_type": "delivered"},
+        {"event_type": "delivered"},
+        {"event_id": "evt-4", "email_id": ["email-1"], "event_type": "delivered"},
+    ]
+    ts = str(int(time.time()))
+    raw = json.dumps(events).encode("utf-8")
+    sig = hmac.new(b"test-secret", f"{ts}.".encode() + raw, hashlib.sha256).hexdigest()
+
+    r = client.post(
+        "/webhooks/mock/batch",
+        data=raw,
+        headers={"X-Signature": sig, "X-Timestamp": ts, "Content-Type": "application/json"},
+    )
+    assert r.status_code == 200
+    assert [result["status"] for result in r.json()["results"]] == [
+        "applied",
+        "applied",
+        "duplicate",
+        "email_not_found",
+        "invalid",
+        "invalid",
+    ]
+
+    with session_factory() as session:
+        assert session.get(Email, "email-1").status == "opened"
+
+
+def test_webhook_endpoint_rejects_non_string_references(client):
+    ts = str(int(time.time()))
+    raw = json.dumps({"email_id": {"id": "email-1"}, "event_type": "delivered"}).encode("utf-8")
+    sig = hmac.new(b"test-secret", f"{ts}.".encode() + raw, hashlib.sha256).hexdigest()
+
+    r = client.post(
+        "/webhooks/mock",
+        data=raw,
+        headers={"X-Signature": sig, "X-Timestamp": ts, "X-Event-Id": "evt-9", "Content-Type": "application/json"},
+    )
+    assert r.status_code == 400
+
+
+def test_stream_mode_rejects_invalid_events_before_publishing(client, monkeypatch):
+    from app.core.config import get_settings
+
+    monkeypatch.setenv("WEBHOOK_INGEST_MODE", "stream")
+    get_settings.cache_clear()
+    try:
+        ts = str(int(time.time()))
+        raw = json.dumps({"email_id": ["email-1"], "event_type": "delivered"}).encode("utf-8")
+        sig = hmac.new(b"test-secret", f"{ts}.".encode() + raw, hashlib.sha256).hexdigest()
+
+        r = client.post(
+            "/webhooks/mock",
+            data=raw,
+            headers={"X-Signature": sig, "X-Timestamp": ts, "X-Event-Id": "evt-9", "Content-Type": "application/json"},
+        )
+        assert r.status_code == 400
+    finally:
+        get_settings.cache_clear()
+
+
+def test_webhook_health_reports_degraded_without_redis(client, monkeypatch):
+    from redis.exceptions import ConnectionError as RedisConnectionError
+
+    import app.main
+
+    class DownStream:
+        def stats(self):
+            raise RedisConnectionError("redis is down")
+
+    monkeypatch.setattr(app.main, "get_webhook_stream", lambda: DownStream())
+    r = client.get("/health/webhooks")
+    assert r.status_code == 200
+    assert r.json() == {"status": "degraded"}
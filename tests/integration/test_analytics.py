@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.domain.enums import EmailStatus
+from app.domain.models import Email, EmailEvent, EmailEventRollup
+from app.services.analytics_service import AnalyticsService, floor_hour
+
+BASE = floor_hour(datetime.utcnow()) - timedelta(hours=10)
+
+
+def _event(email, event_type, event_time, created_at=None):
+    return EmailEvent(
+        email_id=email.id,
+        tenant_id=email.tenant_id,
+        event_type=event_type,
+        event_time=event_time,
+        provider="mock",
+        payload_json={},
+        created_at=created_at or event_time,
+    )
+
+
+def _seed(db_session):
+    email = Email(
+        tenant_id="tenant-1",
+        idempotency_key="k1",
+        recipient_email="a@example.com",
+        template_id="tpl-1",
+        variables_json={},
+        metadata_json={},
+        provider_name="mock",
+        status=EmailStatus.sent.value,
+    )
+    db_session.add(email)
+    db_session.flush()
+    db_session.add_all(
+        [
+            _event(email, "sent", BASE + timedelta(minutes=30)),
+            _event(email, "delivered", BASE + timedelta(hours=1, minutes=10)),
+            _event(email, "sent", BASE + timedelta(hours=5)),
+        ]
+    )
+    db_session.commit()
+    return email
+
+
+def _summary(service):
+    return service.summary("tenant-1", BASE, BASE + timedelta(hours=6), "hour")
+
+
+def test_compaction_moves_watermark_and_summary_merges_rollups_with_raw_edges(db_session):
+    _seed(db_session)
+    service = AnalyticsService(db_session)
+    before = _summary(service)
+
+    assert service.compact(now=BASE + timedelta(hours=3, minutes=10)) == 2
+    assert service.compacted_until() == BASE + timedelta(hours=3)
+    assert service.compact(now=BASE + timedelta(hours=3, minutes=10)) == 0
+
+    after = _summary(service)
+    assert after == before
+    assert after["totals"] == {"sent": 2, "delivered": 1}
+    assert after["rates"]["delivery_rate"] == 0.5
+
+
+def test_rows_stored_after_their_hour_was_compacted_are_still_counted(db_session):
+    email = _seed(db_session)
+    service = AnalyticsService(db_session)
+    service.compact(now=BASE + timedelta(hours=3, minutes=10))
+
+    db_session.add(_event(email, "sent", BASE + timedelta(minutes=40), created_at=BASE + timedelta(hours=4)))
+    db_session.commit()
+
+    late = _summary(service)
+    assert late["totals"]["sent"] == 3
+    assert {"bucket": str(BASE), "event_type": "sent", "count": 2} in late["series"]
+
+    service.compact(now=BASE + timedelta(hours=5, minutes=10))
+    assert _summary(service) == late
+    rollup = db_session.execute(
+        select(EmailEventRollup.event_count).where(
+            EmailEventRollup.bucket_start == BASE, EmailEventRollup.event_type == "sent"
+        )
+    ).scalar_one()
+    assert rollup == 2
@@ -0,0 +1,152 @@
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import get_settings
+from app.db.session import async_database_url
+from app.domain.enums import EmailStatus
+from app.domain.models import Email
+from app.providers.base import EmailMessage
+from app.providers.registry import registry
+from app.providers.smtp_provider import SMTPProvider
+from app.queue.async_engine import AsyncSendEngine
+from benchmarks.smtp_sink import SMTPSink
+
+
+def _provider_for(sink: SMTPSink, **overrides) -> SMTPProvider:
+    settings = get_settings().model_copy(
+        update={"smtp_host": "127.0.0.1", "smtp_port": sink.port, "smtp_tls": False, "smtp_user": "", **overrides}
+    )
+    return SMTPProvider(settings=settings)
+
+
+async def _close(provider: SMTPProvider) -> None:
+    if provider.async_pool is not None:
+        await provider.async_pool.close()
+    await asyncio.to_thread(provider.pool.close)
+
+
+def _message(i: int) -> EmailMessage:
+    return EmailMessage(
+        email_id=f"e{i}",
+        tenant_id="t1",
+        to_email=f"user{i}@example.com",
+        to_name=None,
+        subject="s",
+        html_body="<p>x</p>",
+        text_body="x",
+        metadata={},
+    )
+
+
+def test_smtp_provider_send_async_delivers_to_sink():
+    async def scenario():
+        sink = SMTPSink()
+        await sink.start()
+        provider = _provider_for(sink)
+        try:
+            responses = await asyncio.gather(*(provider.send_async(_message(i)) for i in range(5)))
+        finally:
+            await _close(provider)
+            await sink.stop()
+        return responses, sink.messages
+
+    responses, messages = asyncio.run(scenario())
+    assert all(response.accepted for response in responses)
+    assert len(messages) == 5
+
+
+def test_async_smtp_pool_caps_open_sessions():
+    async def scenario():
+        sink = SMTPSink()
+        await sink.start()
+        provider = _provider_for(sink, smtp_pool_size=2)
+        try:
+            responses = await asyncio.gather(*(provider.send_async(_message(i)) for i in range(20)))
+        finally:
+            await _close(provider)
+            await sink.stop()
+        return responses, provider.async_pool
+
+    responses, pool = asyncio.run(scenario())
+    assert all(response.accepted for response in responses)
+    assert pool.connects == 2
+    assert pool.reuses == 18
+
+
+def test_async_engine_sends_due_emails_through_sink(db_session, make_email, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    db_session.add_all(
+        [
+            make_email(
+                f"k{i}",
+                recipient_email=f"user{i}@example.com",
+                variables_json={"name": f"User {i}"},
+                provider_name="smtp",
+            )
+            for i in range(20)
+        ]
+    )
+    db_session.commit()
+
+    async def scenario():
+        sink = SMTPSink()
+        await sink.start()
+        provider = _provider_for(sink)
+        monkeypatch.setitem(registry._providers, "smtp", provider)
+        engine = create_async_engine(async_database_url(os.environ["DATABASE_URL"]))
+        send_engine = AsyncSendEngine(
+            async_sessionmaker(engine, expire_on_commit=False),
+            concurrency=8,
+            batch_size=5,
+            poll_seconds=0.01,
+        )
+        try:
+            processed = await send_engine.run_until_idle()
+        finally:
+            await _close(provider)
+            await sink.stop()
+            await engine.dispose()
+        return processed, len(sink.messages)
+
+    processed, delivered = asyncio.run(scenario())
+    assert processed == 20
+    assert delivered == 20
+
+    db_session.expire_all()
+    assert set(db_session.execute(select(Email.status)).scalars()) == {EmailStatus.sent.value}
+
+
+def test_async_engine_records_per_email_errors_instead_of_stranding(db_session, make_email, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.providers.mock_provider import MockProvider
+
+    class ExplodingProvider(MockProvider):
+        async def send_async(self, email):
+            raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(registry, "get", lambda name: ExplodingProvider())
+    db_session.add_all([make_email("unrenderable", variables_json={}), make_email("exploding")])
+    db_session.commit()
+
+    async def scenario():
+        engine = create_async_engine(async_database_url(os.environ["DATABASE_URL"]))
+        send_engine = AsyncSendEngine(
+            async_sessionmaker(engine, expire_on_commit=False), concurrency=4, batch_size=5, poll_seconds=0.01
+        )
+        try:
+            return await send_engine.run_until_idle()
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(scenario()) == 2
+
+    db_session.expire_all()
+    statuses = dict(db_session.execute(select(Email.idempotency_key, Email.status)).all())
+    assert statuses == {"unrenderable": EmailStatus.failed.value, "exploding": EmailStatus.queued.value}
@@ -0,0 +1,103 @@
+from sqlalchemy import func, select, update
+
+from app.domain.enums import BulkStatus, EmailStatus
+from app.domain.models import BulkJob, BulkRecipientChunk, Email, EmailEvent
+from app.providers.base import ProviderResponse
+from app.queue.tasks_send import process_email_task
+from app.services.bulk_service import BulkService
+from app.services.mail_service import MailService
+
+
+def _payload(emails, batch_size=2):
+    return {
+        "tenant_id": "tenant-1",
+        "template_id": "tpl-1",
+        "recipients": [{"email": email} for email in emails],
+        "shared_variables": {"name": "friend"},
+        "batch_size": batch_size,
+        "idempotency_key": "bulk-1",
+    }
+
+
+def _job(db_session, template_id="tpl-1"):
+    job = BulkJob(tenant_id="tenant-1", template_id=template_id, total_count=0, status=BulkStatus.queued.value)
+    db_session.add(job)
+    db_session.commit()
+    return job
+
+
+def test_process_chunk_inserts_in_batches_and_skips_duplicates(db_session, monkeypatch):
+    published = []
+    monkeypatch.setattr(process_email_task, "apply_async", lambda *args, **kwargs: published.append(kwargs["args"][0]))
+
+    job = _job(db_session)
+    recipients = ["a@example.com", "b@example.com", "c@example.com", "a@example.com", "d@example.com"]
+    service = BulkService(db_session)
+    assert service.prepare(job.id, _payload(recipients)) == [0]
+    assert service.process_chunk(job.id, 0) == 4
+    assert len(published) == 4
+
+    assert service.prepare(job.id, _payload(recipients, batch_size=3)) == []
+    assert service.process_chunk(job.id, 0) == 0
+    assert len(published) == 4
+
+    assert db_session.execute(select(func.count(Email.id))).scalar_one() == 4
+    assert db_session.execute(select(func.count(EmailEvent.id))).scalar_one() == 4
+    db_session.refresh(job)
+    assert job.status == BulkStatus.complete.value
+    assert (job.total_count, job.queued_count, job.skipped_count, job.completed_chunks) == (5, 4, 1, 1)
+
+
+def test_process_chunk_resumes_from_committed_offset(db_session, monkeypatch):
+    monkeypatch.setattr(process_email_task, "apply_async", lambda *args, **kwargs: None)
+
+    job = _job(db_session)
+    service = BulkService(db_session)
+    service.prepare(job.id, _payload(["a@example.com", "b@example.com", "c@example.com"]))
+    db_session.execute(update(BulkRecipientChunk).values(next_offset=2))
+    db_session.commit()
+
+    assert service.process_chunk(job.id, 0) == 1
+    assert db_session.execute(select(Email.recipient_email)).scalars().all() == ["c@example.com"]
+
+
+def test_prepare_fails_job_for_unknown_template(db_session):
+    job = _job(db_session, template_id="missing")
+    payload = _payload(["a@example.com"])
+    payload["template_id"] = "missing"
+    assert BulkService(db_session).prepare(job.id, payload) == []
+    db_session.refresh(job)
+    assert job.status == BulkStatus.failed.value
+
+
+def test_send_results_update_bulk_counters(db_session, monkeypatch):
+    monkeypatch.setattr(process_email_task, "apply_async", lambda *args, **kwargs: None)
+
+    job = _job(db_session)
+    service = BulkService(db_session)
+    service.prepare(job.id, _payload(["a@example.com", "b@example.com"]))
+    service.process_chunk(job.id, 0)
+
+    sent, failed = db_session.execute(select(Email).order_by(Email.recipient_email)).scalars().all()
+    mail = MailService(db_session)
+    sent.status = failed.status = EmailStatus.processing.value
+    mail.record_response(sent, ProviderResponse("m-1", accepted=True, raw_status="ok", transient=False))
+    mail.record_response(failed, ProviderResponse("m-2", accepted=False, raw_status="rejected", transient=False))
+    db_session.commit()
+
+    db_session.refresh(job)
+    assert (job.queued_count, job.sent_count, job.failed_count) == (2, 1, 1)
+
+
+def test_get_bulk_job_progress(client, session_factory):
+    with session_factory() as session:
+        job = BulkJob(tenant_id="tenant-1", template_id="tpl-1", total_count=10, queued_count=7, sent_count=3)
+        session.add(job)
+        session.commit()
+        bulk_id = job.id
+
+    r = client.get(f"/send/bulk/{bulk_id}", params={"tenant_id": "tenant-1"})
+    assert r.status_code == 200
+    assert (r.json()["queued_count"], r.json()["sent_count"]) == (7, 3)
+
+    assert client.get(f"/send/bulk/{bulk_id}", params={"tenant_id": "other"}).status_code == 404
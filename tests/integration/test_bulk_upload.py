@@ -0,0 +1,54 @@
+from sqlalchemy import select
+
+from app.domain.enums import BulkStatus
+from app.domain.models import BulkJob, BulkRecipientChunk
+from app.queue.tasks_bulk import process_bulk_task
+
+
+def test_upload_stages_recipients_in_chunks(client, session_factory, monkeypatch):
+    published = []
+    monkeypatch.setattr(process_bulk_task, "delay", lambda *args: published.append(args))
+    monkeypatch.setenv("BULK_STAGING_CHUNK_SIZE", "2")
+    from app.core.config import get_settings
+
+    get_settings.cache_clear()
+
+    def body():
+        for i in range(5):
+            yield f'{{"email": "user{i}@example.com"}}\n'.encode()
+        yield b'{"email": "nope"}\n'
+
+    r = client.post(
+        "/send/bulk/upload",
+        params={"tenant_id": "tenant-1", "template_id": "tpl-1", "idempotency_key": "up-1"},
+        content=body(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    get_settings.cache_clear()
+
+    assert r.status_code == 202
+    data = r.json()
+    assert data["queued_count"] == 5
+    assert data["rejected_count"] == 1
+    assert published == [(data["bulk_id"],)]
+
+    with session_factory() as session:
+        job = session.get(BulkJob, data["bulk_id"])
+        assert job.status == BulkStatus.queued.value
+        assert (job.total_count, job.chunk_count) == (5, 3)
+        counts = session.execute(
+            select(BulkRecipientChunk.recipient_count)
+            .where(BulkRecipientChunk.bulk_job_id == job.id)
+            .order_by(BulkRecipientChunk.chunk_index)
+        ).scalars()
+        assert list(counts) == [2, 2, 1]
+
+
+def test_upload_rejects_unknown_content_type(client):
+    r = client.post(
+        "/send/bulk/upload",
+        params={"tenant_id": "tenant-1", "template_id": "tpl-1", "idempotency_key": "up-2"},
+        content=b"{}",
+        headers={"Content-Type": "application/json"},
+    )
+    assert r.status_code == 415
@@ -0,0 +1,187 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import get_settings
+from app.domain.enums import EmailStatus
+from app.domain.models import EmailEvent
+from app.providers.base import ProviderResponse
+from app.services.event_writer import EventWriter, append_event, get_event_writer
+from app.services.mail_service import MailService
+
+
+@pytest.fixture()
+def event_writer_mode(monkeypatch):
+    def configure(mode: str):
+        monkeypatch.setenv("EVENT_WRITER_MODE", mode)
+        monkeypatch.setenv("EVENT_WRITER_FLUSH_INTERVAL_SECONDS", "3600")
+        get_settings.cache_clear()
+        get_event_writer.cache_clear()
+        return get_event_writer()
+
+    yield configure
+    if get_event_writer.cache_info().currsize:
+        writer = get_event_writer()
+        if writer is not None:
+            writer.close()
+    get_event_writer.cache_clear()
+    get_settings.cache_clear()
+
+
+def _event_types(db_session) -> set[str]:
+    return set(db_session.execute(select(EmailEvent.event_type)).scalars())
+
+
+def test_durable_mode_buffers_events_but_writes_failures_synchronously(db_session, make_email, event_writer_mode):
+    writer = event_writer_mode("durable")
+    sent = make_email("k1", status=EmailStatus.processing.value)
+    failed = make_email("k2", status=EmailStatus.processing.value)
+    db_session.add_all([sent, failed])
+    db_session.commit()
+
+    service = MailService(db_session, pacer=None)
+    service.record_response(
+        sent, ProviderResponse(provider_message_id="m1", accepted=True, raw_status="ok", transient=False)
+    )
+    service.record_response(
+        failed,
+        ProviderResponse(provider_message_id="", accepted=False, raw_status="bounced", transient=False),
+    )
+    db_session.commit()
+
+    assert _event_types(db_session) == {"failed", "dead_lettered"}
+
+    assert writer.flush() == 1
+    assert writer.snapshot()["flushed_events"] == 1
+    assert _event_types(db_session) == {"failed", "dead_lettered", "sent"}
+
+
+def test_buffered_events_are_discarded_on_rollback(db_session, make_email, event_writer_mode):
+    writer = event_writer_mode("buffered")
+    email = make_email("k1")
+    db_session.add(email)
+    db_session.commit()
+
+    append_event(db_session, email.id, email.tenant_id, "sent", "mock", {})
+    db_session.rollback()
+    db_session.commit()
+
+    assert writer.snapshot()["buffered"] == 0
+    assert writer.flush() == 0
+    assert _event_types(db_session) == set()
+
+
+def test_failed_flush_keeps_events_for_the_next_flush(db_session, make_email, event_writer_mode, monkeypatch):
+    writer = event_writer_mode("buffered")
+    email = make_email("k1")
+    db_session.add(email)
+    db_session.commit()
+
+    append_event(db_session, email.id, email.tenant_id, "sent", "mock", {})
+    db_session.commit()
+    assert writer.snapshot()["buffered"] == 1
+
+    write = writer._write
+
+    def fail_once(rows):
+        monkeypatch.setattr(writer, "_write", write)
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(writer, "_write", fail_once)
+    assert writer.flush() == 0
+    stats = writer.snapshot()
+    assert stats["failed_flushes"] == 1
+    assert stats["buffered"] == 1
+    assert _event_types(db_session) == set()
+
+    assert writer.flush() == 1
+    assert writer.snapshot()["buffered"] == 0
+    assert _event_types(db_session) == {"sent"}
+
+
+def _rows(email_id, count, **overrides):
+    now = datetime.utcnow()
+    return [
+        {
+            "email_id": email_id,
+            "tenant_id": "tenant-1",
+            "event_type": "sent",
+            "event_time": now,
+            "provider": "mock",
+            "provider_event_id": f"evt-{i}",
+            "payload_json": {},
+            "created_at": now,
+            **overrides,
+        }
+        for i in range(count)
+    ]
+
+
+def _writer(db_session, **overrides):
+    options = {"batch_size": 10, "flush_interval_seconds": 3600, "max_buffered": 100}
+    options.update(overrides)
+    return EventWriter(db_session.get_bind(), **options)
+
+
+def test_failed_flush_requeues_only_unwritten_chunks(db_session, make_email, monkeypatch):
+    email = make_email("k1")
+    db_session.add(email)
+    db_session.commit()
+    writer = _writer(db_session)
+    writer.add_many(_rows(email.id, 3))
+    writer.batch_size = 1
+
+    write, calls = writer._write, []
+
+    def fail_second_chunk(rows):
+        calls.append(rows)
+        if len(calls) == 2:
+            raise RuntimeError("database unavailable")
+        write(rows)
+
+    monkeypatch.setattr(writer, "_write", fail_second_chunk)
+    try:
+        assert writer.flush() == 1
+        assert writer.snapshot()["buffered"] == 2
+        assert writer.flush() == 2
+    finally:
+        writer.close()
+
+    event_ids = sorted(db_session.execute(select(EmailEvent.provider_event_id)).scalars())
+    assert event_ids == ["evt-0", "evt-1", "evt-2"]
+
+
+def test_rows_the_database_rejects_are_dropped_not_retried(db_session, make_email):
+    email = make_email("k1")
+    db_session.add(email)
+    db_session.commit()
+    writer = _writer(db_session)
+    writer.add_many(_rows(email.id, 2) + _rows(email.id, 1, payload_json={"unserialisable": object()}))
+    try:
+        assert writer.flush() == 2
+        stats = writer.snapshot()
+        assert (stats["buffered"], stats["rejected_events"], stats["failed_flushes"]) == (0, 1, 0)
+    finally:
+        writer.close()
+
+    assert len(db_session.execute(select(EmailEvent.id)).all()) == 2
+
+
+def test_requeued_rows_respect_the_buffer_bound(db_session, monkeypatch):
+    writer = _writer(db_session, max_buffered=3)
+    writer.add_many(_rows("email-1", 2))
+
+    def unavailable(rows):
+        # Events keep arriving while the database is down.
+        writer.add_many(_rows("email-1", 2))
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(writer, "_write", unavailable)
+    try:
+        assert writer.flush() == 0
+        stats = writer.snapshot()
+        assert (stats["buffered"], stats["dropped_events"], stats["failed_flushes"]) == (3, 1, 1)
+    finally:
+        monkeypatch.undo()
+        writer.close()
@@ -0,0 +1,43 @@
+from app.core.idempotency import IdempotencyCache, create_or_reuse_email
+from app.domain.models import Email, Tenant
+
+
+class DictRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+        return True
+
+
+def test_duplicate_key_reuses_row_without_discarding_pending_work(db_session, make_email):
+    first = create_or_reuse_email(db_session, make_email("k1"))
+    db_session.commit()
+
+    db_session.add(Tenant(id="tenant-2", name="Tenant 2", status="active"))
+    second = create_or_reuse_email(db_session, make_email("k1"))
+    db_session.commit()
+
+    assert first.reused is False
+    assert second.reused is True
+    assert second.email.id == first.email.id
+    assert db_session.get(Tenant, "tenant-2") is not None
+    assert db_session.query(Email).count() == 1
+
+
+def test_cached_key_is_answered_from_redis(db_session, make_email):
+    cache = IdempotencyCache(DictRedis(), ttl_seconds=60)
+    created = create_or_reuse_email(db_session, make_email("k2"), cache)
+    db_session.commit()
+    cache.remember(created.email)
+
+    db_session.close()
+    reused = create_or_reuse_email(None, make_email("k2"), cache)
+
+    assert reused.reused is True
+    assert reused.email.id == created.email.id
+    assert reused.email.status == "queued"
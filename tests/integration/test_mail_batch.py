@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app.domain.enums import EmailStatus
+from app.domain.models import DeadLetter, Email
+
+
+def test_process_batch_claims_due_emails_and_records_results(db_session, make_email):
+    from app.services.mail_service import MailService
+
+    db_session.add_all(
+        [
+            make_email("k1", recipient_email="a@example.com"),
+            make_email("k2", recipient_email="b@fail.example"),
+            make_email("k3", recipient_email="c@example.com", next_retry_at=datetime.utcnow() + timedelta(hours=1)),
+            make_email("k4", recipient_email="d@example.com", status=EmailStatus.scheduled.value, scheduled_at=datetime.utcnow() - timedelta(minutes=1)),
+        ]
+    )
+    db_session.commit()
+
+    processed, retry_delays = MailService(db_session).process_batch(limit=10)
+    assert processed == 3
+    assert retry_delays == []
+
+    statuses = dict(db_session.execute(select(Email.idempotency_key, Email.status)).all())
+    assert statuses == {
+        "k1": EmailStatus.sent.value,
+        "k2": EmailStatus.failed.value,
+        "k3": EmailStatus.queued.value,
+        "k4": EmailStatus.sent.value,
+    }
+    assert db_session.execute(select(func.count(DeadLetter.id))).scalar_one() == 1
+
+    assert MailService(db_session).process_batch(limit=10) == (0, [])
+
+
+class ExhaustedPacer:
+    def __init__(self):
+        self.calls = []
+
+    def acquire(self, provider, tenant_id):
+        self.calls.append((provider, tenant_id))
+        return 2
+
+
+def test_process_batch_defers_paced_emails_without_spending_attempts(db_session, make_email):
+    from app.services.mail_service import MailService
+
+    db_session.add(make_email("k1", recipient_email="a@example.com"))
+    db_session.commit()
+
+    pacer = ExhaustedPacer()
+    processed, retry_delays = MailService(db_session, pacer=pacer).process_batch(limit=10)
+    assert processed == 1
+    assert retry_delays == [2]
+    assert pacer.calls == [("mock", "tenant-1")]
+
+    email = db_session.execute(select(Email)).scalar_one()
+    assert email.status == EmailStatus.queued.value
+    assert email.attempt_count == 0
+    assert email.next_retry_at > datetime.utcnow()
+
+
+def test_open_circuit_parks_emails_without_spending_attempts(db_session, make_email, monkeypatch):
+    from app.providers.circuit_breaker import BreakerDecision, CircuitBreakerAdapter
+    from app.providers.mock_provider import MockProvider
+    from app.providers.registry import registry
+    from app.services.mail_service import MailService
+
+    class OpenBreaker:
+        def allow(self, provider):
+            return BreakerDecision(allowed=False, probe=False, retry_after_ms=30000)
+
+    monkeypatch.setattr(registry, "get", lambda name: CircuitBreakerAdapter(MockProvider(), OpenBreaker()))
+    db_session.add(make_email("k1", recipient_email="a@example.com"))
+    db_session.commit()
+
+    processed, retry_delays = MailService(db_session, pacer=None).process_batch(limit=10)
+    assert processed == 1
+    assert retry_delays == [30]
+
+    email = db_session.execute(select(Email)).scalar_one()
+    assert email.status == EmailStatus.queued.value
+    assert email.attempt_count == 0
+    assert email.next_retry_at > datetime.utcnow() + timedelta(seconds=20)
+
+
+def test_per_email_errors_are_recorded_without_stranding_the_batch(db_session, make_email, monkeypatch):
+    from app.providers.mock_provider import MockProvider
+    from app.providers.registry import registry
+    from app.services.mail_service import MailService
+
+    class ExplodingProvider(MockProvider):
+        def send(self, email):
+            if email.to_email.startswith("boom"):
+                raise RuntimeError("connection reset")
+            return super().send(email)
+
+    monkeypatch.setattr(registry, "get", lambda name: ExplodingProvider())
+    db_session.add_all(
+        [
+            make_email("k1", recipient_email="a@example.com", variables_json={}),
+            make_email("k2", recipient_email="boom@example.com"),
+            make_email("k3", recipient_email="c@example.com"),
+        ]
+    )
+    db_session.commit()
+
+    processed, retry_delays = MailService(db_session, pacer=None).process_batch(limit=10)
+    assert processed == 3
+    assert len(retry_delays) == 1
+
+    emails = {email.idempotency_key: email for email in db_session.execute(select(Email)).scalars()}
+    assert emails["k1"].status == EmailStatus.failed.value
+    assert emails["k1"].failure_reason
+    assert emails["k2"].status == EmailStatus.queued.value
+    assert emails["k2"].failure_reason == "connection reset"
+    assert emails["k3"].status == EmailStatus.sent.value
+
+
+def test_reclaim_stale_requeues_only_expired_processing_rows(db_session, make_email):
+    from app.services.scheduler_service import SchedulerService
+
+    now = datetime.utcnow()
+    db_session.add_all(
+        [
+            make_email("stale", recipient_email="a@example.com", status=EmailStatus.processing.value, updated_at=now - timedelta(hours=1)),
+            make_email("fresh", recipient_email="b@example.com", status=EmailStatus.processing.value, updated_at=now),
+        ]
+    )
+    db_session.commit()
+
+    reclaimed = SchedulerService(db_session).reclaim_stale(limit=10, now=now)
+
+    statuses = dict(db_session.execute(select(Email.idempotency_key, Email.status)).all())
+    assert statuses == {"stale": EmailStatus.queued.value, "fresh": EmailStatus.processing.value}
+    assert len(reclaimed) == 1
+    assert SchedulerService(db_session).reclaim_stale(limit=10, now=now) == []
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.domain.enums import EmailStatus
+from app.domain.models import Email
+from app.services.scheduler_service import SchedulerService
+
+
+def _seed(db_session, make_email, now):
+    db_session.add_all(
+        [
+            make_email("due-scheduled", status=EmailStatus.scheduled.value, scheduled_at=now - timedelta(minutes=1)),
+            make_email("future-scheduled", status=EmailStatus.scheduled.value, scheduled_at=now + timedelta(days=1)),
+            make_email("due-retry", next_retry_at=now - timedelta(seconds=5)),
+            make_email("future-retry", next_retry_at=now + timedelta(minutes=5)),
+            make_email("fresh-published"),
+        ]
+    )
+    db_session.commit()
+
+
+def test_lease_due_claims_each_due_email_once(db_session, make_email):
+    now = datetime.utcnow()
+    _seed(db_session, make_email, now)
+    service = SchedulerService(db_session)
+
+    leased = service.lease_due(limit=10, now=now)
+    assert service.lease_due(limit=10, now=now) == []
+
+    rows = {email.idempotency_key: email for email in db_session.execute(select(Email)).scalars()}
+    assert set(leased) == {rows["due-scheduled"].id, rows["due-retry"].id}
+    assert rows["due-scheduled"].status == EmailStatus.queued.value
+    assert rows["due-scheduled"].next_retry_at > now
+    assert rows["future-scheduled"].status == EmailStatus.scheduled.value
+
+    later = now + timedelta(seconds=service.settings.scheduler_lease_seconds + 1)
+    assert set(service.lease_due(limit=10, now=later)) == set(leased) | {rows["future-retry"].id}
+
+
+def test_sweep_task_dispatches_due_emails(db_session, make_email, monkeypatch):
+    from app.queue.tasks_send import process_email_task, sweep_due_emails_task
+
+    _seed(db_session, make_email, datetime.utcnow())
+    published = []
+    monkeypatch.setattr(process_email_task, "apply_async", lambda *args, **kwargs: published.append(kwargs["args"][0]))
+
+    assert sweep_due_emails_task.run() == 2
+    assert len(published) == 2
+    assert sweep_due_emails_task.run() == 0
+
+
+def test_process_email_does_not_reclaim_rows_already_processing(db_session, make_email, monkeypatch):
+    from app.providers.registry import registry
+    from app.services.mail_service import MailService
+
+    db_session.add(make_email("in-flight", status=EmailStatus.processing.value))
+    db_session.commit()
+    email_id = db_session.execute(select(Email.id)).scalar_one()
+    monkeypatch.setattr(registry, "get", lambda name: pytest.fail("a processing row must not be sent again"))
+
+    MailService(db_session, pacer=None).process_email(email_id)
+
+    assert db_session.get(Email, email_id).status == EmailStatus.processing.value
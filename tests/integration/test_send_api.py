@@ -1,6 +1,23 @@
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.deps import async_db_session_dep, async_redis_dep
+from app.api.routes_send import send_email_async
+from app.db.session import async_database_url
 from app.queue.tasks_send import process_email_task
 
 
+class AsyncDummyRedis:
+    def register_script(self, script):
+        async def run(keys=(), args=(), client=None):
+            return [1, 100, 0]
+
+        return run
+
+
 def test_send_api_accepted_and_idempotent(client, monkeypatch):
     monkeypatch.setattr(process_email_task, "apply_async", lambda *args, **kwargs: None)
 
@@ -23,3 +40,43 @@ def test_send_api_accepted_and_idempotent(client, monkeypatch):
     body2 = r2.json()
     assert body2["idempotency_reused"] is True
     assert body2["email_id"] == body1["email_id"]
+
+
+def test_async_send_path_matches_sync_contract(session_factory, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    dispatched = []
+    monkeypatch.setattr(process_email_task, "apply_async", lambda *args, **kwargs: dispatched.append(kwargs))
+
+    engine = create_async_engine(async_database_url(os.environ["DATABASE_URL"]), poolclass=NullPool)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override_db():
+        async with factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.add_api_route("/send", send_email_async, methods=["POST"], status_code=202)
+    app.dependency_overrides[async_db_session_dep] = override_db
+    app.dependency_overrides[async_redis_dep] = lambda: AsyncDummyRedis()
+
+    payload = {
+        "tenant_id": "tenant-1",
+        "recipient": {"email": "bob@example.com", "name": "Bob"},
+        "template_id": "tpl-1",
+        "variables": {"name": "Bob"},
+        "idempotency_key": "idem-async",
+    }
+    with TestClient(app) as client:
+        r1 = client.post("/send", json=payload)
+        r2 = client.post("/send", json=payload)
+        missing = client.post("/send", json={**payload, "template_id": "tpl-x", "idempotency_key": "idem-x"})
+
+    assert r1.status_code == 202
+    assert r1.headers["X-RateLimit-Remaining"] == "100"
+    assert r1.json()["idempotency_reused"] is False
+    assert r2.json() == {**r1.json(), "idempotency_reused": True}
+    assert missing.status_code == 400
+    assert len(dispatched) == 1
@@ -0,0 +1,63 @@
+import pytest
+from prometheus_client import REGISTRY
+
+from app.domain.models import Template, Tenant
+from app.services.mail_service import MailService
+from app.services.send_context import get_send_context_cache
+
+
+def _lookups(cache, result):
+    return REGISTRY.get_sample_value("mail_cache_lookups_total", {"cache": cache, "result": result}) or 0.0
+
+
+def test_resolve_send_context_is_cached_and_invalidated(db_session):
+    service = MailService(db_session)
+    assert service.resolve_send_context("tenant-1", "tpl-1").version == 1
+    service.resolve_send_context("tenant-1", "tpl-1")
+
+    stats = get_send_context_cache().stats()
+    assert stats["tenants"]["hits"] == 1
+    assert stats["templates"]["hits"] == 1
+
+    template = db_session.get(Template, "tpl-1")
+    template.is_active = False
+    db_session.commit()
+
+    with pytest.raises(ValueError):
+        service.resolve_send_context("tenant-1", "tpl-1")
+
+
+def test_send_context_lookups_are_exported(db_session):
+    hits, misses = _lookups("send_context_tenant", "hit"), _lookups("send_context_tenant", "miss")
+    service = MailService(db_session)
+    service.resolve_send_context("tenant-1", "tpl-1")
+    service.resolve_send_context("tenant-1", "tpl-1")
+
+    assert _lookups("send_context_tenant", "hit") == hits + 1
+    assert _lookups("send_context_tenant", "miss") == misses + 1
+
+
+def test_invalidation_waits_for_commit_and_skips_rollback(db_session):
+    service = MailService(db_session)
+    service.resolve_send_context("tenant-1", "tpl-1")
+    cache = get_send_context_cache()
+
+    tenant = db_session.get(Tenant, "tenant-1")
+    tenant.status = "disabled"
+    db_session.flush()
+    assert cache.tenants.get("tenant-1") == "active"
+    db_session.rollback()
+    assert cache.tenants.get("tenant-1") == "active"
+
+    tenant = db_session.get(Tenant, "tenant-1")
+    tenant.status = "disabled"
+    db_session.flush()
+    assert cache.tenants.get("tenant-1") == "active"
+    db_session.commit()
+    with pytest.raises(ValueError):
+        service.resolve_send_context("tenant-1", "tpl-1")
+
+
+def test_resolve_send_context_rejects_other_tenants_template(db_session):
+    with pytest.raises(ValueError):
+        MailService(db_session).resolve_send_context("tenant-2", "tpl-1")
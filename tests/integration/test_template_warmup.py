@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from app.domain.models import EmailEventRollup, Template
+from app.templates.cache import TemplateCache
+from app.templates.warmup import warm_template_cache
+
+
+def _rollup(tenant_id, count):
+    return EmailEventRollup(
+        tenant_id=tenant_id,
+        template_id="tpl-1",
+        provider="mock",
+        event_type="queued",
+        bucket_start=datetime.utcnow().replace(minute=0, second=0, microsecond=0),
+        event_count=count,
+    )
+
+
+def test_warm_template_cache_compiles_busiest_tenant_templates(db_session):
+    db_session.add(
+        Template(
+            id="tpl-2",
+            tenant_id="tenant-1",
+            name="retired",
+            version=1,
+            subject_template="Old",
+            html_template="<p>Old</p>",
+            is_active=False,
+        )
+    )
+    db_session.add_all([_rollup("tenant-1", 50), _rollup("tenant-2", 10)])
+    db_session.commit()
+
+    cache = TemplateCache(maxsize=8)
+    assert warm_template_cache(db_session, cache, tenants=1, limit=10, lookback_hours=24) == 1
+    assert cache.stats()["size"] == 1
+
+    cache.get_or_compile("tpl-1", 1, "Hello {{ name }}", "<p>Hi {{ name }}</p>", None)
+    assert cache.stats()["hits"] == 1
+
+
+def test_warm_template_cache_without_traffic(db_session):
+    assert warm_template_cache(db_session, TemplateCache(maxsize=8), tenants=5, limit=10, lookback_hours=24) == 0
@@ -0,0 +1,79 @@
+import json
+
+from app.domain.enums import EmailStatus
+from app.domain.models import Email, ProviderWebhookEvent
+from app.queue.webhook_stream import StreamEntry, WebhookApplier
+
+
+class FakeStream:
+    max_deliveries = 3
+
+    def __init__(self, entries, deliveries=1):
+        self.pending = list(entries)
+        self.deliveries = deliveries
+        self.acked: list[str] = []
+        self.dead: list[tuple[StreamEntry, str]] = []
+
+    def ensure_group(self):
+        pass
+
+    def read(self, consumer, count, block_ms):
+        batch, self.pending = self.pending[:count], self.pending[count:]
+        return batch
+
+    def ack(self, entry_ids):
+        self.acked.extend(entry_ids)
+
+    def delivery_counts(self, entries):
+        return {entry.entry_id: self.deliveries for entry in entries}
+
+    def dead_letter(self, failures):
+        self.dead.extend(failures)
+
+
+def _entry(entry_id, event_id, payload):
+    return StreamEntry(entry_id=entry_id, provider="mock", event_id=event_id, payload=payload)
+
+
+def test_applier_applies_batch_and_dead_letters_poison_events(session_factory):
+    with session_factory() as session:
+        session.add(
+            Email(
+                id="email-1",
+                tenant_id="tenant-1",
+                idempotency_key="k1",
+                recipient_email="a@example.com",
+                template_id="tpl-1",
+                provider_name="mock",
+                provider_message_id="msg-1",
+                status=EmailStatus.sent.value,
+            )
+        )
+        session.commit()
+
+    stream = FakeStream(
+        [
+            _entry("1-0", "evt-1", json.dumps({"provider_message_id": "msg-1", "event_type": "delivered"})),
+            _entry("2-0", "evt-2", "{not json"),
+            _entry("3-0", "evt-1", json.dumps({"provider_message_id": "msg-1", "event_type": "delivered"})),
+            _entry("4-0", "evt-4", json.dumps({"email_id": ["email-1"], "event_type": "delivered"})),
+        ]
+    )
+    applier = WebhookApplier(stream, session_factory, consumer="c1", batch_size=10, block_ms=0)
+
+    assert applier.run_until_idle() == 2
+    assert stream.acked == ["1-0", "3-0"]
+    assert [entry.entry_id for entry, _ in stream.dead] == ["2-0", "4-0"]
+
+    with session_factory() as session:
+        assert session.get(Email, "email-1").status == EmailStatus.delivered.value
+        assert session.query(ProviderWebhookEvent).count() == 1
+
+
+def test_applier_dead_letters_invalid_events_from_a_clean_batch(session_factory):
+    stream = FakeStream([_entry("1-0", "evt-1", json.dumps({"email_id": 7, "event_type": "delivered"}))])
+    applier = WebhookApplier(stream, session_factory, consumer="c1", batch_size=10, block_ms=0)
+
+    assert applier.run_until_idle() == 0
+    assert stream.acked == []
+    assert [(entry.entry_id, reason) for entry, reason in stream.dead] == [("1-0", "invalid webhook event")]
@@ -0,0 +1,58 @@
+from app.services.bulk_upload import RecipientStreamParser
+
+
+def _parse(upload_format, body, step=7, **options):
+    parser = RecipientStreamParser(upload_format, **options)
+    rows = []
+    for start in range(0, len(body), step):
+        rows.extend(parser.feed(body[start : start + step]))
+        assert len(parser._partial) + len(parser._record) <= parser.max_record_size
+    rows.extend(parser.close())
+    return parser, rows
+
+
+def test_ndjson_stream_split_across_chunks():
+    body = (
+        b'{"email": "a@example.com", "name": "A", "variables": {"plan": "pro"}}\n'
+        b"not json\n"
+        b'{"email": "broken"}\n'
+        b"\n"
+        b'{"email": "b@example.com"}'
+    )
+    parser, rows = _parse("ndjson", body)
+
+    assert [row["email"] for row in rows] == ["a@example.com", "b@example.com"]
+    assert rows[0]["variables"] == {"plan": "pro"}
+    assert parser.accepted == 2
+    assert parser.rejected == 2
+    assert [error["line"] for error in parser.errors] == [2, 3]
+
+
+def test_csv_stream_maps_extra_columns_to_variables_and_handles_quoted_newlines():
+    body = 'email,name,city\r\na@example.com,Ann,"New\nYork"\r\nb@example.com,,Paris\r\nc@example.com,Cy\r\n'.encode()
+    parser, rows = _parse("csv", body, step=5)
+
+    assert rows == [
+        {"email": "a@example.com", "name": "Ann", "variables": {"city": "New\nYork"}},
+        {"email": "b@example.com", "name": None, "variables": {"city": "Paris"}},
+    ]
+    assert parser.rejected == 1
+    assert parser.errors[0]["line"] == 5
+
+
+def test_oversized_ndjson_line_is_rejected_without_buffering_it():
+    body = b'{"email": "a@example.com"}\n{"email": "' + b"x" * 500 + b'"}\n{"email": "b@example.com"}\n'
+    parser, rows = _parse("ndjson", body, max_record_size=64)
+
+    assert [row["email"] for row in rows] == ["a@example.com", "b@example.com"]
+    assert parser.errors == [{"line": 2, "error": "record exceeds 64 characters"}]
+
+
+def test_oversized_csv_quoted_field_is_rejected_and_parsing_resumes_after_it():
+    body = ('email,note\na@example.com,"' + "long\n" * 100 + '"\nb@example.com,ok\nc@example.com,"open').encode()
+    parser, rows = _parse("csv", body, max_record_size=64)
+
+    assert [row["email"] for row in rows] == ["b@example.com"]
+    assert [error["line"] for error in parser.errors] == [2, 104]
+    assert parser.errors[0]["error"] == "record exceeds 64 characters"
+    assert parser.errors[1]["error"] == "unterminated quoted field"
@@ -0,0 +1,24 @@
+from app.core import cache as cache_module
+from app.core.cache import MISSING, TTLCache
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+
+    cache = TTLCache(maxsize=10, ttl_seconds=30)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    now[0] += 31
+    assert cache.get("a") is MISSING
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_bounds_size():
+    cache = TTLCache(maxsize=2, ttl_seconds=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") is MISSING
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,160 @@
+import pytest
+
+from app.providers.base import EmailMessage, ProviderAdapter, ProviderResponse
+from app.providers.circuit_breaker import BreakerDecision, CircuitBreakerAdapter, CircuitOpenError
+
+
+class FakeBreaker:
+    def __init__(self, decision):
+        self.decision = decision
+        self.records = []
+
+    def allow(self, provider):
+        return self.decision
+
+    def record(self, provider, healthy, probe=False):
+        self.records.append((provider, healthy, probe))
+        return "closed"
+
+
+class FlakyProvider(ProviderAdapter):
+    name = "smtp"
+
+    def __init__(self, response):
+        self.response = response
+        self.sent = 0
+
+    def send(self, email):
+        self.sent += 1
+        return self.response
+
+
+MESSAGE = EmailMessage(
+    email_id="e1",
+    tenant_id="t1",
+    to_email="a@example.com",
+    to_name=None,
+    subject="s",
+    html_body="<p>x</p>",
+    text_body="x",
+    metadata={},
+)
+
+
+def test_open_circuit_fails_fast_without_calling_provider():
+    provider = FlakyProvider(ProviderResponse(provider_message_id="", accepted=True, raw_status="250", transient=False))
+    breaker = FakeBreaker(BreakerDecision(allowed=False, probe=False, retry_after_ms=2500))
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        CircuitBreakerAdapter(provider, breaker).send(MESSAGE)
+
+    assert exc_info.value.retry_after_seconds == 3
+    assert provider.sent == 0
+    assert breaker.records == []
+
+
+def test_transient_failures_are_recorded_against_the_provider():
+    provider = FlakyProvider(
+        ProviderResponse(
+            provider_message_id="",
+            accepted=False,
+            raw_status="transport_error",
+            transient=True,
+            error_code="transport_error",
+        )
+    )
+    breaker = FakeBreaker(BreakerDecision(allowed=True, probe=True, retry_after_ms=0))
+
+    response = CircuitBreakerAdapter(provider, breaker).send(MESSAGE)
+
+    assert response.accepted is False
+    assert breaker.records == [("smtp", False, True)]
+
+
+def _breaker(redis_client, **overrides):
+    from app.core.config import get_settings
+    from app.providers.circuit_breaker import CircuitBreaker
+
+    settings = get_settings().model_copy(
+        update={
+            "circuit_breaker_failure_threshold": 3,
+            "circuit_breaker_min_requests": 100,
+            "circuit_breaker_open_seconds": 30,
+            **overrides,
+        }
+    )
+    return CircuitBreaker(redis_client, settings)
+
+
+@pytest.fixture()
+def lua_redis():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def test_breaker_scripts_open_after_threshold_and_admit_one_probe(lua_redis):
+    breaker = _breaker(lua_redis)
+
+    assert [breaker.record("smtp", healthy=False) for _ in range(3)] == ["closed", "closed", "open"]
+    decision = breaker.allow("smtp")
+    assert decision.allowed is False
+    assert 29 <= decision.retry_after_seconds <= 30
+    assert breaker.state("smtp")["state"] == "open"
+
+    lua_redis.hset("breaker:smtp", "open_until", 0)
+    probe = breaker.allow("smtp")
+    assert (probe.allowed, probe.probe) == (True, True)
+    assert breaker.allow("smtp").allowed is False
+
+    assert breaker.record("smtp", healthy=True, probe=True) == "closed"
+    assert breaker.allow("smtp") == BreakerDecision(allowed=True, probe=False, retry_after_ms=0)
+
+
+def test_failed_probe_reopens_the_circuit(lua_redis):
+    breaker = _breaker(lua_redis, circuit_breaker_failure_threshold=1)
+    breaker.record("smtp", healthy=False)
+    lua_redis.hset("breaker:smtp", "open_until", 0)
+
+    assert breaker.allow("smtp").probe is True
+    assert breaker.record("smtp", healthy=False, probe=True) == "open"
+    assert breaker.allow("smtp").allowed is False
+
+
+def test_per_recipient_rejects_leave_the_breaker_closed(lua_redis):
+    provider = FlakyProvider(
+        ProviderResponse(
+            provider_message_id="",
+            accepted=False,
+            raw_status="smtp_450",
+            transient=True,
+            error_code="450",
+            error_message="greylisted, try again later",
+        )
+    )
+    breaker = _breaker(lua_redis)
+    adapter = CircuitBreakerAdapter(provider, breaker)
+
+    for _ in range(10):
+        assert adapter.send(MESSAGE).accepted is False
+
+    assert breaker.state("smtp")["state"] == "closed"
+    assert breaker.allow("smtp").allowed is True
+
+
+def test_breaker_fails_open_when_redis_is_down():
+    from redis.exceptions import ConnectionError as RedisConnectionError
+
+    class DownRedis:
+        def register_script(self, script):
+            def run(keys=(), args=(), client=None):
+                raise RedisConnectionError("redis down")
+
+            return run
+
+    provider = FlakyProvider(ProviderResponse(provider_message_id="m1", accepted=True, raw_status="250", transient=False))
+
+    response = CircuitBreakerAdapter(provider, _breaker(DownRedis())).send(MESSAGE)
+
+    assert response.accepted is True
+    assert provider.sent == 1
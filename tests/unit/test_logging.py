@@ -0,0 +1,48 @@
+import logging
+from types import SimpleNamespace
+
+from app.core.logging import TraceIdFilter, get_trace_id, reset_trace_id, set_trace_id
+
+
+def _record():
+    return logging.LogRecord("test", logging.INFO, __file__, 1, "message", None, None)
+
+
+def test_filter_stamps_the_current_trace_id():
+    token = set_trace_id("trace-1")
+    try:
+        record = _record()
+        assert TraceIdFilter().filter(record)
+        assert record.trace_id == "trace-1"
+    finally:
+        reset_trace_id(token)
+
+    record = _record()
+    TraceIdFilter().filter(record)
+    assert record.trace_id is None
+
+
+def test_api_echoes_or_generates_trace_ids(client):
+    assert client.get("/health/live", headers={"X-Trace-Id": "abc123"}).headers["X-Trace-Id"] == "abc123"
+    assert len(client.get("/health/live").headers["X-Trace-Id"]) == 32
+
+
+def test_tasks_inherit_the_publishing_trace_id():
+    from app.queue.celery_app import end_task_trace, propagate_trace_id, start_task_trace
+
+    headers = {}
+    token = set_trace_id("request-trace")
+    try:
+        propagate_trace_id(headers=headers)
+    finally:
+        reset_trace_id(token)
+    assert headers == {"trace_id": "request-trace"}
+
+    start_task_trace("task-1", SimpleNamespace(request=SimpleNamespace(trace_id="request-trace")))
+    assert get_trace_id() == "request-trace"
+    end_task_trace("task-1")
+    assert get_trace_id() is None
+
+    start_task_trace("task-2", SimpleNamespace(request=SimpleNamespace()))
+    assert get_trace_id() == "task-2"
+    end_task_trace("task-2")
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+from prometheus_client import REGISTRY
+
+from app.core.metrics import DB_SECONDS, observe_send, observe_seconds, record_transition, render_metrics
+from app.domain.models import Email
+from app.providers.base import ProviderResponse
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_observe_send_records_latency_and_lag():
+    email = Email(
+        id="e-1",
+        tenant_id="tenant-m",
+        provider_name="mock",
+        attempt_count=0,
+        created_at=datetime.utcnow() - timedelta(seconds=30),
+    )
+    before = _sample("mail_provider_send_seconds_count", provider="mock", outcome="accepted")
+    lag_before = _sample("mail_enqueue_to_send_seconds_sum", provider="mock")
+
+    observe_send(email, ProviderResponse("m-1", accepted=True, raw_status="ok", transient=False), 0.02)
+
+    assert _sample("mail_provider_send_seconds_count", provider="mock", outcome="accepted") == before + 1
+    assert _sample("mail_enqueue_to_send_seconds_sum", provider="mock") - lag_before >= 30
+
+
+def test_transitions_and_db_timings_are_exported():
+    transitions = {"status": "sent", "provider": "mock", "tenant_id": "tenant-m"}
+    before = _sample("mail_status_transitions_total", **transitions)
+    claims_before = _sample("mail_db_seconds_count", operation="claim")
+
+    record_transition("sent", "mock", "tenant-m", count=2)
+    with observe_seconds(DB_SECONDS, operation="claim"):
+        pass
+
+    _, media_type = render_metrics()
+    assert media_type.startswith("text/plain")
+    assert _sample("mail_status_transitions_total", **transitions) == before + 2
+    assert _sample("mail_db_seconds_count", operation="claim") == claims_before + 1
@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+from redis import Redis
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.db.session import (
+    CountingBlockingConnectionPool,
+    TimedQueuePool,
+    db_pool_stats,
+    get_async_redis,
+    get_async_redis_pool,
+    redis_pool_stats,
+    reset_pools_after_fork,
+)
+
+
+def _pool(**kwargs) -> TimedQueuePool:
+    return TimedQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, **kwargs)
+
+
+def test_timed_pools_keep_separate_stats():
+    first = _pool()
+    second = _pool()
+
+    first.connect().close()
+    first.connect().close()
+
+    assert first.stats.checkouts == 2
+    assert second.stats.checkouts == 0
+    assert db_pool_stats(first)["checkouts"] == 2
+
+
+def test_timed_pool_counts_timeouts_and_recreate_starts_fresh():
+    pool = _pool(timeout=0.01)
+    held = pool.connect()
+    with pytest.raises(PoolTimeoutError):
+        pool.connect()
+    held.close()
+
+    assert pool.stats.timeouts == 1
+    assert pool.stats.checkouts == 2
+    assert pool.stats.wait_seconds_max >= 0.01
+    assert pool.recreate().stats.checkouts == 0
+
+
+def test_redis_pool_counts_created_and_checked_out_connections():
+    fakeredis = pytest.importorskip("fakeredis")
+    pool = CountingBlockingConnectionPool(
+        max_connections=4, connection_class=fakeredis.FakeConnection, server=fakeredis.FakeServer()
+    )
+    assert redis_pool_stats(pool) == {"max_connections": 4, "created": 0, "idle": 0, "in_use": 0, "checkouts": 0}
+
+    Redis(connection_pool=pool).set("key", "value")
+    held = pool.get_connection()
+    assert redis_pool_stats(pool) == {"max_connections": 4, "created": 1, "idle": 0, "in_use": 1, "checkouts": 2}
+
+    pool.release(held)
+    pool.reset()
+    assert redis_pool_stats(pool)["created"] == 0
+
+
+def test_reset_after_fork_drops_the_cached_async_redis_client():
+    parent = get_async_redis()
+    try:
+        reset_pools_after_fork()
+        child = get_async_redis()
+        assert child is not parent
+        assert child.connection_pool is not parent.connection_pool
+        assert child.connection_pool is get_async_redis_pool()
+    finally:
+        get_async_redis.cache_clear()
+        get_async_redis_pool.cache_clear()
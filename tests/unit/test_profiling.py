@@ -0,0 +1,103 @@
+import pstats
+import sys
+import threading
+import time
+
+import pytest
+
+from app.core.profiling import Profiler
+
+
+def _profiler(tmp_path, **overrides):
+    options = {
+        "enabled": True,
+        "sample_every": 0,
+        "slow_threshold_ms": 0,
+        "output_format": "collapsed",
+        "interval_ms": 1,
+        "directory": str(tmp_path),
+    }
+    options.update(overrides)
+    return Profiler(**options)
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_disabled_profiler_does_nothing(tmp_path):
+    profiler = _profiler(tmp_path, enabled=False, sample_every=1)
+    assert profiler.begin("task") is None
+    assert profiler.executions == 0
+
+
+def test_profiles_one_in_n_executions_as_collapsed_stacks(tmp_path):
+    profiler = _profiler(tmp_path, sample_every=2)
+    for _ in range(4):
+        session = profiler.begin("app.queue.tasks_send.process_email_task")
+        _busy(0.02)
+        profiler.end(session)
+
+    assert profiler.written == 2
+    (output,) = tmp_path.glob("profile-*.collapsed")
+    lines = output.read_text().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert stack.startswith("app.queue.tasks_send.process_email_task;MainThread;")
+    assert int(count) > 0
+    assert any("_busy" in line for line in lines)
+
+
+def test_slow_threshold_keeps_only_slow_executions_as_pstats(tmp_path):
+    profiler = _profiler(tmp_path, slow_threshold_ms=30, output_format="pstats")
+    for seconds in (0.0, 0.05):
+        session = profiler.begin("task")
+        _busy(seconds)
+        profiler.end(session)
+
+    assert profiler.written == 1
+    (output,) = tmp_path.glob("profile-*.pstats")
+    assert any(name == "_busy" for _, _, name in pstats.Stats(str(output)).stats)
+
+
+def test_pstats_mode_samples_requests_on_every_thread(tmp_path):
+    profiler = _profiler(tmp_path, output_format="pstats", slow_threshold_ms=60_000)
+    session = profiler.begin("GET /send", all_threads=True)
+    try:
+        assert session.profile is None
+        assert session.sample_key is not None
+    finally:
+        profiler.end(session)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="cProfile rejects a second active profiler from 3.12")
+def test_pstats_mode_skips_an_overlapping_profile(tmp_path):
+    profiler = _profiler(tmp_path, output_format="pstats", slow_threshold_ms=60_000)
+    outer = profiler.begin("task")
+    try:
+        assert outer.profile is not None
+        assert profiler.begin("task") is None
+    finally:
+        profiler.end(outer)
+
+
+def test_toggle_flips_enabled(tmp_path):
+    profiler = _profiler(tmp_path, enabled=False)
+    profiler.toggle()
+    assert profiler.enabled
+
+
+def test_concurrent_sessions_share_one_sampler_thread(tmp_path):
+    profiler = _profiler(tmp_path, sample_every=1)
+    sessions = [profiler.begin(f"GET /r{i}", all_threads=True) for i in range(5)]
+    _busy(0.02)
+
+    samplers = [thread for thread in threading.enumerate() if thread.name == "profiler-sampler"]
+    assert len(samplers) == 1
+    for session in sessions:
+        profiler.end(session)
+    samplers[0].join(1)
+    assert not samplers[0].is_alive()
+    assert profiler.written == 5
@@ -0,0 +1,74 @@
+import pytest
+
+from app.core.rate_limit import RateLimiter, RateLimitExceededError
+
+
+class ScriptRedis:
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+
+    def register_script(self, script):
+        def run(keys=(), args=(), client=None):
+            self.calls.append((list(keys), list(args)))
+            return self.reply
+
+        return run
+
+
+def test_rate_limiter_checks_tenant_and_provider_in_one_call():
+    redis_client = ScriptRedis([1, 7, 0])
+    result = RateLimiter(redis_client, window_seconds=60).check("tenant-1", "smtp", 300, 120)
+
+    assert result.allowed is True
+    assert result.remaining == 7
+    assert redis_client.calls == [
+        (
+            ["rate:bucket:tenant:tenant-1", "rate:bucket:provider:tenant-1:smtp"],
+            [1, 300, 60000, 120, 60000],
+        )
+    ]
+
+
+def test_rate_limiter_raises_with_retry_after():
+    limiter = RateLimiter(ScriptRedis([0, 0, 1500]), window_seconds=60)
+    with pytest.raises(RateLimitExceededError) as exc_info:
+        limiter.check("tenant-1", "smtp", 300, 120)
+    assert exc_info.value.result.retry_after_seconds == 2
+
+
+@pytest.fixture()
+def lua_redis():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def test_token_bucket_script_spends_and_refuses_tokens(lua_redis):
+    limiter = RateLimiter(lua_redis, window_seconds=60)
+
+    assert [limiter.check("tenant-1", "smtp", 3, 10).remaining for _ in range(3)] == [2, 1, 0]
+    with pytest.raises(RateLimitExceededError) as exc_info:
+        limiter.check("tenant-1", "smtp", 3, 10)
+    assert 0 < exc_info.value.result.retry_after_seconds <= 20
+
+    assert limiter.check("tenant-2", "smtp", 3, 10).allowed is True
+
+
+def test_token_bucket_script_does_not_spend_when_any_bucket_refuses(lua_redis):
+    limiter = RateLimiter(lua_redis, window_seconds=60)
+
+    limiter.check("tenant-1", "smtp", 5, 1)
+    with pytest.raises(RateLimitExceededError):
+        limiter.check("tenant-1", "smtp", 5, 1)
+
+    assert limiter.check("tenant-1", "mock", 5, 1).remaining == 0
+    assert float(lua_redis.hget("rate:bucket:tenant:tenant-1", "tokens")) < 4
+
+
+def test_token_bucket_script_treats_zero_limit_as_deny_all(lua_redis):
+    limiter = RateLimiter(lua_redis, window_seconds=60)
+
+    with pytest.raises(RateLimitExceededError) as exc_info:
+        limiter.check("tenant-1", "smtp", 0, 10)
+    assert exc_info.value.result.retry_after_seconds == 60
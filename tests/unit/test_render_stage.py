@@ -0,0 +1,54 @@
+from jinja2 import UndefinedError
+
+from app.domain.models import Template
+from app.templates.render_stage import RenderStage
+
+
+def _template(version=1, subject="Hi {{name}}"):
+    return Template(
+        id="tpl-1",
+        tenant_id="tenant-1",
+        name="welcome",
+        version=version,
+        subject_template=subject,
+        html_template="<p>{{name}}</p>",
+        text_template=None,
+    )
+
+
+def test_render_stage_memoises_identical_variables():
+    stage = RenderStage(processes=0, cache_size=8)
+    template = _template()
+    results = stage.render_many([(template, {"name": "A"}), (template, {"name": "B"}), (template, {"name": "A"})])
+    assert results == [("Hi A", "<p>A</p>", "A"), ("Hi B", "<p>B</p>", "B"), ("Hi A", "<p>A</p>", "A")]
+    assert stage.render(template, {"name": "B"}) == ("Hi B", "<p>B</p>", "B")
+
+    stats = stage.stats()
+    assert (stats["cache"]["hits"], stats["cache"]["misses"]) == (2, 2)
+    assert stats["templates"]["tpl-1"]["renders"] == 2
+    assert stats["templates"]["tpl-1"]["cache_hits"] == 2
+
+
+def test_render_stage_keys_on_template_version_and_bounds_cache():
+    stage = RenderStage(processes=0, cache_size=1)
+    assert stage.render(_template(), {"name": "A"})[0] == "Hi A"
+    assert stage.render(_template(version=2, subject="Hello {{name}}"), {"name": "A"})[0] == "Hello A"
+    assert stage.stats()["cache"]["size"] == 1
+
+
+def test_render_stage_returns_errors_in_place():
+    stage = RenderStage(processes=0, cache_size=8)
+    template = _template()
+    ok, failed = stage.render_many([(template, {"name": "A"}), (template, {})])
+    assert ok[0] == "Hi A"
+    assert isinstance(failed, UndefinedError)
+    assert stage.stats()["templates"]["tpl-1"]["errors"] == 1
+
+
+def test_render_stage_process_pool():
+    stage = RenderStage(processes=2, cache_size=8)
+    try:
+        results = stage.render_many([(_template(), {"name": str(i)}) for i in range(4)])
+    finally:
+        stage.close()
+    assert [subject for subject, _, _ in results] == ["Hi 0", "Hi 1", "Hi 2", "Hi 3"]
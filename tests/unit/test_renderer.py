@@ -13,3 +13,8 @@ def test_render_template_success():
 def test_render_template_missing_variable_raises():
     with pytest.raises(Exception):
         render_template("Hi {{name}}", "<h1>{{name}}</h1>", None, {})
+
+
+def test_render_template_rejects_non_object_variables():
+    with pytest.raises(ValueError, match="variables must be an object"):
+        render_template("Hi", "<h1>Hi</h1>", None, ["A"])
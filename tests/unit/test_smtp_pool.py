@@ -0,0 +1,95 @@
+import smtplib
+
+from app.core.config import get_settings
+from app.providers.base import EmailMessage
+from app.providers.smtp_provider import SMTPProvider
+
+
+class FakeSMTP:
+    instances = []
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = 0
+        self.fail_next_with = None
+        self.closed = False
+        FakeSMTP.instances.append(self)
+
+    def login(self, user, password):
+        return (235, b"ok")
+
+    def noop(self):
+        return (250, b"ok")
+
+    def send_message(self, msg):
+        if self.fail_next_with is not None:
+            exc, self.fail_next_with = self.fail_next_with, None
+            raise exc
+        self.sent += 1
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+def _message(to_email="user@example.com"):
+    return EmailMessage(
+        email_id="e1",
+        tenant_id="t1",
+        to_email=to_email,
+        to_name=None,
+        subject="s",
+        html_body="<p>x</p>",
+        text_body="x",
+        metadata={},
+    )
+
+
+def _provider(monkeypatch, **overrides):
+    FakeSMTP.instances = []
+    monkeypatch.setattr(smtplib, "SMTP", FakeSMTP)
+    settings = get_settings().model_copy(update={"smtp_tls": False, "smtp_user": "", **overrides})
+    return SMTPProvider(settings=settings)
+
+
+def test_smtp_provider_reuses_pooled_connection(monkeypatch):
+    provider = _provider(monkeypatch)
+    assert provider.send(_message()).accepted
+    assert provider.send(_message()).accepted
+    assert len(FakeSMTP.instances) == 1
+    assert FakeSMTP.instances[0].sent == 2
+
+
+def test_smtp_provider_caps_messages_per_connection(monkeypatch):
+    provider = _provider(monkeypatch, smtp_pool_max_messages_per_connection=2)
+    for _ in range(3):
+        assert provider.send(_message()).accepted
+    assert len(FakeSMTP.instances) == 2
+    assert FakeSMTP.instances[0].closed is True
+
+
+def test_smtp_provider_reconnects_after_421_on_reused_connection(monkeypatch):
+    provider = _provider(monkeypatch)
+    assert provider.send(_message()).accepted
+    FakeSMTP.instances[0].fail_next_with = smtplib.SMTPSenderRefused(421, b"closing", "no-reply@example.com")
+
+    response = provider.send(_message())
+    assert response.accepted
+    assert len(FakeSMTP.instances) == 2
+    assert provider.pool.stats()["discards"] == 1
+
+
+def test_smtp_provider_keeps_connection_after_recipient_reject(monkeypatch):
+    provider = _provider(monkeypatch)
+    assert provider.send(_message()).accepted
+    FakeSMTP.instances[0].fail_next_with = smtplib.SMTPRecipientsRefused({"bad@example.com": (550, b"no such user")})
+
+    response = provider.send(_message("bad@example.com"))
+    assert response.accepted is False
+    assert response.transient is False
+    assert response.error_code == "550"
+
+    assert provider.send(_message()).accepted
+    assert len(FakeSMTP.instances) == 1
+    assert provider.pool.stats()["discards"] == 0
@@ -0,0 +1,55 @@
+from jinja2 import FileSystemBytecodeCache
+from prometheus_client import REGISTRY
+
+from app.templates.cache import TemplateCache
+from app.templates.renderer import render_compiled
+
+
+def _lookups(result):
+    return REGISTRY.get_sample_value("mail_cache_lookups_total", {"cache": "template", "result": result}) or 0.0
+
+
+def test_template_cache_hits_and_misses():
+    hits, misses = _lookups("hit"), _lookups("miss")
+    cache = TemplateCache(maxsize=4)
+    first = cache.get_or_compile("tpl-1", 1, "Hi {{name}}", "<p>{{name}}</p>", None)
+    second = cache.get_or_compile("tpl-1", 1, "Hi {{name}}", "<p>{{name}}</p>", None)
+    assert first is second
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert (_lookups("hit"), _lookups("miss")) == (hits + 1, misses + 1)
+    assert render_compiled(first, {"name": "A"}) == ("Hi A", "<p>A</p>", "A")
+
+
+def test_template_cache_evicts_least_recently_used():
+    cache = TemplateCache(maxsize=2)
+    cache.get_or_compile("tpl-1", 1, "a", "a", None)
+    cache.get_or_compile("tpl-2", 1, "b", "b", None)
+    cache.get_or_compile("tpl-1", 1, "a", "a", None)
+    cache.get_or_compile("tpl-3", 1, "c", "c", None)
+    cache.get_or_compile("tpl-1", 1, "a", "a", None)
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+
+
+def test_template_cache_content_change_and_invalidate():
+    cache = TemplateCache(maxsize=4)
+    cache.get_or_compile("tpl-1", 1, "old", "old", None)
+    cache.get_or_compile("tpl-1", 1, "new", "new", None)
+    assert cache.stats()["misses"] == 2
+    assert cache.invalidate("tpl-1") == 2
+    assert cache.stats()["size"] == 0
+
+
+def test_template_cache_reuses_shared_bytecode(tmp_path):
+    bytecode_cache = FileSystemBytecodeCache(directory=str(tmp_path))
+    first = TemplateCache(maxsize=4, bytecode_cache=bytecode_cache)
+    first.get_or_compile("tpl-1", 1, "Hi {{name}}", "<p>{{name}}</p>", "{{name}}")
+    assert len(list(tmp_path.iterdir())) == 3
+
+    cold = TemplateCache(maxsize=4, bytecode_cache=bytecode_cache)
+    compiled = cold.get_or_compile("tpl-1", 1, "Hi {{name}}", "<p>{{name}}</p>", "{{name}}")
+    assert len(list(tmp_path.iterdir())) == 3
+    assert render_compiled(compiled, {"name": "B"}) == ("Hi B", "<p>B</p>", "B")